@@ -4,26 +4,26 @@ Lancement simple de l'application RAW Converter
 """
 
 import sys
-import subprocess
+import multiprocessing
 from pathlib import Path
 
 def main():
-    """Lance l'application PyQt6"""
+    """Lance l'application PyQt6 dans ce processus (pas de second interpréteur)"""
     script_dir = Path(__file__).parent
-    app_script = script_dir / "raw_converter_pyqt.py"
 
-    if not app_script.exists():
-        print("❌ Erreur: raw_converter_pyqt.py non trouvé")
+    if not (script_dir / "raw_converter").is_dir():
+        print("❌ Erreur: package raw_converter non trouvé")
         return 1
 
+    sys.path.insert(0, str(script_dir))
+    from raw_converter import main as app_main
+
     try:
-        # Lancer l'application
-        subprocess.run([sys.executable, str(app_script)], check=True)
+        app_main()
         return 0
-    except subprocess.CalledProcessError:
-        return 1
     except KeyboardInterrupt:
         return 0
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     sys.exit(main())
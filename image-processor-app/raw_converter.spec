@@ -18,6 +18,10 @@ a = Analysis(
         'PIL',
         'PIL.Image',
         'numpy',
+        # importés au premier usage (fonctions), listés pour ne pas dépendre de l'analyse
+        'minio',
+        'certifi',
+        'urllib3',
         'PyQt6.QtCore',
         'PyQt6.QtGui', 
         'PyQt6.QtWidgets',
@@ -25,7 +29,25 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    # Modules jamais utilisés par l'application: bundle plus léger, moins à décompresser au lancement
+    excludes=[
+        'tkinter',
+        'matplotlib',
+        'scipy',
+        'pandas',
+        'IPython',
+        'pytest',
+        'PyInstaller',
+        'PyQt6.QtNetwork',
+        'PyQt6.QtQml',
+        'PyQt6.QtQuick',
+        'PyQt6.QtWebEngineCore',
+        'PyQt6.QtWebEngineWidgets',
+        'PyQt6.QtMultimedia',
+        'PyQt6.QtSql',
+        'PyQt6.QtTest',
+        'PyQt6.QtBluetooth',
+    ],
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=block_cipher,
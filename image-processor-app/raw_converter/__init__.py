@@ -1,4 +1,13 @@
 """Package raw_converter
 Point d'entrée haut niveau pour lancer l'application PyQt.
+L'import de PyQt est différé pour que la CLI headless (python -m raw_converter) n'en dépende pas.
 """
-from .app import main  # noqa: F401
+import time
+
+# Origine des mesures de démarrage (voir STARTUP_TRACE_ENV dans app.py)
+IMPORT_STARTED = time.perf_counter()
+
+
+def main():
+    from .app import main as _main
+    return _main()
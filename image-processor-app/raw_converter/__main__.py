@@ -0,0 +1,8 @@
+"""Permet `python -m raw_converter` (CLI headless, ou interface graphique sans argument)."""
+import multiprocessing
+import sys
+from .cli import main
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
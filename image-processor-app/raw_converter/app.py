@@ -4,32 +4,58 @@ Contient la fenêtre et bootstrap main().
 from __future__ import annotations
 import sys
 import os
-from pathlib import Path
+import time
 from typing import List
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QSplitter,
-                             QLabel, QGroupBox, QHBoxLayout, QPushButton, QListWidget,
-                             QProgressBar, QLineEdit, QSlider, QTextEdit, QMessageBox, QCheckBox,
-                             QFileDialog, QTabWidget)  # ← ajout QTabWidget
-from PyQt6.QtCore import Qt
+                             QLabel, QGroupBox, QHBoxLayout, QPushButton,
+                             QProgressBar, QLineEdit, QSlider, QPlainTextEdit, QMessageBox, QCheckBox,
+                             QFileDialog, QTabWidget, QComboBox, QSpinBox)  # ← ajout QTabWidget
+from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QFont
 from .workers import ConversionWorker
+from .pipeline import EXECUTION_MODE_PROCESS, EXECUTION_MODE_THREAD, default_worker_count
 from .minio_widget import MinioConfigWidget
-from .upload_worker import UploadWorker  # ← nouvel import
-
-RAW_EXTENSIONS = {'.cr2', '.cr3', '.nef', '.arw', '.dng', '.raf', '.orf', '.rw2', '.pef', '.srw'}
+from .processing import (DECODE_MODE_FULL, DECODE_MODE_PREVIEW, DECODE_POLICY_AUTO, DECODE_POLICY_QUALITY,
+                         ENHANCE_BACKEND_PILLOW, ENHANCE_BACKEND_NUMPY, RAW_EXTENSIONS, JPEG_EXTENSIONS, RENDITION_PRESETS)
+from .upload_worker import UploadWorker, DEFAULT_UPLOAD_PARALLELISM  # ← nouvel import
+from .scan_worker import FolderScanWorker
+from .selection_model import SelectionListModel, selection_list_view
+from .progress_feed import ProgressFeed, FEED_PROGRESS, FEED_STATUS, FEED_BACKLOG
+from .ordering import ORDER_SELECTION, ORDER_SMALLEST, ORDER_NEWEST, ORDER_PRIORITY
+
+# RAW_CONVERTER_STARTUP_TRACE=1: affiche le temps de démarrage; =exit: l'affiche puis quitte
+STARTUP_TRACE_ENV = "RAW_CONVERTER_STARTUP_TRACE"
+# Rafraîchissement de la progression et des journaux (10 Hz), quel que soit le débit du lot
+UI_REFRESH_MS = 100
+# Lignes affichées par journal (les plus anciennes disparaissent; le fichier de journal garde tout)
+LOG_VIEW_MAX_LINES = 5000
 
 class ImageProcessorApp(QMainWindow):
     def __init__(self):
         super().__init__()
-        self.selected_files: List[str] = []
+        self.files_model = SelectionListModel(parent=self)  # fichiers RAW sélectionnés
         self.output_directory = ""
         self.quality = 70
         self.watermark_enabled = True
         self.watermark_path = ""
         self.filename_display_enabled = True
+        self.execution_mode = EXECUTION_MODE_PROCESS
+        self.max_workers = default_worker_count(EXECUTION_MODE_PROCESS)
+        self.decode_mode = DECODE_MODE_FULL
+        self.decode_policy = DECODE_POLICY_AUTO
+        self.incremental = True
+        self.enhance_backend = ENHANCE_BACKEND_PILLOW
+        self.write_local = True
+        self.memory_budget_mb = 0  # 0: automatique (moitié de la RAM)
+        self.extra_renditions: List[str] = []  # clés de RENDITION_PRESETS
+        self.order = ORDER_SELECTION  # ordre de conversion, modifiable pendant le lot
+        self.priority_files: List[str] = []  # fichiers à convertir en premier (⭐ En priorité)
         self.conversion_worker: ConversionWorker | None = None
-        self.manual_upload_files: List[str] = []  # liste pour l’onglet upload
+        self.upload_model = SelectionListModel(parent=self)  # JPEG de l’onglet upload
         self.upload_worker: UploadWorker | None = None
+        self.folder_scan: FolderScanWorker | None = None  # analyses de dossier en cours
+        self.upload_scan: FolderScanWorker | None = None
+        self.refresh_timer = QTimer(self); self.refresh_timer.setInterval(UI_REFRESH_MS); self.refresh_timer.timeout.connect(self._refresh_progress)
         self._build_ui()
         self._apply_style()
 
@@ -58,9 +84,12 @@ class ImageProcessorApp(QMainWindow):
         btns = QHBoxLayout()
         self.select_files_btn = QPushButton("📄 Sélectionner des fichiers"); self.select_files_btn.clicked.connect(self._select_files); btns.addWidget(self.select_files_btn)
         self.select_folder_btn = QPushButton("📂 Sélectionner un dossier"); self.select_folder_btn.clicked.connect(self._select_folder); btns.addWidget(self.select_folder_btn)
+        self.remove_btn = QPushButton("➖ Retirer"); self.remove_btn.clicked.connect(self._remove_selected_files); btns.addWidget(self.remove_btn)
+        self.prioritize_btn = QPushButton("⭐ En priorité"); self.prioritize_btn.setToolTip("Convertit d'abord les fichiers sélectionnés dans la liste (aussi pendant la conversion)"); self.prioritize_btn.clicked.connect(self._prioritize_selected_files); btns.addWidget(self.prioritize_btn)
         self.clear_btn = QPushButton("🗑️ Effacer"); self.clear_btn.clicked.connect(self._clear_selection); btns.addWidget(self.clear_btn)
         gl.addLayout(btns)
-        self.files_list = QListWidget(); self.files_list.setMinimumHeight(200); gl.addWidget(self.files_list)
+        self.files_list = selection_list_view(self.files_model); self.files_list.setMinimumHeight(200); gl.addWidget(self.files_list)
+        _on_model_changed(self.files_model, self._update_files_count)
         self.files_count_label = QLabel("Aucun fichier sélectionné"); self.files_count_label.setAlignment(Qt.AlignmentFlag.AlignCenter); gl.addWidget(self.files_count_label)
         layout.addWidget(group); layout.addStretch()
         return panel
@@ -78,6 +107,25 @@ class ImageProcessorApp(QMainWindow):
         self.quality_slider = QSlider(Qt.Orientation.Horizontal); self.quality_slider.setMinimum(10); self.quality_slider.setMaximum(100); self.quality_slider.setValue(self.quality); self.quality_slider.valueChanged.connect(self._update_quality); quality_row.addWidget(self.quality_slider)
         self.quality_label = QLabel(str(self.quality_slider.value())); self.quality_label.setMinimumWidth(30); quality_row.addWidget(self.quality_label)
         cfg_grid.addLayout(quality_row)
+        # Moteur d'exécution
+        exec_row = QHBoxLayout(); exec_row.addWidget(QLabel("Exécution:"))
+        self.execution_combo = QComboBox(); self.execution_combo.addItem("Processus (multi-cœurs)", EXECUTION_MODE_PROCESS); self.execution_combo.addItem("Threads (repli)", EXECUTION_MODE_THREAD); self.execution_combo.currentIndexChanged.connect(self._update_execution_mode); exec_row.addWidget(self.execution_combo)
+        exec_row.addWidget(QLabel("Workers:"))
+        self.workers_spin = QSpinBox(); self.workers_spin.setMinimum(1); self.workers_spin.setMaximum(64); self.workers_spin.setValue(self.max_workers); self.workers_spin.valueChanged.connect(self._update_max_workers); exec_row.addWidget(self.workers_spin)
+        exec_row.addWidget(QLabel("Budget RAM:"))
+        self.memory_spin = QSpinBox(); self.memory_spin.setRange(0, 1024 * 1024); self.memory_spin.setSingleStep(512); self.memory_spin.setSuffix(" Mo"); self.memory_spin.setSpecialValueText("Auto"); self.memory_spin.setToolTip("Mémoire maximale des conversions simultanées (Auto: moitié de la RAM)"); self.memory_spin.valueChanged.connect(self._update_memory_budget); exec_row.addWidget(self.memory_spin)
+        cfg_grid.addLayout(exec_row)
+        order_row = QHBoxLayout(); order_row.addWidget(QLabel("Ordre:"))
+        self.order_combo = QComboBox(); self.order_combo.addItem("Sélection", ORDER_SELECTION); self.order_combo.addItem("Plus petits d'abord (premiers JPEG plus vite)", ORDER_SMALLEST); self.order_combo.addItem("Plus récents d'abord", ORDER_NEWEST); self.order_combo.addItem("Prioritaires puis sélection", ORDER_PRIORITY); self.order_combo.setToolTip("Modifiable pendant la conversion: s'applique aux fichiers pas encore commencés"); self.order_combo.currentIndexChanged.connect(self._update_order); order_row.addWidget(self.order_combo); order_row.addStretch()
+        cfg_grid.addLayout(order_row)
+        # Mode de décodage
+        decode_row = QHBoxLayout(); decode_row.addWidget(QLabel("Décodage:"))
+        self.decode_combo = QComboBox(); self.decode_combo.addItem("RAW complet", DECODE_MODE_FULL); self.decode_combo.addItem("Aperçu intégré (épreuves rapides)", DECODE_MODE_PREVIEW); self.decode_combo.currentIndexChanged.connect(self._update_decode_mode); decode_row.addWidget(self.decode_combo)
+        self.decode_policy_combo = QComboBox(); self.decode_policy_combo.addItem("Auto (selon taille cible)", DECODE_POLICY_AUTO); self.decode_policy_combo.addItem("Qualité max (AHD pleine taille)", DECODE_POLICY_QUALITY); self.decode_policy_combo.currentIndexChanged.connect(self._update_decode_policy); decode_row.addWidget(self.decode_policy_combo)
+        cfg_grid.addLayout(decode_row)
+        enhance_row = QHBoxLayout(); enhance_row.addWidget(QLabel("Retouches:"))
+        self.enhance_combo = QComboBox(); self.enhance_combo.addItem("Pillow", ENHANCE_BACKEND_PILLOW); self.enhance_combo.addItem("NumPy (expérimental)", ENHANCE_BACKEND_NUMPY); self.enhance_combo.setToolTip("Pillow est en général plus rapide: le noyau NumPy n'est utile que là où `bench` le mesure plus rapide"); self.enhance_combo.currentIndexChanged.connect(self._update_enhance_backend); enhance_row.addWidget(self.enhance_combo)
+        cfg_grid.addLayout(enhance_row)
         # Watermark
         wm_group = QGroupBox("Watermark"); wm_layout = QVBoxLayout(wm_group)
         self.watermark_checkbox = QCheckBox("Ajouter un watermark"); self.watermark_checkbox.setChecked(True); self.watermark_checkbox.stateChanged.connect(self._toggle_watermark); wm_layout.addWidget(self.watermark_checkbox)
@@ -87,6 +135,14 @@ class ImageProcessorApp(QMainWindow):
         wm_layout.addLayout(wm_row); cfg_grid.addWidget(wm_group)
         # Filename overlay
         self.filename_checkbox = QCheckBox("Ajouter le nom du fichier sur l'image"); self.filename_checkbox.setChecked(True); self.filename_checkbox.stateChanged.connect(self._toggle_filename_display); cfg_grid.addWidget(self.filename_checkbox)
+        self.incremental_checkbox = QCheckBox("Ignorer les fichiers déjà convertis avec les mêmes réglages"); self.incremental_checkbox.setChecked(True); self.incremental_checkbox.stateChanged.connect(self._toggle_incremental); cfg_grid.addWidget(self.incremental_checkbox)
+        self.write_local_checkbox = QCheckBox("Enregistrer les JPEG dans le dossier de sortie (sinon: upload Minio direct depuis la mémoire)"); self.write_local_checkbox.setChecked(True); self.write_local_checkbox.stateChanged.connect(self._toggle_write_local); cfg_grid.addWidget(self.write_local_checkbox)
+        rend_row = QHBoxLayout(); rend_row.addWidget(QLabel("Déclinaisons:"))
+        self.rendition_checkboxes = {}
+        for key, label in (("thumb", "Miniature"), ("large", "Grand format")):
+            rendition = RENDITION_PRESETS[key]
+            cb = QCheckBox(f"{label} ({rendition.max_size}px)"); cb.setToolTip(f"Fichier <nom>{rendition.suffix}.jpg, issu du même décodage"); cb.stateChanged.connect(self._toggle_renditions); rend_row.addWidget(cb); self.rendition_checkboxes[key] = cb
+        rend_row.addStretch(); cfg_grid.addLayout(rend_row)
         web_info = QLabel("🌐 Optimisation web: 768px max"); web_info.setStyleSheet("color:#888; font-size:11px; margin-top:10px; padding:5px; background-color:#f0f0f0; border-radius:3px;"); web_info.setWordWrap(True); cfg_grid.addWidget(web_info)
         layout.addWidget(cfg_group)
         # Minio widget (optionnel)
@@ -96,11 +152,14 @@ class ImageProcessorApp(QMainWindow):
         self.progress_bar = QProgressBar(); self.progress_bar.setMinimum(0); self.progress_bar.setMaximum(100); conv_layout.addWidget(self.progress_bar)
         self.conversion_status = QLabel("Prêt à convertir"); conv_layout.addWidget(self.conversion_status)
         btn_row = QHBoxLayout(); self.convert_btn = QPushButton("🐴 Commencer la conversion"); self.convert_btn.clicked.connect(self._start_conversion); self.convert_btn.setMinimumHeight(40); btn_row.addWidget(self.convert_btn)
-        self.stop_btn = QPushButton("⏹️ Arrêter"); self.stop_btn.clicked.connect(self._stop_conversion); self.stop_btn.setEnabled(False); btn_row.addWidget(self.stop_btn)
-        conv_layout.addLayout(btn_row); layout.addWidget(conv_group)
+        self.watch_btn = QPushButton("👁️ Surveiller un dossier"); self.watch_btn.setToolTip("Convertit (et uploade) les RAW au fil de leur arrivée dans un dossier, jusqu'à l'arrêt"); self.watch_btn.clicked.connect(self._start_watch); self.watch_btn.setMinimumHeight(40); btn_row.addWidget(self.watch_btn)
+        self.stop_btn = QPushButton("⏹️ Arrêter"); self.stop_btn.setToolTip("Annule les conversions en cours (reprise possible via le journal). En surveillance: termine les fichiers reçus, un second clic les annule"); self.stop_btn.clicked.connect(self._stop_conversion); self.stop_btn.setEnabled(False); btn_row.addWidget(self.stop_btn)
+        conv_layout.addLayout(btn_row)
+        self.backlog_label = QLabel(); self.backlog_label.setVisible(False); conv_layout.addWidget(self.backlog_label)
+        layout.addWidget(conv_group)
         # Log
         log_group = QGroupBox("📝 Journal de conversion"); log_layout = QVBoxLayout(log_group)
-        self.log_text = QTextEdit(); self.log_text.setMaximumHeight(200); self.log_text.setReadOnly(True); log_layout.addWidget(self.log_text)
+        self.log_text = _log_view(); self.log_text.setMaximumHeight(200); log_layout.addWidget(self.log_text)
         layout.addWidget(log_group)
         return panel
 
@@ -117,9 +176,11 @@ class ImageProcessorApp(QMainWindow):
         self.up_select_files_btn = QPushButton("📄 Sélectionner fichiers JPG"); self.up_select_files_btn.clicked.connect(self._select_upload_files); btns.addWidget(self.up_select_files_btn)
         self.up_select_folder_btn = QPushButton("📂 Sélectionner dossier"); self.up_select_folder_btn.clicked.connect(self._select_upload_folder); btns.addWidget(self.up_select_folder_btn)
         self.up_prefill_btn = QPushButton("📁 Depuis dossier de sortie"); self.up_prefill_btn.clicked.connect(self._prefill_upload_from_output); btns.addWidget(self.up_prefill_btn)
+        self.up_remove_btn = QPushButton("➖ Retirer"); self.up_remove_btn.clicked.connect(self._remove_selected_upload_files); btns.addWidget(self.up_remove_btn)
         self.up_clear_btn = QPushButton("🗑️ Effacer"); self.up_clear_btn.clicked.connect(self._clear_upload_selection); btns.addWidget(self.up_clear_btn)
         g_layout.addLayout(btns)
-        self.upload_list = QListWidget(); self.upload_list.setMinimumHeight(180); g_layout.addWidget(self.upload_list)
+        self.upload_list = selection_list_view(self.upload_model); self.upload_list.setMinimumHeight(180); g_layout.addWidget(self.upload_list)
+        _on_model_changed(self.upload_model, self._update_upload_count)
         self.upload_count_label = QLabel("Aucun fichier"); self.upload_count_label.setAlignment(Qt.AlignmentFlag.AlignCenter); g_layout.addWidget(self.upload_count_label)
         layout.addWidget(group)
 
@@ -127,11 +188,15 @@ class ImageProcessorApp(QMainWindow):
         c_layout = QVBoxLayout(conv)
         self.upload_progress = QProgressBar(); self.upload_progress.setMinimum(0); self.upload_progress.setMaximum(100); c_layout.addWidget(self.upload_progress)
         self.upload_status = QLabel("Prêt"); c_layout.addWidget(self.upload_status)
+        par_row = QHBoxLayout(); par_row.addWidget(QLabel("Uploads simultanés:"))
+        self.upload_parallel_spin = QSpinBox(); self.upload_parallel_spin.setMinimum(1); self.upload_parallel_spin.setMaximum(32); self.upload_parallel_spin.setValue(DEFAULT_UPLOAD_PARALLELISM); par_row.addWidget(self.upload_parallel_spin); par_row.addStretch()
+        c_layout.addLayout(par_row)
+        self.upload_sync_checkbox = QCheckBox("Synchroniser (n'envoyer que les fichiers nouveaux ou modifiés)"); self.upload_sync_checkbox.setChecked(True); c_layout.addWidget(self.upload_sync_checkbox)
         row = QHBoxLayout()
         self.start_upload_btn = QPushButton("☁️ Lancer upload"); self.start_upload_btn.clicked.connect(self._start_manual_upload); row.addWidget(self.start_upload_btn)
         self.stop_upload_btn = QPushButton("⏹️ Stop"); self.stop_upload_btn.clicked.connect(self._stop_manual_upload); self.stop_upload_btn.setEnabled(False); row.addWidget(self.stop_upload_btn)
         c_layout.addLayout(row)
-        self.upload_log = QTextEdit(); self.upload_log.setReadOnly(True); self.upload_log.setMaximumHeight(180); c_layout.addWidget(self.upload_log)
+        self.upload_log = _log_view(); self.upload_log.setMaximumHeight(180); c_layout.addWidget(self.upload_log)
         layout.addWidget(conv)
         layout.addStretch()
         return tab
@@ -145,7 +210,7 @@ class ImageProcessorApp(QMainWindow):
             QPushButton:hover { background-color:#0056CC; }
             QPushButton:pressed { background-color:#004499; }
             QPushButton:disabled { background-color:#555; color:#888; }
-            QListWidget, QLineEdit, QTextEdit { border:1px solid #555; border-radius:4px; background-color:#2d2d2d; color:#fff; }
+            QListView, QLineEdit, QPlainTextEdit { border:1px solid #555; border-radius:4px; background-color:#2d2d2d; color:#fff; }
             QProgressBar { border:1px solid #555; border-radius:4px; text-align:center; background-color:#2d2d2d; }
             QProgressBar::chunk { background-color:#007AFF; border-radius:3px; }
             QSlider::groove:horizontal { border:1px solid #555; height:8px; background:#2d2d2d; margin:2px 0; border-radius:4px; }
@@ -162,27 +227,71 @@ class ImageProcessorApp(QMainWindow):
             "Fichiers RAW (*.cr2 *.cr3 *.nef *.arw *.dng *.raf *.orf *.rw2 *.pef *.srw);;Tous les fichiers (*)"
         )
         if files:
-            self.selected_files.extend(files)
-            self._update_files_list()
+            self._append_selected_files(files)
 
     def _select_folder(self):
-        """Ouvre un dialogue pour sélectionner un dossier contenant des fichiers RAW"""
+        """Ouvre un dialogue pour sélectionner un dossier contenant des fichiers RAW.
+        L'analyse tourne en arrière-plan; le bouton sert alors à l'arrêter.
+        """
+        if self.folder_scan:
+            self.folder_scan.stop(); return
         folder = QFileDialog.getExistingDirectory(self, "Sélectionner un dossier")
         if folder:
-            for root, _dirs, files in os.walk(folder):
-                for file in files:
-                    if Path(file).suffix.lower() in RAW_EXTENSIONS:
-                        self.selected_files.append(os.path.join(root, file))
-            self._update_files_list()
+            self.folder_scan = self._start_folder_scan(folder, RAW_EXTENSIONS, self._append_selected_files,
+                                                       self.select_folder_btn, self._on_folder_scan_finished)
+
+    def _start_folder_scan(self, folder: str, extensions, on_batch, button: QPushButton, on_finished) -> FolderScanWorker:
+        worker = FolderScanWorker(folder, extensions, parent=self)
+        name = os.path.basename(os.path.normpath(folder)) or folder
+        worker.files_found.connect(on_batch)
+        worker.progress_updated.connect(
+            lambda dirs, files: self.status_bar.showMessage(f"🔎 Analyse de {name}: {dirs} dossier(s), {files} fichier(s) trouvé(s)..."))
+        worker.scan_finished.connect(on_finished)
+        worker.finished.connect(worker.deleteLater)
+        button.setText("⏹️ Arrêter l'analyse")
+        self.status_bar.showMessage(f"🔎 Analyse de {name}...")
+        worker.start()
+        return worker
+
+    def _scan_finished_message(self, found: int, cancelled: bool) -> str:
+        return f"⏹️ Analyse interrompue: {found} fichier(s) trouvé(s)" if cancelled else f"✅ Analyse terminée: {found} fichier(s) trouvé(s)"
+
+    def _on_folder_scan_finished(self, found: int, cancelled: bool):
+        self.folder_scan = None
+        self.select_folder_btn.setText("📂 Sélectionner un dossier")
+        self.status_bar.showMessage(self._scan_finished_message(found, cancelled))
+
+    def _append_selected_files(self, paths: List[str]):
+        """Ajoute à la sélection les fichiers pas encore sélectionnés (seules les nouvelles lignes sont insérées)."""
+        self.files_model.add(paths)
+
+    def _remove_selected_files(self):
+        self.files_model.remove_rows(index.row() for index in self.files_list.selectionModel().selectedRows())
 
     def _clear_selection(self):
-        self.selected_files.clear(); self._update_files_list()
+        self.files_model.clear(); self.priority_files = []
 
-    def _update_files_list(self):
-        self.files_list.clear()
-        for fp in self.selected_files:
-            self.files_list.addItem(os.path.basename(fp))
-        count = len(self.selected_files)
+    def _prioritize_selected_files(self):
+        rows = sorted(index.row() for index in self.files_list.selectionModel().selectedRows())
+        selected = [self.files_model.store[row] for row in rows]
+        if not selected:
+            return
+        chosen = set(selected)
+        self.priority_files = selected + [p for p in self.priority_files if p not in chosen]
+        self._apply_order()
+        self.status_bar.showMessage(f"⭐ {len(selected)} fichier(s) en priorité")
+
+    def _update_order(self, _index):
+        self.order = self.order_combo.currentData()
+        self._apply_order()
+
+    def _apply_order(self):
+        """Reclasse aussi les fichiers pas encore soumis d'une conversion en cours."""
+        if self.conversion_worker and self.conversion_worker.isRunning():
+            self.conversion_worker.batch.set_order(self.order, self.priority_files)
+
+    def _update_files_count(self):
+        count = len(self.files_model.store)
         if count == 0: self.files_count_label.setText("Aucun fichier sélectionné")
         elif count == 1: self.files_count_label.setText("1 fichier sélectionné")
         else: self.files_count_label.setText(f"{count} fichiers sélectionnés")
@@ -196,6 +305,25 @@ class ImageProcessorApp(QMainWindow):
     def _update_quality(self, value):
         self.quality = value; self.quality_label.setText(str(value))
 
+    def _update_execution_mode(self, _index):
+        self.execution_mode = self.execution_combo.currentData()
+        self.workers_spin.setValue(default_worker_count(self.execution_mode))
+
+    def _update_max_workers(self, value):
+        self.max_workers = value
+
+    def _update_memory_budget(self, value):
+        self.memory_budget_mb = value
+
+    def _update_decode_mode(self, _index):
+        self.decode_mode = self.decode_combo.currentData()
+
+    def _update_decode_policy(self, _index):
+        self.decode_policy = self.decode_policy_combo.currentData()
+
+    def _update_enhance_backend(self, _index):
+        self.enhance_backend = self.enhance_combo.currentData()
+
     def _toggle_watermark(self, state):
         self.watermark_enabled = state == 2
         self.watermark_entry.setEnabled(self.watermark_enabled)
@@ -219,15 +347,29 @@ class ImageProcessorApp(QMainWindow):
     def _toggle_filename_display(self, state):
         self.filename_display_enabled = state == 2
 
-    def _validate_inputs(self) -> bool:
-        if not self.selected_files:
+    def _toggle_incremental(self, state):
+        self.incremental = state == 2
+
+    def _toggle_renditions(self, _state):
+        self.extra_renditions = [key for key, cb in self.rendition_checkboxes.items() if cb.isChecked()]
+
+    def _toggle_write_local(self, state):
+        self.write_local = state == 2
+        self.output_entry.setEnabled(self.write_local); self.browse_btn.setEnabled(self.write_local)
+
+    def _validate_inputs(self, require_files: bool = True) -> bool:
+        if require_files and self.folder_scan:
+            QMessageBox.warning(self, "Analyse en cours", "Attendez la fin de l'analyse du dossier (ou arrêtez-la)."); return False
+        if require_files and not self.files_model.store:
             QMessageBox.warning(self, "Erreur", "Veuillez sélectionner des fichiers à convertir."); return False
-        if not self.output_directory:
+        if self.write_local and not self.output_directory:
             QMessageBox.warning(self, "Erreur", "Veuillez sélectionner un dossier de sortie."); return False
-        if not os.path.exists(self.output_directory):
+        if self.write_local and not os.path.exists(self.output_directory):
             QMessageBox.warning(self, "Erreur", "Le dossier de sortie n'existe pas."); return False
         # Vérification Minio si activé
         cfg = self.minio_widget.get_config()
+        if not self.write_local and not cfg.enabled:
+            QMessageBox.warning(self, "Erreur", "Sans enregistrement local, l'upload Minio doit être activé."); return False
         if cfg.enabled and not cfg.connection_tested:
             QMessageBox.warning(self, "Minio non testé",
                                 "La configuration Minio est activée mais non validée.\nCliquez sur 'Tester' avant de lancer la conversion.")
@@ -237,82 +379,124 @@ class ImageProcessorApp(QMainWindow):
     def _start_conversion(self):
         if not self._validate_inputs():
             return
-        self.convert_btn.setEnabled(False); self.stop_btn.setEnabled(True); self.progress_bar.setValue(0); self.log_text.clear()
-        self.log_text.append("🐴 Démarrage du traitement parallèle\n" + "=" * 50)
+        self._run_conversion_worker(self.files_model.store.paths(), "🐴 Démarrage du traitement parallèle")
+
+    def _start_watch(self):
+        """Surveille un dossier (tethering, événement en direct) jusqu'au clic sur Arrêter."""
+        if not self._validate_inputs(require_files=False):
+            return
+        folder = QFileDialog.getExistingDirectory(self, "Dossier à surveiller")
+        if not folder:
+            return
+        self.backlog_label.setText("En attente de nouveaux fichiers..."); self.backlog_label.setVisible(True)
+        self._run_conversion_worker([], f"👁️ Surveillance de {folder}", watch_folder=folder)
+
+    def _on_backlog_updated(self, settling: int, queued: int, uploads: int):
+        text = f"📥 {settling} en cours d'écriture · {queued} à convertir"
+        if uploads: text += f" · {uploads} upload(s) en file"
+        self.backlog_label.setText(text)
+
+    def _run_conversion_worker(self, files: List[str], header: str, watch_folder: str | None = None):
+        self.convert_btn.setEnabled(False); self.watch_btn.setEnabled(False); self.stop_btn.setEnabled(True); self.progress_bar.setValue(0)
         self.conversion_worker = ConversionWorker(
-            self.selected_files.copy(),
+            files,
             self.output_directory,
             self.quality,
             self.watermark_enabled,
             self.watermark_path or None,
             self.filename_display_enabled,
-            minio_config=self.minio_widget.get_config()
+            minio_config=self.minio_widget.get_config(),
+            execution_mode=self.execution_mode,
+            max_workers=self.max_workers,
+            decode_mode=self.decode_mode,
+            decode_policy=self.decode_policy,
+            incremental=self.incremental,
+            enhance_backend=self.enhance_backend,
+            write_local=self.write_local,
+            memory_budget_mb=self.memory_budget_mb or None,
+            extra_renditions=[RENDITION_PRESETS[key] for key in self.extra_renditions],
+            order=self.order,
+            priority=self.priority_files,
+            watch_folder=watch_folder
         )
-        self.conversion_worker.progress_updated.connect(self.progress_bar.setValue)
-        self.conversion_worker.status_updated.connect(self.conversion_status.setText)
-        self.conversion_worker.file_converted.connect(self._on_file_converted)
         self.conversion_worker.conversion_finished.connect(self._on_conversion_finished)
+        self._start_feed(self.conversion_worker.feed, self.log_text, header + "\n" + "=" * 50)
         self.conversion_worker.start()
 
     def _stop_conversion(self):
         if self.conversion_worker:
             self.conversion_worker.stop()
 
-    def _on_file_converted(self, filename: str, success: bool, message: str):
-        self.log_text.append(message)
+    # --- Progression et journaux (ProgressFeed vidé à cadence fixe) ---
+    def _start_feed(self, feed: ProgressFeed, log_view: QPlainTextEdit, header: str):
+        log_view.clear(); feed.log(header)
+        if feed.log_path: feed.log(f"📄 Journal complet: {feed.log_path}")
+        self.refresh_timer.start()
+
+    def _refresh_progress(self):
+        if self.conversion_worker:
+            values = _drain_feed(self.conversion_worker.feed, self.log_text, self.progress_bar, self.conversion_status)
+            if FEED_BACKLOG in values: self._on_backlog_updated(*values[FEED_BACKLOG])
+        if self.upload_worker:
+            _drain_feed(self.upload_worker.feed, self.upload_log, self.upload_progress, self.upload_status)
+        if not any(w and w.isRunning() for w in (self.conversion_worker, self.upload_worker)):
+            self.refresh_timer.stop()
 
     def _on_conversion_finished(self, converted: int, failed: int, total: int):
-        self.convert_btn.setEnabled(True); self.stop_btn.setEnabled(False); self.conversion_status.setText("Conversion terminée")
-        msg = f"Conversion terminée!\n\nFichiers convertis: {converted}\nÉchecs: {failed}\nTotal: {total}\n"
+        self.convert_btn.setEnabled(True); self.watch_btn.setEnabled(True); self.stop_btn.setEnabled(False)
+        self.backlog_label.setVisible(False)
+        batch = self.conversion_worker.batch
+        feed = self.conversion_worker.feed
+        feed.log("\n" + "=" * 50)
+        feed.log(f"🎉 TERMINÉ - {converted}/{total} fichiers convertis")
+        if batch.skipped > 0: feed.log(f"⏭️ {batch.skipped} fichier(s) déjà à jour")
+        if batch.uploaded or batch.upload_failed: feed.log(f"☁️ {batch.uploaded} upload(s) OK, {batch.upload_failed} échec(s)")
+        if failed > 0: feed.log(f"⚠️ {failed} échec(s)")
+        if batch.cancelled > 0: feed.log(f"⏹️ {batch.cancelled} conversion(s) annulée(s), à reprendre en relançant le lot")
+        _drain_feed(feed, self.log_text, self.progress_bar, self.conversion_status); feed.close()
+        self.conversion_status.setText("Conversion terminée")
+        msg = f"Conversion terminée!\n\nFichiers convertis: {converted}\nDéjà à jour: {batch.skipped}\nÉchecs: {failed}\nTotal: {total}\n"
         if failed > 0: msg += "\nCertains fichiers n'ont pas pu être convertis."
         QMessageBox.information(self, "Conversion terminée", msg)
-        self.log_text.append("\n" + "=" * 50)
-        self.log_text.append(f"🎉 TERMINÉ - {converted}/{total} fichiers convertis")
-        if failed > 0: self.log_text.append(f"⚠️ {failed} échec(s)")
 
     # --- Sélection fichiers upload ---
     def _select_upload_files(self):
         files, _ = QFileDialog.getOpenFileNames(self, "Sélectionner fichiers JPG", "", "Images JPEG (*.jpg *.jpeg);;Tous (*)")
         if files:
-            for f in files:
-                if f.lower().endswith((".jpg", ".jpeg")) and f not in self.manual_upload_files:
-                    self.manual_upload_files.append(f)
-            self._update_upload_list()
+            self._append_upload_files([f for f in files if f.lower().endswith(JPEG_EXTENSIONS)])
 
     def _select_upload_folder(self):
+        if self.upload_scan:
+            self.upload_scan.stop(); return
         folder = QFileDialog.getExistingDirectory(self, "Sélectionner dossier contenant des JPG")
         if folder:
-            for root, _dirs, files in os.walk(folder):
-                for f in files:
-                    if f.lower().endswith((".jpg", ".jpeg")):
-                        full = os.path.join(root, f)
-                        if full not in self.manual_upload_files:
-                            self.manual_upload_files.append(full)
-            self._update_upload_list()
+            self.upload_scan = self._start_folder_scan(folder, JPEG_EXTENSIONS, self._append_upload_files,
+                                                       self.up_select_folder_btn, self._on_upload_scan_finished)
+
+    def _on_upload_scan_finished(self, found: int, cancelled: bool):
+        self.upload_scan = None
+        self.up_select_folder_btn.setText("📂 Sélectionner dossier")
+        self.status_bar.showMessage(self._scan_finished_message(found, cancelled))
+
+    def _append_upload_files(self, paths: List[str]) -> int:
+        return self.upload_model.add(paths)
+
+    def _remove_selected_upload_files(self):
+        self.upload_model.remove_rows(index.row() for index in self.upload_list.selectionModel().selectedRows())
 
     def _prefill_upload_from_output(self):
         if not self.output_directory:
             QMessageBox.information(self, "Dossier manquant", "Sélectionnez d’abord un dossier de sortie dans l’onglet Conversion.")
             return
-        count_before = len(self.manual_upload_files)
-        for f in os.listdir(self.output_directory):
-            if f.lower().endswith((".jpg", ".jpeg")):
-                full = os.path.join(self.output_directory, f)
-                if full not in self.manual_upload_files:
-                    self.manual_upload_files.append(full)
-        added = len(self.manual_upload_files) - count_before
-        self._update_upload_list()
+        added = self._append_upload_files([os.path.join(self.output_directory, f) for f in sorted(os.listdir(self.output_directory))
+                                           if f.lower().endswith(JPEG_EXTENSIONS)])
         QMessageBox.information(self, "Pré-remplissage", f"{added} fichier(s) ajouté(s) depuis le dossier de sortie.")
 
     def _clear_upload_selection(self):
-        self.manual_upload_files.clear()
-        self._update_upload_list()
-
-    def _update_upload_list(self):
-        self.upload_list.clear()
-        for f in self.manual_upload_files:
-            self.upload_list.addItem(os.path.basename(f))
-        n = len(self.manual_upload_files)
+        self.upload_model.clear()
+
+    def _update_upload_count(self):
+        n = len(self.upload_model.store)
         if n == 0:
             self.upload_count_label.setText("Aucun fichier")
         elif n == 1:
@@ -322,38 +506,79 @@ class ImageProcessorApp(QMainWindow):
 
     # --- Upload logique ---
     def _start_manual_upload(self):
-        if not self.manual_upload_files:
+        if self.upload_scan:
+            QMessageBox.warning(self, "Analyse en cours", "Attendez la fin de l'analyse du dossier (ou arrêtez-la)."); return
+        if not self.upload_model.store:
             QMessageBox.warning(self, "Fichiers manquants", "Ajoutez des fichiers JPG avant d’uploader."); return
         cfg = self.minio_widget.get_config()
         if not (cfg.enabled and cfg.connection_tested):
             QMessageBox.warning(self, "Minio non prêt", "La configuration Minio doit être activée et testée dans l’onglet Conversion."); return
         self.start_upload_btn.setEnabled(False); self.stop_upload_btn.setEnabled(True)
-        self.upload_progress.setValue(0); self.upload_log.clear(); self.upload_status.setText("Initialisation...")
-        self.upload_worker = UploadWorker(self.manual_upload_files.copy(), cfg)
-        self.upload_worker.progress_updated.connect(self.upload_progress.setValue)
-        self.upload_worker.status_updated.connect(self.upload_status.setText)
-        self.upload_worker.file_uploaded.connect(self._on_manual_file_uploaded)
+        self.upload_progress.setValue(0); self.upload_status.setText("Initialisation...")
+        self.upload_worker = UploadWorker(self.upload_model.store.paths(), cfg, self.upload_parallel_spin.value(),
+                                          sync=self.upload_sync_checkbox.isChecked())
         self.upload_worker.upload_finished.connect(self._on_manual_upload_finished)
+        self._start_feed(self.upload_worker.feed, self.upload_log, f"☁️ Upload de {len(self.upload_model.store)} fichier(s)")
         self.upload_worker.start()
 
     def _stop_manual_upload(self):
         if self.upload_worker:
             self.upload_worker.stop()
 
-    def _on_manual_file_uploaded(self, filename: str, success: bool, message: str):
-        base = os.path.basename(filename)
-        prefix = "✅" if success else "❌"
-        self.upload_log.append(f"{prefix} {base} - {message}")
-
     def _on_manual_upload_finished(self, uploaded: int, failed: int, total: int):
         self.start_upload_btn.setEnabled(True); self.stop_upload_btn.setEnabled(False)
+        batch = self.upload_worker.batch
+        feed = self.upload_worker.feed
+        feed.log("\n" + "=" * 40)
+        feed.log(f"☁️ Upload terminé: {uploaded}/{total} envoyé(s)")
+        if batch.sync: feed.log(f"🔄 Sync: {batch.uploaded} nouveau(x), {batch.updated} mis à jour, {batch.skipped} déjà à jour")
+        if batch.retries: feed.log(f"🔁 {batch.retries} nouvelle(s) tentative(s), {batch.retry_seconds:.1f}s passées à réessayer")
+        if failed: feed.log(f"⚠️ {failed} échec(s)")
+        _drain_feed(feed, self.upload_log, self.upload_progress, self.upload_status); feed.close()
         self.upload_status.setText("Terminé")
-        self.upload_log.append("\n" + "=" * 40)
-        self.upload_log.append(f"☁️ Upload terminé: {uploaded}/{total} OK")
-        if failed:
-            self.upload_log.append(f"⚠️ {failed} échec(s)")
-        if self.upload_worker:
-            self.upload_worker.deleteLater(); self.upload_worker = None
+        self.upload_worker.deleteLater(); self.upload_worker = None
+
+    def closeEvent(self, event):
+        # Un QThread détruit en cours d'exécution fait planter l'application
+        for scan in (self.folder_scan, self.upload_scan):
+            if scan:
+                scan.stop(); scan.wait()
+        super().closeEvent(event)
+
+
+def _log_view() -> QPlainTextEdit:
+    """Journal en texte brut, en ajout seul et borné (mise en page incrémentale, coût constant par ligne)."""
+    view = QPlainTextEdit(); view.setReadOnly(True); view.setMaximumBlockCount(LOG_VIEW_MAX_LINES)
+    view.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+    return view
+
+
+def _drain_feed(feed: ProgressFeed, log_view: QPlainTextEdit, progress_bar: QProgressBar, status_label: QLabel) -> dict:
+    """Applique les événements accumulés depuis le dernier rafraîchissement (un seul ajout au journal)."""
+    values, lines, dropped = feed.drain()
+    if dropped: log_view.appendPlainText(f"… {dropped} ligne(s) non affichée(s), voir {feed.log_path or 'le journal complet'}")
+    if lines: log_view.appendPlainText("\n".join(lines))
+    if FEED_PROGRESS in values: progress_bar.setValue(values[FEED_PROGRESS])
+    if FEED_STATUS in values: status_label.setText(values[FEED_STATUS])
+    return values
+
+
+def _on_model_changed(model, slot):
+    """Appelle slot() après toute insertion, suppression ou réinitialisation du modèle."""
+    model.rowsInserted.connect(lambda *_: slot()); model.rowsRemoved.connect(lambda *_: slot())
+    model.modelReset.connect(slot)
+
+
+def _trace_startup(app: QApplication, mode: str):
+    """Écrit sur stderr le temps jusqu'à la fenêtre affichée (premier tour de boucle d'événements),
+    mesuré depuis l'import du package. mode 'exit': quitte aussitôt (mesure scriptable).
+    """
+    from . import IMPORT_STARTED
+    def report():
+        print(f"startup: fenêtre affichée en {(time.perf_counter() - IMPORT_STARTED) * 1000:.0f} ms", file=sys.stderr, flush=True)
+        if mode == "exit":
+            app.quit()
+    QTimer.singleShot(0, report)
 
 
 def main():
@@ -363,4 +588,6 @@ def main():
     app.setOrganizationName("ImageProcessor")
     app.setStyle('Fusion')
     window = ImageProcessorApp(); window.show()
+    if os.getenv(STARTUP_TRACE_ENV):
+        _trace_startup(app, os.environ[STARTUP_TRACE_ENV])
     sys.exit(app.exec())
@@ -0,0 +1,277 @@
+"""Banc de mesure du pipeline de conversion, sans affichage (aucun import Qt).
+
+Trois suites :
+- étapes : chaque étape (redimensionnement, retouches Pillow/NumPy, watermark, overlay texte,
+  encodage JPEG) mesurée sur des images synthétiques de taille capteur réaliste (24/45/61 MP) ;
+- bout en bout : décodage RAW seul, puis BatchConverter sur un dossier de RAW d'exemple,
+  en balayant les modes (processus/threads) et le nombre de workers (avec p50/p95 par étape
+  issus de la télémétrie des ConversionResult) ;
+- démarrage (--startup) : temps d'import de la CLI et de l'interface dans un interpréteur neuf
+  (python -X importtime), dépendances lourdes chargées, et temps jusqu'à l'affichage de la
+  fenêtre (plateforme Qt offscreen si aucune n'est imposée).
+
+Chaque mesure s'exécute dans un processus neuf (spawn) pour que le pic de RSS rapporté
+soit celui de la configuration mesurée. Le rapport est un document JSON.
+
+    python -m raw_converter bench --raw-dir ./echantillons --workers 1,4,8 -o bench.json
+"""
+from __future__ import annotations
+import math
+import multiprocessing
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence
+import numpy as np
+from PIL import Image
+from .processing import (RAW_EXTENSIONS, JPEG_EXTENSIONS, DECODE_MODE_FULL, DECODE_POLICY_AUTO, ENHANCE_BACKENDS,
+                         ENHANCE_BACKEND_PILLOW, ENHANCE_BACKEND_NUMPY, _resize_for_web, _enhance_for_web,
+                         _apply_watermark, _apply_filename_overlay, _decode_raw, encode_jpeg)
+from .pipeline import BatchConverter, EXECUTION_MODES
+from .telemetry import summarize
+
+DEFAULT_MEGAPIXELS = (24, 45, 61)
+DEFAULT_REPEAT = 5
+DEFAULT_QUALITY = 70
+SENSOR_ASPECT = 1.5  # 3:2
+STARTUP_MODULES = ("raw_converter.cli", "raw_converter.app")
+# Dépendances dont le chargement doit être différé au premier traitement / upload
+HEAVY_MODULES = ("numpy", "rawpy", "PIL", "minio", "urllib3")
+STARTUP_TIMEOUT = 120
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def peak_rss_mb() -> Dict[str, Optional[float]]:
+    """Pic de mémoire résidente du processus courant et du plus gros processus enfant terminé.
+    None si la plateforme n'expose pas getrusage (Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return {"self": None, "children": None}
+    scale = 1 if sys.platform == "darwin" else 1024  # ru_maxrss en octets sur macOS, en Kio ailleurs
+    to_mb = lambda usage: round(usage.ru_maxrss * scale / (1024 * 1024), 1)  # noqa: E731
+    return {"self": to_mb(resource.getrusage(resource.RUSAGE_SELF)),
+            "children": to_mb(resource.getrusage(resource.RUSAGE_CHILDREN))}
+
+
+def synthetic_image(megapixels: float, seed: int = 0) -> Image.Image:
+    """Image RGB 3:2 de `megapixels` MP: dégradés + bruit léger (compressible comme une photo)."""
+    height = int(math.sqrt(megapixels * 1e6 / SENSOR_ASPECT))
+    width = int(height * SENSOR_ASPECT)
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    rgb = np.empty((height, width, 3), dtype=np.uint8)
+    noise = rng.normal(0, 6, size=(height, width)).astype(np.float32)
+    rgb[..., 0] = np.clip(x + noise, 0, 255)
+    rgb[..., 1] = np.clip(y + noise, 0, 255)
+    rgb[..., 2] = np.clip((x + y) / 2 - noise, 0, 255)
+    return Image.fromarray(rgb)
+
+
+def _synthetic_watermark(path: str):
+    mark = Image.new("RGBA", (1200, 400), (255, 255, 255, 0))
+    mark.paste((255, 255, 255, 140), (0, 0, 1200, 400))
+    mark.save(path)
+
+
+def _time(fn: Callable[[], object], repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run_stage_suite(megapixels: float, repeat: int = DEFAULT_REPEAT, quality: int = DEFAULT_QUALITY) -> dict:
+    """Mesure chaque étape sur une image synthétique. Les étapes qui modifient l'image travaillent sur une copie
+    préparée hors chronomètre.
+    """
+    source = synthetic_image(megapixels)
+    tmp_dir = tempfile.mkdtemp(prefix="raw_bench_")
+    try:
+        watermark_path = os.path.join(tmp_dir, "watermark.png")
+        _synthetic_watermark(watermark_path)
+        web = _resize_for_web(source)
+        stages = {"resize": summarize(_time(lambda: _resize_for_web(source), repeat))}
+        for backend in ENHANCE_BACKENDS:
+            _enhance_for_web(web, backend)  # préchauffage (buffers NumPy, caches)
+            stages[f"enhance[{backend}]"] = summarize(_time(lambda: _enhance_for_web(web, backend), repeat))
+        # > 1: le noyau NumPy est plus rapide que Pillow sur cette machine (Pillow reste le défaut)
+        numpy_speedup = round(stages[f"enhance[{ENHANCE_BACKEND_PILLOW}]"]["p50_ms"]
+                              / max(stages[f"enhance[{ENHANCE_BACKEND_NUMPY}]"]["p50_ms"], 1e-6), 2)
+        enhanced = _enhance_for_web(web, ENHANCE_BACKEND_PILLOW)
+        copies = [enhanced.copy() for _ in range(repeat + 1)]
+        _apply_watermark(copies.pop(), watermark_path)
+        stages["watermark"] = summarize(_time(lambda: _apply_watermark(copies.pop(), watermark_path), repeat))
+        copies = [enhanced.copy() for _ in range(repeat + 1)]
+        _apply_filename_overlay(copies.pop(), "IMG_0001.CR3")
+        stages["filename_overlay"] = summarize(_time(lambda: _apply_filename_overlay(copies.pop(), "IMG_0001.CR3"), repeat))
+        stages["encode"] = summarize(_time(lambda: encode_jpeg(enhanced, quality), repeat))
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return {"megapixels": megapixels, "size": list(source.size), "output_size": list(web.size),
+            "repeat": repeat, "stages": stages, "enhance_numpy_speedup": numpy_speedup, "peak_rss_mb": peak_rss_mb()}
+
+
+def list_raw_files(raw_dir: str) -> List[str]:
+    return sorted(os.path.join(raw_dir, f) for f in os.listdir(raw_dir)
+                  if os.path.splitext(f)[1].lower() in RAW_EXTENSIONS)
+
+
+def run_decode_suite(files: Sequence[str], decode_mode: str = DECODE_MODE_FULL,
+                     decode_policy: str = DECODE_POLICY_AUTO) -> dict:
+    """Décodage seul, séquentiel, sur chaque RAW d'exemple."""
+    samples, labels, failed = [], set(), 0
+    for path in files:
+        start = time.perf_counter()
+        try:
+            _image, label = _decode_raw(path, decode_mode, decode_policy)
+        except Exception:  # RAW illisible: compté, pas mesuré
+            failed += 1
+            continue
+        samples.append(time.perf_counter() - start)
+        labels.add(label)
+    return {"decode_mode": decode_mode, "decode_policy": decode_policy, "labels": sorted(labels),
+            "failed": failed, "stages": {"decode": summarize(samples)}, "peak_rss_mb": peak_rss_mb()}
+
+
+def run_end_to_end(files: Sequence[str], execution_mode: str, workers: int,
+                   enhance_backend: str = ENHANCE_BACKEND_PILLOW, quality: int = DEFAULT_QUALITY,
+                   decode_mode: str = DECODE_MODE_FULL, decode_policy: str = DECODE_POLICY_AUTO) -> dict:
+    """Lot complet via BatchConverter (sans manifeste, journal de reprise ni upload) dans un dossier temporaire."""
+    out_dir = tempfile.mkdtemp(prefix="raw_bench_out_")
+    input_bytes = sum(os.path.getsize(f) for f in files)
+    try:
+        batch = BatchConverter(list(files), out_dir, quality, watermark_enabled=False,
+                               filename_display_enabled=True, execution_mode=execution_mode,
+                               max_workers=workers, decode_mode=decode_mode, decode_policy=decode_policy,
+                               incremental=False, resume=False, enhance_backend=enhance_backend)
+        start = time.perf_counter()
+        converted, failed, total = batch.run()
+        elapsed = time.perf_counter() - start
+        output_bytes = sum(os.path.getsize(os.path.join(out_dir, f)) for f in os.listdir(out_dir)
+                           if f.lower().endswith(JPEG_EXTENSIONS))
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+    return {
+        "mode": batch.execution_mode, "workers": batch.max_workers, "enhance_backend": enhance_backend,
+        "files": total, "converted": converted, "failed": failed,
+        "seconds": round(elapsed, 3),
+        "files_per_s": round(total / elapsed, 3) if elapsed else None,
+        "input_mb_per_s": round(input_bytes / (1024 * 1024) / elapsed, 2) if elapsed else None,
+        "input_mb": round(input_bytes / (1024 * 1024), 1), "output_mb": round(output_bytes / (1024 * 1024), 2),
+        "telemetry": batch.stats.as_dict(),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def _isolated(fn: Callable, *args, **kwargs):
+    """Exécute fn dans un processus neuf (spawn) et retourne son résultat."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(fn, *args, **kwargs).result()
+
+
+def _startup_env() -> Dict[str, str]:
+    """Environnement d'un interpréteur neuf qui importe ce package depuis les sources."""
+    env = dict(os.environ)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (root, env.get("PYTHONPATH")) if p)
+    return env
+
+
+def measure_import(module: str, top: int = 10) -> dict:
+    """Importe `module` dans un interpréteur neuf (-X importtime): durée totale, imports les plus
+    coûteux (temps propre) et dépendances lourdes chargées par effet de bord.
+    """
+    code = (f"import sys, {module}; "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True,
+                          env=_startup_env(), timeout=STARTUP_TIMEOUT)
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        return {"module": module, "error": proc.stderr.strip().splitlines()[-1:]}
+    entries, total_us = [], 0
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = int(match[1]), int(match[2]), match[3], match[4]
+            entries.append((self_us, name))
+            if len(indent) <= 1:  # import de premier niveau
+                total_us += cumulative_us
+    entries.sort(reverse=True)
+    return {"module": module, "wall_s": round(wall, 3), "import_ms": round(total_us / 1000, 1),
+            "heavy_loaded": [m for m in proc.stdout.strip().split(",") if m],
+            "slowest_self_ms": {name: round(us / 1000, 1) for us, name in entries[:top]}}
+
+
+def measure_window() -> Optional[dict]:
+    """Lance l'interface jusqu'au premier affichage de la fenêtre (RAW_CONVERTER_STARTUP_TRACE=exit).
+    None si PyQt6 n'est pas installé.
+    """
+    import importlib.util
+    if importlib.util.find_spec("PyQt6") is None:
+        return None
+    env = _startup_env()
+    env["RAW_CONVERTER_STARTUP_TRACE"] = "exit"
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-m", "raw_converter"], capture_output=True, text=True,
+                          env=env, timeout=STARTUP_TIMEOUT)
+    wall = time.perf_counter() - start
+    match = re.search(r"startup: fenêtre affichée en (\d+) ms", proc.stderr)
+    return {"platform": env["QT_QPA_PLATFORM"], "wall_s": round(wall, 3),
+            "window_ms": int(match[1]) if match else None, "returncode": proc.returncode}
+
+
+def run_startup_suite() -> dict:
+    return {"imports": [measure_import(module) for module in STARTUP_MODULES], "window": measure_window()}
+
+
+def environment_info() -> dict:
+    import PIL
+    info = {"python": platform.python_version(), "platform": platform.platform(),
+            "machine": platform.machine(), "cpu_count": os.cpu_count(),
+            "numpy": np.__version__, "pillow": PIL.__version__}
+    try:
+        import rawpy
+        info["rawpy"] = rawpy.__version__
+        info["libraw"] = ".".join(str(v) for v in rawpy.libraw_version)
+    except (ImportError, AttributeError):
+        pass
+    return info
+
+
+def run_benchmarks(megapixels: Sequence[float] = DEFAULT_MEGAPIXELS, repeat: int = DEFAULT_REPEAT,
+                   raw_dir: Optional[str] = None, modes: Sequence[str] = EXECUTION_MODES,
+                   workers: Sequence[int] = (1,), enhance_backend: str = ENHANCE_BACKEND_PILLOW,
+                   log: Callable[[str], None] = lambda _msg: None, startup: bool = False) -> dict:
+    """Exécute les suites demandées et retourne le rapport complet (sérialisable en JSON)."""
+    report = {"environment": environment_info(), "startup": None, "stage_suite": [], "decode_suite": None,
+              "end_to_end": []}
+    if startup:
+        log("Démarrage: imports et affichage de la fenêtre...")
+        report["startup"] = run_startup_suite()
+    for mp in megapixels:
+        log(f"Étapes sur image synthétique {mp} MP...")
+        report["stage_suite"].append(_isolated(run_stage_suite, mp, repeat))
+    if raw_dir:
+        files = list_raw_files(raw_dir)
+        if not files:
+            raise ValueError(f"Aucun fichier RAW dans {raw_dir}")
+        log(f"Décodage seul de {len(files)} RAW...")
+        report["decode_suite"] = _isolated(run_decode_suite, files)
+        for mode in modes:
+            for count in workers:
+                log(f"Bout en bout: {mode}, {count} worker(s)...")
+                report["end_to_end"].append(_isolated(run_end_to_end, files, mode, count, enhance_backend))
+    return report
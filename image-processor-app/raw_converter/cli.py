@@ -0,0 +1,414 @@
+"""Interface en ligne de commande headless (aucun import Qt).
+
+Exemples:
+    python -m raw_converter convert "/cartes/**/*.CR3" -o ./jpeg --quality 80 --minio-bucket galerie
+    python -m raw_converter watch /tethering -o ./jpeg --minio-bucket galerie   # jusqu'à Ctrl+C
+
+La progression est écrite sur stdout au format JSON lines (un objet JSON par ligne).
+"""
+from __future__ import annotations
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Sequence
+from .minio_config import (MinioConfig, DEFAULT_MINIO_ENDPOINT, DEFAULT_MINIO_ACCESS_KEY, DEFAULT_UPLOAD_RETRIES,
+                           DEFAULT_MAX_PAUSE_MINUTES)
+from .pipeline import BatchConverter, EXECUTION_MODES, EXECUTION_MODE_PROCESS, DEFAULT_UPLOAD_CONCURRENCY
+from .remote_sync import BatchUploader
+from .scanner import FolderScanner
+from .watcher import FolderWatcher, DEFAULT_SETTLE_TIME, DEFAULT_POLL_INTERVAL
+from .ordering import ORDER_POLICIES, ORDER_SELECTION
+from .processing import (RAW_EXTENSIONS, JPEG_EXTENSIONS, DECODE_MODES, DECODE_MODE_FULL, DECODE_POLICIES, DECODE_POLICY_AUTO,
+                         ENHANCE_BACKENDS, ENHANCE_BACKEND_PILLOW, PRIMARY_RENDITION, RENDITION_PRESETS, Rendition)
+
+DEFAULT_SYNC_WORKERS = 8
+
+
+def expand_inputs(inputs: Sequence[str], extensions: Sequence[str] = RAW_EXTENSIONS) -> List[str]:
+    """Résout chemins, dossiers (récursif) et globs en une liste de fichiers (RAW par défaut)
+    sans doublons, ordre conservé.
+    """
+    found: List[str] = []
+    seen = set()
+
+    def _add(path: str):
+        full = os.path.abspath(path)
+        if full not in seen:
+            seen.add(full)
+            found.append(full)
+
+    for item in inputs:
+        if os.path.isdir(item):
+            for path in FolderScanner([item], extensions).iter_files():
+                _add(path)
+        elif os.path.isfile(item):
+            _add(item)
+        else:
+            for match in sorted(glob.glob(item, recursive=True)):
+                if os.path.isfile(match) and Path(match).suffix.lower() in extensions:
+                    _add(match)
+    return found
+
+
+class JsonLinesReporter:
+    """Écrit un événement JSON par ligne (flush immédiat pour les scripts qui lisent le flux).
+    Thread-safe: le thread de conversion et les threads d'upload émettent en parallèle.
+    """
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self._start = time.monotonic()
+        self._lock = threading.Lock()
+
+    def emit(self, event: str, **fields):
+        payload = {"event": event, "t": round(time.monotonic() - self._start, 3)}
+        payload.update(fields)
+        line = json.dumps(payload, ensure_ascii=False) + "\n"
+        with self._lock:  # une ligne entière par écriture, jamais entrelacée
+            self.stream.write(line)
+            self.stream.flush()
+
+
+def _minio_config_from_args(args) -> Optional[MinioConfig]:
+    if not args.minio_bucket:
+        return None
+    cfg = MinioConfig()
+    cfg.enabled = True
+    cfg.endpoint = args.minio_endpoint
+    cfg.access_key = args.minio_access_key
+    cfg.secret_key = args.minio_secret_key
+    cfg.bucket = args.minio_bucket
+    cfg.use_ssl = not args.minio_no_ssl
+    cfg.prefix = args.prefix or ""
+    cfg.upload_retries = max(0, args.upload_retries)
+    cfg.max_pause_minutes = max(0.0, args.max_pause)
+    # Pas de test interactif en headless: ensure_bucket valide l'accès au démarrage du lot
+    cfg.connection_tested = cfg.is_valid()
+    return cfg
+
+
+def _add_minio_arguments(parser: argparse.ArgumentParser, title: str) -> argparse._ArgumentGroup:
+    minio = parser.add_argument_group(title)
+    minio.add_argument("--minio-endpoint", default=DEFAULT_MINIO_ENDPOINT)
+    minio.add_argument("--minio-access-key", default=DEFAULT_MINIO_ACCESS_KEY)
+    minio.add_argument("--minio-secret-key", default=os.getenv("MINIO_SECRET_KEY", ""),
+                       help="Défaut: variable d'environnement MINIO_SECRET_KEY")
+    minio.add_argument("--minio-bucket")
+    minio.add_argument("--minio-no-ssl", action="store_true", help="Connexion HTTP au lieu de HTTPS")
+    minio.add_argument("--prefix", help="Dossier distant fixe (défaut: dossier du jour AAAA-MM-JJ; en --sync, celui retenu pour ce dossier local)")
+    minio.add_argument("--upload-retries", type=int, default=DEFAULT_UPLOAD_RETRIES, metavar="N",
+                       help=f"Nouvelles tentatives par fichier sur erreur réseau passagère (défaut: {DEFAULT_UPLOAD_RETRIES})")
+    minio.add_argument("--max-pause", type=float, default=DEFAULT_MAX_PAUSE_MINUTES, metavar="MIN",
+                       help="Pause maximale des uploads quand le serveur est injoignable, avant d'abandonner "
+                            f"les fichiers restants (défaut: {DEFAULT_MAX_PAUSE_MINUTES} min)")
+    return minio
+
+
+def parse_rendition(spec: str) -> Rendition:
+    """NOM[:TAILLE[:QUALITÉ[:OPTIONS]]], OPTIONS parmi nowatermark,nooverlay (séparées par des virgules).
+    Un nom de préréglage seul (thumb, large) reprend ses réglages.
+    """
+    parts = spec.split(":")
+    name = parts[0].strip()
+    if not name or name == PRIMARY_RENDITION or not name.replace("-", "").replace("_", "").isalnum():
+        raise argparse.ArgumentTypeError(f"nom de déclinaison invalide: {name!r}")
+    if len(parts) == 1:
+        if name not in RENDITION_PRESETS:
+            raise argparse.ArgumentTypeError(f"déclinaison inconnue {name!r} (préréglages: {', '.join(RENDITION_PRESETS)})")
+        return RENDITION_PRESETS[name]
+    try:
+        size = int(parts[1])
+        quality = int(parts[2]) if len(parts) > 2 and parts[2] else None
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"taille/qualité invalide dans {spec!r}")
+    options = {o.strip() for o in parts[3].split(",")} if len(parts) > 3 else set()
+    unknown = options - {"nowatermark", "nooverlay", ""}
+    if unknown or size < 16 or (quality is not None and not 10 <= quality <= 100):
+        raise argparse.ArgumentTypeError(f"déclinaison invalide: {spec!r}")
+    return Rendition(name, size, quality, watermark="nowatermark" not in options, overlay="nooverlay" not in options)
+
+
+def _float_list(value: str) -> List[float]:
+    return [float(v) for v in value.split(",") if v]
+
+
+def _add_conversion_arguments(conv: argparse.ArgumentParser):
+    """Options communes à convert et watch."""
+    conv.add_argument("-o", "--output", help="Dossier de sortie des JPEG (obligatoire sauf avec --no-local)")
+    conv.add_argument("-q", "--quality", type=int, default=70, help="Qualité JPEG 10-100 (défaut: 70)")
+    conv.add_argument("--watermark", help="Image PNG du watermark (désactivé si absent)")
+    conv.add_argument("--no-filename-overlay", action="store_true", help="Ne pas inscrire le nom du fichier")
+    conv.add_argument("--font", help="Police TrueType de l'overlay (défaut: recherche multi-plateforme)")
+    conv.add_argument("--mode", choices=EXECUTION_MODES, default=EXECUTION_MODE_PROCESS, help="Moteur d'exécution")
+    conv.add_argument("-j", "--workers", type=int, default=None, help="Nombre de workers (défaut selon le mode)")
+    conv.add_argument("--memory-budget", type=int, default=None, metavar="MO",
+                      help="RAM maximale des conversions simultanées, en Mo (défaut: moitié de la RAM physique)")
+    conv.add_argument("--decode", choices=DECODE_MODES, default=DECODE_MODE_FULL, help="Mode de décodage RAW")
+    conv.add_argument("--decode-policy", choices=DECODE_POLICIES, default=DECODE_POLICY_AUTO,
+                      help="Choix half_size/dématriçage selon la taille cible")
+    conv.add_argument("--enhance", choices=ENHANCE_BACKENDS, default=ENHANCE_BACKEND_PILLOW,
+                      help="Moteur contraste/saturation/netteté (numpy: noyau fusionné expérimental, "
+                           "identique à Pillow; comparer avec `bench` avant de l'utiliser)")
+    conv.add_argument("--rendition", type=parse_rendition, action="append", default=[], metavar="SPEC",
+                      help="Déclinaison supplémentaire issue du même décodage, nommée <nom>_<NOM>.jpg: "
+                           "NOM:TAILLE[:QUALITÉ[:nowatermark,nooverlay]] ou préréglage (thumb, large). Répétable")
+    conv.add_argument("--order", choices=ORDER_POLICIES, default=ORDER_SELECTION,
+                      help="Ordre de conversion: selection, smallest (plus petits d'abord: premiers JPEG plus vite), "
+                           "newest (prises de vue récentes d'abord, date EXIF), priority (fichiers --first puis sélection)")
+    conv.add_argument("--first", action="append", default=[], metavar="CHEMIN",
+                      help="Fichier, dossier ou glob à convertir en premier, quel que soit l'ordre. Répétable")
+    conv.add_argument("--force", action="store_true",
+                      help="Reconvertit tout, même les fichiers à jour d'après le manifeste ou le journal de reprise")
+    conv.add_argument("--no-resume", action="store_true",
+                      help="Ignore le journal de reprise (un lot interrompu repart de zéro)")
+    conv.add_argument("--hash", action="store_true",
+                      help="Vérifie aussi le contenu des RAW (empreinte) pour la détection des fichiers à jour")
+    minio = _add_minio_arguments(conv, "Minio (upload activé si --minio-bucket est fourni)")
+    minio.add_argument("--no-local", action="store_true",
+                       help="N'écrit pas les JPEG sur disque: encodage en mémoire et upload direct (requiert --minio-bucket)")
+    minio.add_argument("--upload-workers", type=int, default=DEFAULT_UPLOAD_CONCURRENCY,
+                       help=f"Uploads simultanés (défaut: {DEFAULT_UPLOAD_CONCURRENCY})")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="raw_converter",
+                                     description="Convertisseur RAW vers JPEG (sans argument: interface graphique)")
+    sub = parser.add_subparsers(dest="command")
+    conv = sub.add_parser("convert", help="Convertit un lot de fichiers RAW sans interface graphique")
+    conv.add_argument("inputs", nargs="+", help="Fichiers, dossiers ou globs (ex: '/cartes/**/*.CR3')")
+    _add_conversion_arguments(conv)
+    watch = sub.add_parser("watch", help="Surveille un dossier et convertit les RAW au fil de leur arrivée (jusqu'à Ctrl+C)")
+    watch.add_argument("folder", help="Dossier surveillé (sous-dossiers compris)")
+    watch.add_argument("--settle", type=float, default=DEFAULT_SETTLE_TIME, metavar="S",
+                       help=f"Secondes sans changement de taille avant de convertir un fichier (défaut: {DEFAULT_SETTLE_TIME:g})")
+    watch.add_argument("--poll", type=float, default=DEFAULT_POLL_INTERVAL, metavar="S",
+                       help=f"Secondes entre deux analyses du dossier (défaut: {DEFAULT_POLL_INTERVAL:g})")
+    _add_conversion_arguments(watch)
+    up = sub.add_parser("upload", help="Uploade (ou synchronise) des JPEG existants vers Minio")
+    up.add_argument("inputs", nargs="+", help="Fichiers JPEG, dossiers ou globs")
+    up_minio = _add_minio_arguments(up, "Minio")
+    up_minio.add_argument("--sync", action="store_true",
+                          help="N'envoie que les fichiers absents ou modifiés (taille/ETag) dans le dossier distant")
+    up.add_argument("--no-resume", action="store_true",
+                    help="Ignore le journal de reprise (renvoie aussi les fichiers déjà uploadés par un lot interrompu)")
+    up_minio.add_argument("--upload-workers", type=int, default=DEFAULT_SYNC_WORKERS,
+                          help=f"Uploads simultanés (défaut: {DEFAULT_SYNC_WORKERS})")
+    bench = sub.add_parser("bench", help="Mesure les étapes et le débit du pipeline (rapport JSON)")
+    bench.add_argument("--megapixels", type=_float_list, default=[24, 45, 61],
+                       help="Tailles des images synthétiques en MP (défaut: 24,45,61)")
+    bench.add_argument("--repeat", type=int, default=5, help="Répétitions par étape (défaut: 5)")
+    bench.add_argument("--raw-dir", help="Dossier de RAW d'exemple pour le décodage et le bout en bout")
+    bench.add_argument("--modes", type=lambda v: [m for m in v.split(",") if m], default=list(EXECUTION_MODES),
+                       help="Modes d'exécution à balayer (défaut: process,thread)")
+    bench.add_argument("--workers", type=lambda v: [int(w) for w in v.split(",") if w], default=[1, 2, 4],
+                       help="Nombres de workers à balayer (défaut: 1,2,4)")
+    bench.add_argument("--enhance", choices=ENHANCE_BACKENDS, default=ENHANCE_BACKEND_PILLOW)
+    bench.add_argument("--startup", action="store_true",
+                       help="Mesure aussi le démarrage: temps d'import (CLI, interface) et affichage de la fenêtre")
+    bench.add_argument("-o", "--output", help="Fichier JSON du rapport (défaut: stdout)")
+    return parser
+
+
+def _batch_from_args(args, files: List[str], reporter: JsonLinesReporter, on_file) -> Optional[BatchConverter]:
+    """Valide les options communes à convert et watch et construit le BatchConverter (None si invalides)."""
+    minio_config = _minio_config_from_args(args)
+    if minio_config and not minio_config.connection_tested:
+        reporter.emit("error", message="Configuration Minio incomplète (endpoint, clés, bucket)")
+        return None
+    if args.no_local and minio_config is None:
+        reporter.emit("error", message="--no-local requiert l'upload Minio (--minio-bucket)")
+        return None
+    if not args.no_local and not args.output:
+        reporter.emit("error", message="Dossier de sortie requis (-o/--output)")
+        return None
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+    names = [r.name for r in args.rendition]
+    if len(set(names)) != len(names):
+        reporter.emit("error", message="Noms de déclinaisons en double")
+        return None
+    return BatchConverter(
+        files, args.output or "", max(10, min(100, args.quality)),
+        watermark_enabled=bool(args.watermark), watermark_path=args.watermark,
+        filename_display_enabled=not args.no_filename_overlay,
+        minio_config=minio_config, execution_mode=args.mode, max_workers=args.workers,
+        decode_mode=args.decode, decode_policy=args.decode_policy,
+        incremental=not args.force, resume=not args.no_resume, verify_hash=args.hash, font_path=args.font,
+        enhance_backend=args.enhance,
+        on_status=lambda msg: reporter.emit("status", message=msg),
+        on_file=on_file,
+        on_upload=lambda filename, ok, msg, retries, retry_s: reporter.emit(
+            "upload", file=filename, success=ok, message=msg, retries=retries, retry_s=round(retry_s, 3)),
+        upload_concurrency=args.upload_workers, write_local=not args.no_local,
+        memory_budget_mb=args.memory_budget, extra_renditions=args.rendition,
+        order=args.order, priority=expand_inputs(args.first),
+    )
+
+
+def _file_event(reporter: JsonLinesReporter, result, completed: int, total: int):
+    reporter.emit("file", file=result.filename, success=result.success, status=result.status,
+                  message=result.message, completed=completed, total=total,
+                  timings={stage: round(sec, 4) for stage, sec in result.timings.items()},
+                  input_bytes=result.input_bytes, output_bytes=result.output_bytes,
+                  output_size=list(result.output_size) if result.output_size else None,
+                  worker=result.worker)
+
+
+def _finished_event(reporter: JsonLinesReporter, batch: BatchConverter, converted: int, failed: int, total: int) -> int:
+    reporter.emit("finished", converted=converted, skipped=batch.skipped, resumed=batch.resumed, failed=failed,
+                  cancelled=batch.cancelled, total=total,
+                  peak_in_flight=batch.peak_in_flight,
+                  uploaded=batch.uploaded, upload_failed=batch.upload_failed, telemetry=batch.stats.as_dict())
+    return 0 if failed == 0 and batch.upload_failed == 0 else 1
+
+
+def cmd_convert(args, reporter: JsonLinesReporter) -> int:
+    files = expand_inputs(args.inputs)
+    if not files:
+        reporter.emit("error", message="Aucun fichier RAW trouvé")
+        return 2
+    total = len(files)
+    state = {"completed": 0}
+
+    def on_file(result):
+        state["completed"] += 1
+        _file_event(reporter, result, state["completed"], total)
+
+    batch = _batch_from_args(args, files, reporter, on_file)
+    if batch is None:
+        return 2
+    reporter.emit("start", total=total, output=os.path.abspath(batch.output_dir) if batch.output_dir else None,
+                  mode=batch.execution_mode, workers=batch.max_workers, order=batch.order,
+                  memory_budget_mb=batch.memory_budget // (1024 * 1024))
+    try:
+        converted, failed, total = batch.run()
+    except KeyboardInterrupt:
+        batch.stop()
+        reporter.emit("interrupted", completed=state["completed"], total=total)
+        return 130
+    return _finished_event(reporter, batch, converted, failed, total)
+
+
+def cmd_watch(args, reporter: JsonLinesReporter) -> int:
+    """Tourne jusqu'à Ctrl+C, puis termine les fichiers déjà reçus (un second Ctrl+C annule les conversions en cours)."""
+    if not os.path.isdir(args.folder):
+        reporter.emit("error", message=f"Dossier introuvable: {args.folder}")
+        return 2
+    state = {"completed": 0}
+    watcher = FolderWatcher([args.folder], RAW_EXTENSIONS, settle_time=args.settle, poll_interval=args.poll)
+
+    def on_file(result):
+        state["completed"] += 1
+        _file_event(reporter, result, state["completed"], len(batch.files))
+
+    batch = _batch_from_args(args, [], reporter, on_file)
+    if batch is None:
+        return 2
+    reporter.emit("start", watch=watcher.roots[0], output=os.path.abspath(batch.output_dir) if batch.output_dir else None,
+                  mode=batch.execution_mode, workers=batch.max_workers, order=batch.order,
+                  memory_budget_mb=batch.memory_budget // (1024 * 1024))
+    outcome = {}
+    done = threading.Event()
+
+    def run():
+        try:
+            outcome["result"] = batch.watch(watcher, lambda settling, queued, uploads: reporter.emit(
+                "backlog", settling=settling, queued=queued, uploads=uploads))
+        except Exception as e:
+            outcome["error"] = e
+        finally:
+            done.set()
+
+    # Surveillance dans un thread: le thread principal reste libre de recevoir Ctrl+C
+    threading.Thread(target=run, name="watch", daemon=True).start()
+    try:
+        while not done.wait(0.5):
+            pass
+    except KeyboardInterrupt:
+        batch.stop()
+        reporter.emit("stopping", completed=state["completed"], total=len(batch.files))
+        try:
+            done.wait()
+        except KeyboardInterrupt:
+            batch.stop()  # second stop(): annule les conversions en cours
+            reporter.emit("interrupted", completed=state["completed"], total=len(batch.files))
+            return 130
+    if "error" in outcome:
+        reporter.emit("error", message=str(outcome["error"]))
+        return 1
+    converted, failed, total = outcome["result"]
+    return _finished_event(reporter, batch, converted, failed, total)
+
+
+def cmd_upload(args, reporter: JsonLinesReporter) -> int:
+    files = expand_inputs(args.inputs, JPEG_EXTENSIONS)
+    if not files:
+        reporter.emit("error", message="Aucun fichier JPEG trouvé")
+        return 2
+    minio_config = _minio_config_from_args(args)
+    if minio_config is None or not minio_config.connection_tested:
+        reporter.emit("error", message="Configuration Minio incomplète (endpoint, clés, bucket)")
+        return 2
+    total = len(files)
+    batch = BatchUploader(
+        files, minio_config, args.upload_workers, sync=args.sync, resume=not args.no_resume,
+        on_status=lambda msg: reporter.emit("status", message=msg),
+        on_file=lambda path, ok, msg, retries, retry_s: reporter.emit(
+            "upload", file=os.path.basename(path), success=ok, message=msg, retries=retries, retry_s=round(retry_s, 3)),
+    )
+    reporter.emit("start", total=total, bucket=minio_config.bucket, sync=args.sync)
+    try:
+        _sent, failed, total = batch.run()
+    except KeyboardInterrupt:
+        batch.stop()
+        reporter.emit("interrupted", total=total)
+        return 130
+    reporter.emit("finished", uploaded=batch.uploaded, updated=batch.updated, skipped=batch.skipped,
+                  failed=failed, total=total, upload_retries=batch.retries, upload_retry_s=round(batch.retry_seconds, 3))
+    return 0 if failed == 0 else 1
+
+
+def cmd_bench(args) -> int:
+    from .benchmark import run_benchmarks
+    invalid = [m for m in args.modes if m not in EXECUTION_MODES]
+    if invalid:
+        print(f"Mode(s) inconnu(s): {', '.join(invalid)}", file=sys.stderr)
+        return 2
+    try:
+        report = run_benchmarks(args.megapixels, args.repeat, args.raw_dir, args.modes, args.workers,
+                                args.enhance, log=lambda msg: print(msg, file=sys.stderr, flush=True),
+                                startup=args.startup)
+    except (OSError, ValueError, subprocess.SubprocessError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        from . import main as gui_main
+        gui_main()
+        return 0
+    if args.command == "convert":
+        return cmd_convert(args, JsonLinesReporter())
+    if args.command == "watch":
+        return cmd_watch(args, JsonLinesReporter())
+    if args.command == "upload":
+        return cmd_upload(args, JsonLinesReporter())
+    if args.command == "bench":
+        return cmd_bench(args)
+    parser.print_help()
+    return 2
@@ -0,0 +1,150 @@
+"""Noyau NumPy fusionné pour les retouches web (contraste, saturation, netteté).
+
+Alternative vectorisée à la chaîne Pillow de processing._apply_web_optimizations
+(ImageEnhance.Contrast -> ImageEnhance.Color -> ImageFilter.UnsharpMask) :
+les trois étapes sont appliquées en place sur un tableau float32, avec des
+buffers préalloués et réutilisés par thread pour une même taille d'image.
+Pillow reste le backend par défaut: le noyau n'est plus rapide que là où `python -m raw_converter
+bench` le mesure (colonne enhance[numpy] contre enhance[pillow]); à vérifier sur chaque machine.
+
+Tolérance par rapport au chemin Pillow (mêmes paramètres) : écart <= ENHANCE_MAX_ABS_DIFF
+niveau sur 255 par canal. Le noyau reproduit les arrondis de Pillow (luminance en virgule
+fixe, troncature des mélanges, passes de flou boîte arrondies, seuil strict du masque) et
+donne un résultat identique au bit près sur nos images de test ; un écart d'un niveau reste
+possible sur des arrondis exactement à mi-chemin.
+"""
+from __future__ import annotations
+import math
+import threading
+from typing import Dict, Tuple
+import numpy as np
+
+CONTRAST_FACTOR = 1.1
+SATURATION_FACTOR = 1.08
+UNSHARP_RADIUS = 0.8
+UNSHARP_PERCENT = 150
+UNSHARP_THRESHOLD = 3
+ENHANCE_MAX_ABS_DIFF = 1
+
+# Coefficients de luminance ITU-R 601 en virgule fixe 16 bits (identiques à Image.convert('L'))
+_LUMA = np.array([19595, 38470, 7471], dtype=np.float64) / 65536
+
+
+def box_blur_weights(radius: float, passes: int = 3) -> Tuple[float, float]:
+    """Poids (centre, voisins) d'une passe du flou boîte utilisé par GaussianBlur de Pillow
+    pour un rayon < 1 (un voisin de chaque côté, pondéré par la partie fractionnaire).
+    """
+    sigma2 = radius * radius / passes
+    size = math.sqrt(12 * sigma2 + 1)
+    whole = int((size - 1) // 2)
+    frac = ((2 * whole + 1) * (whole * (whole + 1) - 3 * sigma2)
+            / (6 * (sigma2 - (whole + 1) * (whole + 1))))
+    if whole != 0:
+        raise ValueError("rayon de netteté >= 1 non pris en charge par le noyau fusionné")
+    center = 1.0 / (2 * frac + 1)
+    return center, (1.0 - center) / 2
+
+
+class EnhancementKernel:
+    """Buffers préalloués (plans R, G, B contigus) pour une taille (H, W) donnée: chaque étape
+    travaille en place sur ces buffers float32, sans tableau temporaire.
+    Non thread-safe: une instance par thread.
+    """
+    def __init__(self, height: int, width: int, radius: float = UNSHARP_RADIUS, passes: int = 3):
+        self.weights = box_blur_weights(radius, passes)
+        self.passes = passes
+        shape = (3, height, width)
+        self.shape = shape
+        self._work = np.empty(shape, dtype=np.float32)
+        self._blur = np.empty(shape, dtype=np.float32)
+        self._scratch = np.empty(shape, dtype=np.float32)
+        self._luma = np.empty((height, width), dtype=np.float32)
+        self._luma_tmp = np.empty((height, width), dtype=np.float32)
+        self._mask = np.empty(shape, dtype=bool)
+
+    def _luminance(self, work: np.ndarray) -> np.ndarray:
+        """Luminance arrondie comme Image.convert('L'), calculée dans le buffer dédié."""
+        luma, tmp = self._luma, self._luma_tmp
+        np.multiply(work[0], _LUMA[0], out=luma)
+        np.multiply(work[1], _LUMA[1], out=tmp); luma += tmp
+        np.multiply(work[2], _LUMA[2], out=tmp); luma += tmp
+        luma += 0.5
+        return np.floor(luma, out=luma)
+
+    def _blur_pass(self, cur: np.ndarray, neighbours: np.ndarray):
+        """Une passe à 3 coefficients, arrondie comme Pillow: cur = centre * cur + voisin * (gauche + droite).
+        `neighbours` contient déjà gauche + droite (bords répliqués).
+        """
+        center, side = self.weights
+        neighbours *= side; cur *= center; cur += neighbours
+        np.rint(cur, out=cur)
+
+    def _blur_into(self, work: np.ndarray, out: np.ndarray):
+        """Flou: 3 passes horizontales puis 3 verticales, dans `out`. Les sommes de voisins sont
+        calculées sur les buffers contigus aplatis; seules les colonnes (ou lignes) de bord, où
+        l'aplatissement mélange deux lignes, sont recalculées avec le pixel répliqué.
+        """
+        sums = self._scratch
+        np.copyto(out, work)
+        flat, flat_sums = out.reshape(-1), sums.reshape(-1)
+        _, height, width = self.shape
+        # Voisin intérieur des bords: sur une image d'un pixel de large (ou haut), le pixel lui-même
+        col_1, col_2 = min(1, width - 1), max(width - 2, 0)
+        row_1, row_2 = min(1, height - 1), max(height - 2, 0)
+        for _ in range(self.passes):
+            np.add(flat[:-2], flat[2:], out=flat_sums[1:-1])
+            np.add(out[:, :, 0], out[:, :, col_1], out=sums[:, :, 0])
+            np.add(out[:, :, col_2], out[:, :, -1], out=sums[:, :, -1])
+            self._blur_pass(out, sums)
+        for _ in range(self.passes):
+            np.add(out[:, :-2], out[:, 2:], out=sums[:, 1:-1])
+            np.add(out[:, 0], out[:, row_1], out=sums[:, 0])
+            np.add(out[:, row_2], out[:, -1], out=sums[:, -1])
+            self._blur_pass(out, sums)
+
+    def apply(self, rgb: np.ndarray, contrast: float = CONTRAST_FACTOR, saturation: float = SATURATION_FACTOR,
+              percent: int = UNSHARP_PERCENT, threshold: int = UNSHARP_THRESHOLD) -> np.ndarray:
+        """Applique contraste, saturation et masque flou sur un tableau uint8 (H, W, 3)."""
+        work = self._work
+        np.copyto(work, rgb.transpose(2, 0, 1), casting='unsafe')
+        # Contraste: mélange avec un gris uniforme à la luminance moyenne (troncature comme Image.blend)
+        mean = float(int(self._luminance(work).mean() + 0.5))
+        work -= mean; work *= contrast; work += mean
+        np.clip(work, 0, 255, out=work); np.floor(work, out=work)
+        # Saturation: mélange avec la version en niveaux de gris
+        luma = self._luminance(work)
+        luma3 = luma[None, :, :]
+        work -= luma3; work *= saturation; work += luma3
+        np.clip(work, 0, 255, out=work); np.floor(work, out=work)
+        # Netteté: masque flou, appliqué seulement là où |différence| > seuil (comme Pillow)
+        diff = self._blur
+        self._blur_into(work, diff)
+        np.subtract(work, diff, out=diff)
+        np.greater(np.abs(diff, out=self._scratch), threshold, out=self._mask)
+        diff *= percent / 100.0
+        np.trunc(diff, out=diff)
+        diff *= self._mask  # multiplication par le masque: bien plus rapide qu'un add(where=...)
+        work += diff
+        np.clip(work, 0, 255, out=work)
+        return work.transpose(1, 2, 0).astype(np.uint8)
+
+
+_local = threading.local()
+
+
+def _kernel_for(height: int, width: int) -> EnhancementKernel:
+    kernels: Dict[Tuple[int, int], EnhancementKernel] = getattr(_local, "kernels", None)
+    if kernels is None:
+        kernels = _local.kernels = {}
+    kernel = kernels.get((height, width))
+    if kernel is None:
+        if len(kernels) >= 4:  # quelques tailles seulement (paysage/portrait)
+            kernels.clear()
+        kernel = kernels[(height, width)] = EnhancementKernel(height, width)
+    return kernel
+
+
+def enhance_array(rgb: np.ndarray) -> np.ndarray:
+    """Point d'entrée: retouches web fusionnées sur un tableau RGB uint8, buffers réutilisés par thread."""
+    height, width = rgb.shape[:2]
+    return _kernel_for(height, width).apply(rgb)
@@ -0,0 +1,157 @@
+"""Journal de lots persistant (SQLite), pour reprendre un lot interrompu là où il s'est arrêté.
+
+Chaque lot (conversion ou upload) est un « job » identifié par une clé stable (réglages, destination,
+fichiers). Le journal mémorise pour chaque fichier source son état (queued -> converted -> uploaded,
+ou failed) et sa signature (taille, mtime). Après un plantage, une mise en veille ou un arrêt, relancer
+le même lot retrouve le job non terminé: les fichiers déjà convertis ne sont pas redécodés et les
+fichiers déjà uploadés ne sont pas renvoyés. Un job terminé sans échec est effacé du journal.
+
+SQLite en mode WAL avec synchronous=NORMAL: chaque transition est validée immédiatement (pas de
+fsync par transaction), ce qui reste de l'ordre de la dizaine de microsecondes par fichier.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+JOURNAL_FILENAME = ".raw_converter_journal.sqlite"
+JOURNAL_VERSION = 1
+# Journal des lots sans dossier de sortie (upload direct, onglet upload)
+USER_JOURNAL_DIR = os.path.join(os.path.expanduser("~"), ".raw_converter")
+
+JOB_CONVERT = "convert"
+JOB_UPLOAD = "upload"
+
+STATE_QUEUED = "queued"
+STATE_CONVERTED = "converted"
+STATE_UPLOADED = "uploaded"
+STATE_FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    upload_prefix TEXT,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_key ON jobs (key);
+CREATE TABLE IF NOT EXISTS files (
+    job_id INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    state TEXT NOT NULL,
+    size INTEGER,
+    mtime_ns INTEGER,
+    PRIMARY KEY (job_id, path)
+) WITHOUT ROWID;
+"""
+
+
+def journal_path(output_dir: Optional[str] = None) -> str:
+    """Journal à côté des JPEG produits, sinon dans le dossier utilisateur."""
+    return os.path.join(output_dir or USER_JOURNAL_DIR, JOURNAL_FILENAME)
+
+
+def job_key(kind: str, *parts: object, files: Iterable[str] = ()) -> str:
+    """Clé stable d'un lot: type, réglages/destination, et ensemble des fichiers (ordre indifférent)."""
+    digest = hashlib.sha1(json.dumps([kind, [str(p) for p in parts]]).encode("utf-8"))
+    for path in sorted(os.path.abspath(f) for f in files):
+        digest.update(path.encode("utf-8", "surrogatepass") + b"\0")
+    return digest.hexdigest()
+
+
+def file_signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+class JobJournal:
+    """Journal SQLite d'un job. Thread-safe (conversion et threads d'upload y écrivent)."""
+    def __init__(self, path: str, kind: str, key: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        if self._db.execute("PRAGMA user_version").fetchone()[0] != JOURNAL_VERSION:
+            self._db.executescript("DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS jobs;")
+            self._db.execute(f"PRAGMA user_version={JOURNAL_VERSION}")
+        self._db.executescript(_SCHEMA)
+        row = self._db.execute("SELECT id, upload_prefix FROM jobs WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+        self.resumed = row is not None
+        if row is None:
+            self.job_id = self._db.execute("INSERT INTO jobs (kind, key, created) VALUES (?, ?, ?)",
+                                           (kind, key, time.time())).lastrowid
+            self.upload_prefix: Optional[str] = None
+        else:
+            self.job_id, self.upload_prefix = row
+
+    def states(self) -> Dict[str, Tuple[str, Optional[int], Optional[int]]]:
+        """Chemin -> (état, taille, mtime_ns) des fichiers déjà journalisés pour ce job."""
+        with self._lock:
+            rows = self._db.execute("SELECT path, state, size, mtime_ns FROM files WHERE job_id = ?", (self.job_id,))
+            return {path: (state, size, mtime_ns) for path, state, size, mtime_ns in rows}
+
+    def resume_state(self, states: Dict[str, Tuple[str, Optional[int], Optional[int]]], path: str) -> Optional[str]:
+        """État journalisé de `path` si le fichier n'a pas changé depuis, sinon None."""
+        entry = states.get(os.path.abspath(path))
+        if entry is None or entry[0] in (STATE_QUEUED, STATE_FAILED):
+            return None
+        return entry[0] if file_signature(path) == (entry[1], entry[2]) else None
+
+    def set_upload_prefix(self, prefix: Optional[str]):
+        """Dossier distant du job: une reprise renvoie dans le même dossier, même le lendemain."""
+        with self._lock:
+            self._db.execute("UPDATE jobs SET upload_prefix = ? WHERE id = ?", (prefix, self.job_id))
+            self.upload_prefix = prefix
+
+    def queue(self, paths: Sequence[str]):
+        """Enregistre les fichiers du lot (une seule transaction), sans toucher aux états déjà connus."""
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.executemany("INSERT OR IGNORE INTO files (job_id, path, state) VALUES (?, ?, ?)",
+                                 ((self.job_id, os.path.abspath(p), STATE_QUEUED) for p in paths))
+            self._db.execute("COMMIT")
+
+    def mark(self, path: str, state: str):
+        """Transition d'un fichier, validée immédiatement (avec la signature actuelle de la source)."""
+        signature = file_signature(path) or (None, None)
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO files (job_id, path, state, size, mtime_ns) VALUES (?, ?, ?, ?, ?)",
+                             (self.job_id, os.path.abspath(path), state, *signature))
+
+    def reset(self):
+        """Oublie les états d'un job précédent (lot forcé): tout est retraité, puis journalisé à nouveau."""
+        with self._lock:
+            self._db.execute("DELETE FROM files WHERE job_id = ?", (self.job_id,))
+            self.resumed = False
+            self.upload_prefix = None
+
+    def finish(self):
+        """Lot terminé sans échec: le job et ses fichiers sont effacés."""
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.execute("DELETE FROM files WHERE job_id = ?", (self.job_id,))
+            self._db.execute("DELETE FROM jobs WHERE id = ?", (self.job_id,))
+            self._db.execute("COMMIT")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def open_journal(path: str, kind: str, key: str, on_error=lambda _msg: None) -> Optional[JobJournal]:
+    """Ouvre le journal, ou None (lot sans reprise) si le fichier est inaccessible."""
+    try:
+        return JobJournal(path, kind, key)
+    except (OSError, sqlite3.Error) as e:
+        on_error(f"⚠️ Journal de reprise indisponible ({e})")
+        return None
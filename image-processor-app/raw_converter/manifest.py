@@ -0,0 +1,165 @@
+"""Manifeste de conversion incrémentale.
+Stocké dans le dossier de sortie, il mémorise pour chaque RAW source (taille, mtime,
+empreinte optionnelle du contenu) l'empreinte des réglages utilisés et le JPEG produit.
+Un fichier dont la sortie est toujours valide peut ainsi être ignoré sans décodage.
+Il retient aussi, par destination Minio, le dossier distant du jour résolu lors du premier envoi sans
+préfixe fixe: une synchronisation ultérieure du même dossier vise ce dossier distant, pas celui du jour.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+from typing import Dict, Optional, Sequence
+from .processing import ConversionJob
+
+MANIFEST_FILENAME = ".raw_converter_manifest.json"
+MANIFEST_VERSION = 1
+# À incrémenter quand le rendu du pipeline change (invalide toutes les sorties existantes)
+PIPELINE_VERSION = 1
+
+
+def settings_fingerprint(job: ConversionJob) -> str:
+    """Empreinte des réglages qui influencent le JPEG produit (indépendante du fichier source)."""
+    watermark_mtime = None
+    if job.watermark_enabled and job.watermark_path and os.path.exists(job.watermark_path):
+        watermark_mtime = os.stat(job.watermark_path).st_mtime_ns
+    settings = {
+        "pipeline": PIPELINE_VERSION,
+        "quality": job.quality,
+        "watermark": [job.watermark_enabled, job.watermark_path if job.watermark_enabled else None, watermark_mtime],
+        "filename_overlay": [job.filename_display_enabled, job.font_path if job.filename_display_enabled else None],
+        "decode_mode": job.decode_mode,
+        "decode_policy": job.decode_policy,
+        "enhance_backend": job.enhance_backend,
+    }
+    if job.extra_renditions:  # absent sans déclinaison: les manifestes existants restent valides
+        settings["renditions"] = [list(r.key()) for r in job.extra_renditions]
+    return hashlib.sha1(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def file_digest(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Empreinte BLAKE2b du contenu (lecture par blocs)."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ConversionManifest:
+    """Index persistant source -> sorties (JPEG web puis déclinaisons éventuelles).
+    Les écritures sont atomiques (fichier temporaire + replace).
+    """
+    def __init__(self, output_dir: str, use_hash: bool = False):
+        self.path = os.path.join(output_dir, MANIFEST_FILENAME)
+        self.use_hash = use_hash
+        self.entries: Dict[str, dict] = {}
+        self.remote_prefixes: Dict[str, str] = {}  # destination (upload_target) -> dossier distant résolu
+        self._dirty = 0
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                self.entries = data.get("entries", {})
+                self.remote_prefixes = data.get("remote_prefixes", {})
+        except (OSError, ValueError):
+            self.entries = {}
+            self.remote_prefixes = {}
+
+    def save(self):
+        if not self._dirty:
+            return
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": MANIFEST_VERSION, "entries": self.entries,
+                           "remote_prefixes": self.remote_prefixes}, f)
+            os.replace(tmp_path, self.path)
+            self._dirty = 0
+        except OSError as e:
+            print(f"Erreur écriture manifeste: {e}")
+
+    def save_every(self, n: int = 25):
+        """Sauvegarde périodique pour limiter le coût sur les gros lots."""
+        if self._dirty >= n:
+            self.save()
+
+    def _source_signature(self, source_path: str, with_hash: bool) -> dict:
+        st = os.stat(source_path)
+        sig = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        if with_hash:
+            sig["hash"] = file_digest(source_path)
+        return sig
+
+    def is_up_to_date(self, source_path: str, output_paths: Sequence[str], fingerprint: str) -> bool:
+        entry = self.entries.get(os.path.abspath(source_path))
+        if not entry or entry.get("settings") != fingerprint:
+            return False
+        try:
+            sig = self._source_signature(source_path, with_hash=False)
+            sizes = [os.stat(path).st_size for path in output_paths]
+        except OSError:
+            return False
+        extra = {os.path.basename(path): size for path, size in zip(output_paths[1:], sizes[1:])}
+        if sig["size"] != entry.get("size") or sizes[0] != entry.get("output_size"):
+            return False
+        if extra != entry.get("extra_outputs", {}):
+            return False
+        if sig["mtime_ns"] != entry.get("mtime_ns"):
+            # mtime modifié (copie, touch): seul le hash peut encore prouver que le contenu est identique
+            if not (self.use_hash and entry.get("hash")):
+                return False
+            if file_digest(source_path) != entry["hash"]:
+                return False
+        elif self.use_hash and entry.get("hash") is None:
+            return False
+        return True
+
+    def record(self, source_path: str, output_paths: Sequence[str], fingerprint: str):
+        try:
+            entry = self._source_signature(source_path, with_hash=self.use_hash)
+            entry["output"] = os.path.basename(output_paths[0])
+            entry["output_size"] = os.stat(output_paths[0]).st_size
+            if len(output_paths) > 1:
+                entry["extra_outputs"] = {os.path.basename(p): os.stat(p).st_size for p in output_paths[1:]}
+        except OSError:
+            return
+        entry["settings"] = fingerprint
+        self.entries[os.path.abspath(source_path)] = entry
+        self._dirty += 1
+
+    def mark_uploaded(self, source_path: str, target: str):
+        entry = self.entries.get(os.path.abspath(source_path))
+        if entry is not None:
+            entry["uploaded_to"] = target
+            self._dirty += 1
+
+    def is_uploaded(self, source_path: str, target: str) -> bool:
+        entry = self.entries.get(os.path.abspath(source_path))
+        return bool(entry) and entry.get("uploaded_to") == target
+
+    def remote_prefix(self, target: str) -> Optional[str]:
+        """Dossier distant déjà utilisé pour cette destination (envoi sans préfixe fixe), sinon None."""
+        return self.remote_prefixes.get(target)
+
+    def set_remote_prefix(self, target: str, prefix: str):
+        if self.remote_prefixes.get(target) != prefix:
+            self.remote_prefixes[target] = prefix
+            self._dirty += 1
+
+    def forget(self, source_path: str):
+        if self.entries.pop(os.path.abspath(source_path), None) is not None:
+            self._dirty += 1
+
+
+def upload_target(endpoint: str, bucket: str, prefix: str = "") -> Optional[str]:
+    """Identifiant de destination stocké dans le manifeste pour savoir si un JPEG a déjà été uploadé.
+    Le dossier distant n'en fait partie que s'il est fixe (pas le dossier du jour).
+    """
+    if not (endpoint and bucket):
+        return None
+    prefix = prefix.strip("/")
+    return f"{endpoint}/{bucket}/{prefix}" if prefix else f"{endpoint}/{bucket}"
@@ -0,0 +1,49 @@
+"""Configuration Minio, sans dépendance PyQt (utilisable en mode headless)."""
+from __future__ import annotations
+import os
+from datetime import datetime
+
+DEFAULT_MINIO_ENDPOINT = os.getenv("MINIO_ENDPOINT", "minio.gery.me")
+DEFAULT_MINIO_ACCESS_KEY = os.getenv("MINIO_ACCESS_KEY", "lenart-admin")
+# Upload résilient (voir minio_uploader.ResilientUploader)
+DEFAULT_UPLOAD_RETRIES = 4        # nouvelles tentatives par fichier sur erreur passagère
+DEFAULT_MAX_PAUSE_MINUTES = 15    # pause maximale sur serveur injoignable avant d'abandonner la file
+
+class MinioConfig:
+    def __init__(self):
+        self.enabled = False
+        self.endpoint = ""
+        self.access_key = ""
+        self.secret_key = ""
+        self.bucket = ""
+        self.use_ssl = True
+        self.connection_tested = False
+        self.prefix = ""  # dossier distant fixe; vide: dossier du jour (YYYY-MM-DD)
+        self.upload_retries = DEFAULT_UPLOAD_RETRIES
+        self.max_pause_minutes = DEFAULT_MAX_PAUSE_MINUTES
+
+    def is_valid(self) -> bool:
+        if not self.enabled:
+            return False
+        required = [self.endpoint, self.access_key, self.secret_key, self.bucket]
+        return all(field.strip() for field in required)
+
+    def object_prefix(self) -> str:
+        """Dossier distant effectif, à résoudre une fois par lot (le dossier du jour change à minuit)."""
+        prefix = self.prefix.strip().strip("/")
+        return prefix or datetime.utcnow().strftime("%Y-%m-%d")
+
+    def split_endpoint(self):
+        ep = self.endpoint.strip()
+        if not ep:
+            return "", 0
+        if ':' in ep:
+            host, port_s = ep.split(':', 1)
+            try:
+                port = int(port_s)
+            except ValueError:
+                port = 443 if self.use_ssl else 9000
+        else:
+            host = ep
+            port = 443 if self.use_ssl else 9000
+        return host, port
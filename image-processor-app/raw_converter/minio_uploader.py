@@ -1,26 +1,81 @@
 """Fonctions utilitaires pour uploader des fichiers vers Minio.
 Séparé pour garder la logique d'upload distincte du traitement d'image.
+
+upload_file / upload_bytes font une seule tentative. ResilientUploader (utilisé par les lots)
+réessaie les erreurs passagères (réseau, serveur surchargé) avec un délai exponentiel aléatoire,
+sur le même client; si plusieurs fichiers de suite épuisent leurs tentatives, le serveur est
+considéré injoignable et tous les uploads sont mis en pause jusqu'à ce qu'il réponde à nouveau.
+Le client des lots n'a pas de nouvelles tentatives urllib3: les autres appels faits avec lui
+(ensure_bucket, listing de la sync) passent par call_with_retries et la même RetryPolicy.
 """
 from __future__ import annotations
+import os
+import random
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Tuple
+from functools import lru_cache
+from typing import Callable, Optional, Tuple, TypeVar
 from io import BytesIO
 
-try:  # Import optionnel
-    from minio import Minio  # type: ignore
-    from minio.error import S3Error  # type: ignore
-except ImportError:  # pragma: no cover
-    Minio = None  # type: ignore
-    class S3Error(Exception):  # fallback minimal
-        pass
+from .minio_config import MinioConfig, DEFAULT_UPLOAD_RETRIES, DEFAULT_MAX_PAUSE_MINUTES
+
+# Taille minimale du pool HTTP (valeur par défaut du client Minio)
+DEFAULT_POOL_SIZE = 10
+# Taille des parts pour les gros objets (minimum S3: 5 MiB). Les JPEG web tiennent en une requête.
+MULTIPART_PART_SIZE = 16 * 1024 * 1024
+HTTP_TIMEOUT = 5 * 60
+# Connexion courte: un serveur injoignable est détecté vite, les nouvelles tentatives prennent le relais
+CONNECT_TIMEOUT = 15
+
+# Délai exponentiel (secondes) entre deux tentatives d'un même fichier
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+# Fichiers consécutifs en échec réseau avant de mettre la file en pause, et sonde du serveur pendant la pause
+DEAD_ENDPOINT_FAILURES = 3
+PROBE_INTERVAL = 10.0
+# Codes S3 passagers (serveur surchargé ou en redémarrage): on réessaie
+TRANSIENT_S3_CODES = {"RequestTimeout", "SlowDown", "InternalError", "ServiceUnavailable",
+                      "RequestTimeTooSkewed", "OperationAborted"}
+
+T = TypeVar("T")
+
+class _MissingS3Error(Exception):
+    """Remplace minio.error.S3Error quand minio n'est pas installé."""
+
+@lru_cache(maxsize=1)
+def _minio_api():
+    """Importe minio au premier usage (pas au lancement de l'application). Retourne (Minio | None, S3Error)."""
+    try:  # Import optionnel
+        from minio import Minio  # type: ignore
+        from minio.error import S3Error  # type: ignore
+    except ImportError:  # pragma: no cover
+        return None, _MissingS3Error
+    return Minio, S3Error
 
-from .minio_widget import MinioConfig
+def _build_http_client(pool_size: int):
+    """PoolManager urllib3 dimensionné pour `pool_size` uploads simultanés (mêmes réglages que Minio)."""
+    import certifi  # type: ignore  # dépendance de minio
+    import urllib3  # type: ignore  # dépendance de minio
+    from urllib3.util import Retry, Timeout  # type: ignore
+    return urllib3.PoolManager(
+        timeout=Timeout(connect=CONNECT_TIMEOUT, read=HTTP_TIMEOUT),
+        maxsize=max(DEFAULT_POOL_SIZE, pool_size),
+        block=False,
+        cert_reqs='CERT_REQUIRED',
+        ca_certs=os.environ.get('SSL_CERT_FILE') or certifi.where(),
+        # Pas de nouvelle tentative cachée dans urllib3: ResilientUploader et call_with_retries les comptent et les espacent
+        retries=Retry(total=0),
+    )
 
-def build_client(config: MinioConfig):
+def build_client(config: MinioConfig, pool_size: int = DEFAULT_POOL_SIZE):
     """Construit et retourne un client Minio à partir de la config.
+    Le client est thread-safe: un seul client (et son pool de connexions de `pool_size`)
+    est partagé par tous les threads d'upload.
     Retourne None si Minio n'est pas disponible ou config non valide.
     """
+    Minio = _minio_api()[0]
     if Minio is None or not config.enabled or not config.connection_tested:
         return None
     return Minio(
@@ -28,14 +83,20 @@ def build_client(config: MinioConfig):
         access_key=config.access_key,
         secret_key=config.secret_key,
         secure=config.use_ssl,
+        http_client=_build_http_client(pool_size),
     )
 
-def ensure_bucket(client, bucket: str) -> Tuple[bool, str]:  # client: Minio | None
-    """Vérifie / crée le bucket si nécessaire."""
+def ensure_bucket(client, bucket: str, policy: Optional["RetryPolicy"] = None) -> Tuple[bool, str]:  # client: Minio | None
+    """Vérifie / crée le bucket si nécessaire (erreurs passagères réessayées selon `policy`)."""
+    S3Error = _minio_api()[1]
     try:
-        exists = client.bucket_exists(bucket)
+        exists = call_with_retries(lambda: client.bucket_exists(bucket), policy)
         if not exists:
-            client.make_bucket(bucket)
+            try:
+                call_with_retries(lambda: client.make_bucket(bucket), policy)
+            except S3Error as e:  # tentative précédente arrivée au serveur malgré l'erreur réseau
+                if getattr(e, "code", "") != "BucketAlreadyOwnedByYou":
+                    raise
             return True, f"Bucket créé: {bucket}"
         return True, f"Bucket OK: {bucket}"
     except S3Error as e:  # pragma: no cover (dépend réseau)
@@ -43,19 +104,265 @@ def ensure_bucket(client, bucket: str) -> Tuple[bool, str]:  # client: Minio | N
     except Exception as e:
         return False, f"Erreur bucket: {e}"
 
-def generate_object_name(local_path: str) -> str:
-    """Génère un nom d'objet dans un dossier daté (YYYY-MM-DD/filename)."""
-    date_folder = datetime.utcnow().strftime("%Y-%m-%d")
-    return f"{date_folder}/{Path(local_path).name}"
+def generate_object_name(local_path: str, prefix: Optional[str] = None) -> str:
+    """Génère un nom d'objet prefix/filename (défaut: dossier daté YYYY-MM-DD/filename)."""
+    folder = prefix.strip("/") if prefix else datetime.utcnow().strftime("%Y-%m-%d")
+    return f"{folder}/{Path(local_path).name}"
 
-def upload_file(client, bucket: str, local_path: str) -> Tuple[bool, str]:  # client: Minio | None
+def upload_file(client, bucket: str, local_path: str,
+                prefix: Optional[str] = None) -> Tuple[bool, str]:  # client: Minio | None
     """Upload d'un fichier vers Minio (retour succès, message)."""
-    object_name = generate_object_name(local_path)
+    S3Error = _minio_api()[1]
+    object_name = generate_object_name(local_path, prefix)
     try:
-        client.fput_object(bucket, object_name, local_path, content_type="image/jpeg")
+        client.fput_object(bucket, object_name, local_path, content_type="image/jpeg",
+                           part_size=MULTIPART_PART_SIZE)
         url_hint = f"s3://{bucket}/{object_name}" if client else object_name
         return True, f"☁️ Upload OK: {url_hint}"
     except S3Error as e:  # pragma: no cover
         return False, f"☁️ Upload échoué ({getattr(e, 'code', e)})"
     except Exception as e:
         return False, f"☁️ Upload échoué ({e})"
+
+def upload_bytes(client, bucket: str, filename: str, data: bytes,
+                 prefix: Optional[str] = None) -> Tuple[bool, str]:  # client: Minio | None
+    """Upload d'un JPEG encodé en mémoire (put_object), sans passer par le disque."""
+    S3Error = _minio_api()[1]
+    object_name = generate_object_name(filename, prefix)
+    try:
+        client.put_object(bucket, object_name, BytesIO(data), length=len(data), content_type="image/jpeg",
+                          part_size=MULTIPART_PART_SIZE)
+        return True, f"☁️ Upload OK: s3://{bucket}/{object_name}"
+    except S3Error as e:  # pragma: no cover
+        return False, f"☁️ Upload échoué ({getattr(e, 'code', e)})"
+    except Exception as e:
+        return False, f"☁️ Upload échoué ({e})"
+
+
+def _error_text(error: BaseException) -> str:
+    return str(getattr(error, "code", None) or error)
+
+
+def is_transient(error: BaseException) -> bool:
+    """Erreur passagère (réseau, délai dépassé, serveur surchargé) qui justifie une nouvelle tentative.
+    Fichier local absent ou illisible, accès refusé, bucket inexistant: échec immédiat.
+    """
+    if isinstance(error, (FileNotFoundError, PermissionError, IsADirectoryError, NotADirectoryError)):
+        return False
+    if isinstance(error, (ConnectionError, TimeoutError, OSError)):
+        return True
+    if isinstance(error, _minio_api()[1]):
+        return getattr(error, "code", "") in TRANSIENT_S3_CODES
+    status = getattr(error, "status_code", None) or getattr(error, "status", None)
+    if isinstance(status, int):  # minio.error.ServerError: réponse HTTP non S3 (proxy, 502/503/504)
+        return status >= 500 or status == 429
+    try:
+        from urllib3.exceptions import HTTPError  # type: ignore  # dépendance de minio
+    except ImportError:  # pragma: no cover
+        return False
+    return isinstance(error, HTTPError)  # MaxRetryError, ProtocolError, ReadTimeoutError...
+
+
+class RetryPolicy:
+    """Réglages de ResilientUploader. retries: nouvelles tentatives par fichier (0: une seule tentative);
+    max_pause: durée maximale (secondes) d'une pause sur serveur injoignable avant d'abandonner la file.
+    """
+    def __init__(self, retries: int = DEFAULT_UPLOAD_RETRIES, base_delay: float = RETRY_BASE_DELAY,
+                 max_delay: float = RETRY_MAX_DELAY, dead_after: int = DEAD_ENDPOINT_FAILURES,
+                 probe_interval: float = PROBE_INTERVAL, max_pause: float = DEFAULT_MAX_PAUSE_MINUTES * 60):
+        self.retries = max(0, retries)
+        self.base_delay = max(0.0, base_delay)
+        self.max_delay = max(self.base_delay, max_delay)
+        self.dead_after = max(1, dead_after)
+        self.probe_interval = max(0.01, probe_interval)
+        self.max_pause = max(0.0, max_pause)
+
+    @classmethod
+    def from_config(cls, config: MinioConfig) -> "RetryPolicy":
+        return cls(retries=config.upload_retries, max_pause=config.max_pause_minutes * 60)
+
+    def delay(self, retry: int) -> float:
+        """Délai avant la nouvelle tentative n° `retry` (0, 1...): exponentiel plafonné, tirage uniforme
+        (« full jitter ») pour que les threads d'upload ne relancent pas tous au même instant.
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry))
+
+
+def call_with_retries(call: Callable[[], T], policy: Optional[RetryPolicy] = None) -> T:
+    """Appel Minio hors upload (bucket, listing): réessayé sur erreur passagère, sans pause de la file.
+    La dernière erreur est relancée une fois les tentatives épuisées.
+    """
+    policy = policy or RetryPolicy()
+    attempt = 0
+    while True:
+        try:
+            return call()
+        except Exception as e:
+            if attempt >= policy.retries or not is_transient(e):
+                raise
+            time.sleep(policy.delay(attempt))
+            attempt += 1
+
+
+class UploadOutcome:
+    """Résultat d'un upload avec ses nouvelles tentatives (retries) et le temps passé à réessayer."""
+    def __init__(self, ok: bool, message: str, retries: int = 0, retry_seconds: float = 0.0):
+        self.ok = ok
+        self.message = message
+        self.retries = retries
+        self.retry_seconds = retry_seconds
+
+
+def _noop(*_args):
+    pass
+
+
+class ResilientUploader:
+    """Uploads avec nouvelles tentatives sur un client Minio partagé, thread-safe.
+    Après `dead_after` fichiers consécutifs dont toutes les tentatives ont échoué sur une erreur passagère,
+    tous les uploads attendent (pause) et un seul thread sonde le serveur toutes les `probe_interval`
+    secondes; le fichier qui a déclenché la pause est retenté à la reprise. Au-delà de `max_pause`,
+    les fichiers restants échouent sans tentative (le journal de reprise permettra de les renvoyer).
+    cancel() (depuis n'importe quel thread) interrompt attentes et pause.
+    """
+    def __init__(self, client, bucket: str, policy: Optional[RetryPolicy] = None,
+                 on_status: Callable[[str], None] = _noop):  # client: Minio
+        self.client = client
+        self.bucket = bucket
+        self.policy = policy or RetryPolicy()
+        self.on_status = on_status
+        self.pauses = 0
+        self._cond = threading.Condition()
+        self._cancelled = False
+        self._gave_up = False
+        self._consecutive_failures = 0
+        self._paused_since: Optional[float] = None
+        self._next_probe = 0.0
+        self._probing = False
+
+    def cancel(self):
+        with self._cond:
+            self._cancelled = True
+            self._cond.notify_all()
+
+    @property
+    def paused(self) -> bool:
+        return self._paused_since is not None
+
+    def upload_file(self, local_path: str, prefix: Optional[str] = None) -> UploadOutcome:
+        object_name = generate_object_name(local_path, prefix)
+        return self._upload(object_name, lambda: self.client.fput_object(
+            self.bucket, object_name, local_path, content_type="image/jpeg", part_size=MULTIPART_PART_SIZE))
+
+    def upload_bytes(self, filename: str, data: bytes, prefix: Optional[str] = None) -> UploadOutcome:
+        object_name = generate_object_name(filename, prefix)
+        return self._upload(object_name, lambda: self.client.put_object(
+            self.bucket, object_name, BytesIO(data), length=len(data), content_type="image/jpeg",
+            part_size=MULTIPART_PART_SIZE))
+
+    def _upload(self, object_name: str, send: Callable[[], object]) -> UploadOutcome:
+        retries = 0
+        first_failure: Optional[float] = None
+        attempt = 0  # tentatives depuis la dernière pause
+
+        def outcome(ok: bool, message: str) -> UploadOutcome:
+            spent = time.monotonic() - first_failure if first_failure is not None else 0.0
+            if retries:
+                message += f" · {retries} nouvelle(s) tentative(s) en {spent:.1f} s"
+            return UploadOutcome(ok, message, retries, spent)
+
+        while True:
+            blocked = self._wait_until_available()
+            if blocked:
+                return outcome(False, blocked)
+            try:
+                send()
+            except Exception as e:
+                if first_failure is None:
+                    first_failure = time.monotonic()
+                if not is_transient(e):
+                    return outcome(False, f"☁️ Upload échoué ({_error_text(e)})")
+                if attempt < self.policy.retries:
+                    if self._sleep(self.policy.delay(attempt)):
+                        return outcome(False, "⏹️ Annulé")
+                    attempt += 1
+                    retries += 1
+                    continue
+                if not self._record_exhausted(e):
+                    return outcome(False, f"☁️ Upload échoué ({_error_text(e)})")
+                attempt = 0  # serveur en pause: le fichier repart pour une série de tentatives à la reprise
+                retries += 1
+                continue
+            self._record_success()
+            return outcome(True, f"☁️ Upload OK: s3://{self.bucket}/{object_name}")
+
+    def _sleep(self, seconds: float) -> bool:
+        """Attend `seconds`; True si annulé entre-temps."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._cancelled, timeout=seconds)
+
+    def _record_success(self):
+        with self._cond:
+            self._consecutive_failures = 0
+
+    def _record_exhausted(self, error: BaseException) -> bool:
+        """Un fichier a épuisé ses tentatives sur une erreur passagère. True si la file passe (ou est) en pause."""
+        with self._cond:
+            if self._cancelled or self._gave_up:
+                return False
+            self._consecutive_failures += 1
+            if self._paused_since is not None:
+                return True
+            if self._consecutive_failures < self.policy.dead_after:
+                return False
+            now = time.monotonic()
+            self._paused_since = now
+            self._next_probe = now + self.policy.probe_interval
+            self.pauses += 1
+        self.on_status(f"⏸️ Serveur Minio injoignable ({_error_text(error)}): uploads en pause, "
+                       f"nouvel essai toutes les {self.policy.probe_interval:g} s")
+        return True
+
+    def _wait_until_available(self) -> Optional[str]:
+        """Bloque pendant une pause. Retourne None si l'upload peut partir, sinon le message d'échec."""
+        while True:
+            with self._cond:
+                while True:
+                    if self._cancelled:
+                        return "⏹️ Annulé"
+                    if self._gave_up:
+                        return "☁️ Upload abandonné (serveur injoignable)"
+                    if self._paused_since is None:
+                        return None
+                    now = time.monotonic()
+                    if now - self._paused_since >= self.policy.max_pause:
+                        self._gave_up = True
+                        self._cond.notify_all()
+                        self.on_status(f"❌ Serveur Minio injoignable depuis {(now - self._paused_since) / 60:.0f} min: "
+                                       "uploads restants abandonnés (relancer le lot pour les reprendre)")
+                        continue
+                    if self._probing:  # un autre thread sonde le serveur: notify_all à la fin de la sonde
+                        self._cond.wait()
+                        continue
+                    if now >= self._next_probe:
+                        self._probing = True
+                        break
+                    self._cond.wait(timeout=min(self._next_probe, self._paused_since + self.policy.max_pause) - now)
+            alive = self._probe()
+            with self._cond:
+                self._probing = False
+                self._next_probe = time.monotonic() + self.policy.probe_interval
+                if alive and self._paused_since is not None:
+                    paused_for = time.monotonic() - self._paused_since
+                    self._paused_since = None
+                    self._consecutive_failures = 0
+                    self.on_status(f"▶️ Serveur Minio de nouveau joignable après {paused_for:.1f} s: reprise des uploads")
+                self._cond.notify_all()
+
+    def _probe(self) -> bool:
+        """Le serveur répond-il ? Toute réponse non passagère (même une erreur S3) compte comme vivante."""
+        try:
+            self.client.bucket_exists(self.bucket)
+        except Exception as e:
+            return not is_transient(e)
+        return True
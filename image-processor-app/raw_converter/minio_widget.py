@@ -1,42 +1,11 @@
 """Widget et configuration Minio (extrait de l'ancien minio.py)."""
 from __future__ import annotations
 from typing import Optional
-import os
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QGridLayout, QGroupBox, QLabel, QLineEdit,
                              QCheckBox, QPushButton, QMessageBox, QProgressBar, QHBoxLayout)
 from PyQt6.QtCore import Qt, QThread, pyqtSignal
 import socket
-
-class MinioConfig:
-    def __init__(self):
-        self.enabled = False
-        self.endpoint = ""
-        self.access_key = ""
-        self.secret_key = ""
-        self.bucket = ""
-        self.use_ssl = True
-        self.connection_tested = False
-
-    def is_valid(self) -> bool:
-        if not self.enabled:
-            return False
-        required = [self.endpoint, self.access_key, self.secret_key, self.bucket]
-        return all(field.strip() for field in required)
-
-    def split_endpoint(self):
-        ep = self.endpoint.strip()
-        if not ep:
-            return "", 0
-        if ':' in ep:
-            host, port_s = ep.split(':', 1)
-            try:
-                port = int(port_s)
-            except ValueError:
-                port = 443 if self.use_ssl else 9000
-        else:
-            host = ep
-            port = 443 if self.use_ssl else 9000
-        return host, port
+from .minio_config import MinioConfig, DEFAULT_MINIO_ENDPOINT, DEFAULT_MINIO_ACCESS_KEY  # noqa: F401 (ré-export)
 
 class MinioTestWorker(QThread):
     test_completed = pyqtSignal(bool, str)
@@ -114,9 +83,6 @@ class MinioTestWorker(QThread):
         except Exception as e:
             self.test_completed.emit(False, f"❌ Erreur: {e}")
 
-DEFAULT_MINIO_ENDPOINT = os.getenv("MINIO_ENDPOINT", "minio.gery.me")
-DEFAULT_MINIO_ACCESS_KEY = os.getenv("MINIO_ACCESS_KEY", "lenart-admin")
-
 class MinioConfigWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -159,18 +125,23 @@ class MinioConfigWidget(QWidget):
         self.bucket_entry = QLineEdit(); self.bucket_entry.setEnabled(False)
         self.bucket_entry.setPlaceholderText("nom-du-bucket"); self.bucket_entry.textChanged.connect(self._on_config_changed)
         grid.addWidget(self.bucket_entry, 5, 1)
+        # Dossier distant
+        grid.addWidget(QLabel("Dossier distant:"), 6, 0)
+        self.prefix_entry = QLineEdit(); self.prefix_entry.setEnabled(False)
+        self.prefix_entry.setPlaceholderText("vide: dossier du jour (AAAA-MM-JJ)"); self.prefix_entry.textChanged.connect(self._on_prefix_changed)
+        grid.addWidget(self.prefix_entry, 6, 1)
         # Buttons
         btn_layout = QHBoxLayout()
         self.test_btn = QPushButton("🔗 Tester"); self.test_btn.setEnabled(False); self.test_btn.clicked.connect(self._test_connection)
         btn_layout.addWidget(self.test_btn)
         self.clear_btn = QPushButton("🗑️ Effacer"); self.clear_btn.setEnabled(False); self.clear_btn.clicked.connect(self._clear_config)
         btn_layout.addWidget(self.clear_btn)
-        grid.addLayout(btn_layout, 6, 0, 1, 2)
+        grid.addLayout(btn_layout, 7, 0, 1, 2)
         # Progress + status
         self.progress_bar = QProgressBar(); self.progress_bar.setVisible(False); self.progress_bar.setRange(0, 0)
-        grid.addWidget(self.progress_bar, 7, 0, 1, 2)
+        grid.addWidget(self.progress_bar, 8, 0, 1, 2)
         self.status_label = QLabel("Configuration Minio désactivée"); self.status_label.setStyleSheet("color:#888; font-style:italic; padding:5px;")
-        grid.addWidget(self.status_label, 8, 0, 1, 2)
+        grid.addWidget(self.status_label, 9, 0, 1, 2)
         layout.addWidget(group)
         # Pré-remplissage valeurs par défaut (sans activer Minio)
         self.endpoint_entry.setText(DEFAULT_MINIO_ENDPOINT)
@@ -181,7 +152,7 @@ class MinioConfigWidget(QWidget):
         enabled = state == Qt.CheckState.Checked.value
         self.config.enabled = enabled
         widgets = [self.endpoint_entry, self.ssl_checkbox, self.access_key_entry, self.secret_key_entry,
-                   self.show_secret_btn, self.bucket_entry, self.test_btn, self.clear_btn]
+                   self.show_secret_btn, self.bucket_entry, self.prefix_entry, self.test_btn, self.clear_btn]
         for w in widgets:
             w.setEnabled(enabled)
         self._update_status()
@@ -195,6 +166,10 @@ class MinioConfigWidget(QWidget):
         self.config.connection_tested = False
         self._update_status()
 
+    def _on_prefix_changed(self, text: str):
+        # Le dossier distant n'invalide pas le test de connexion
+        self.config.prefix = text.strip()
+
     def _update_status(self):
         if not self.config.enabled:
             self.status_label.setText("Configuration Minio désactivée"); self.status_label.setStyleSheet("color:#888; font-style:italic; padding:5px;")
@@ -257,5 +232,6 @@ class MinioConfigWidget(QWidget):
         self.access_key_entry.setText(config.access_key)
         self.secret_key_entry.setText(config.secret_key)
         self.bucket_entry.setText(config.bucket)
+        self.prefix_entry.setText(config.prefix)
         self.ssl_checkbox.setChecked(config.use_ssl)
         self._update_status()
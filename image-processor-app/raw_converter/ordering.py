@@ -0,0 +1,232 @@
+"""Ordre de conversion des fichiers d'un lot, sans Qt.
+
+Le planificateur (scheduler.BoundedScheduler) ne tire le fichier suivant que lorsqu'une place se
+libère: l'ordre de la file décide donc des premiers JPEG disponibles (client qui attend les premières
+images d'un événement), sans changer le travail total ni le remplissage de la fenêtre de conversion.
+
+Politiques:
+    selection  ordre de la sélection (défaut)
+    smallest   plus petits fichiers d'abord (premiers résultats plus rapides)
+    newest     prises de vue les plus récentes d'abord: date de prise de vue EXIF (DateTimeOriginal),
+               lue dans l'en-tête du RAW; date de modification du fichier seulement si elle manque
+               (CR3, fichier illisible), car lecteurs de cartes, copies et syncs la réécrivent souvent
+    priority   fichiers de la liste de priorité d'abord, dans l'ordre de la liste, puis la sélection
+Une liste de priorité peut aussi accompagner smallest ou newest: ses fichiers passent toujours en tête.
+La politique peut changer pendant le lot (set_policy): seuls les fichiers pas encore soumis sont reclassés.
+Les mesures (taille, date EXIF) sont lues en arrière-plan: le premier fichier part sans les attendre.
+"""
+from __future__ import annotations
+import heapq
+import itertools
+import os
+import struct
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+ORDER_SELECTION = "selection"
+ORDER_SMALLEST = "smallest"
+ORDER_NEWEST = "newest"
+ORDER_PRIORITY = "priority"
+ORDER_POLICIES = (ORDER_SELECTION, ORDER_SMALLEST, ORDER_NEWEST, ORDER_PRIORITY)
+
+# Tags TIFF/EXIF lus pour la date de prise de vue
+_TAG_DATETIME = 0x0132           # IFD0: date de dernière modification par l'appareil
+_TAG_EXIF_IFD = 0x8769           # IFD0: pointeur vers l'IFD EXIF
+_TAG_DATETIME_ORIGINAL = 0x9003  # IFD EXIF: date de prise de vue
+# Nombres magiques TIFF acceptés: TIFF standard (CR2, NEF, ARW, DNG, PEF, SRW), ORF, RW2
+_TIFF_MAGICS = (42, 0x4F52, 0x5352, 0x55)
+_RAF_MAGIC = b"FUJIFILMCCD-RAW "
+# Fichiers mesurés (taille, date EXIF) entre deux reclassements de la file
+MEASURE_BATCH = 32
+
+
+def _normalize(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _read_ifd(f, base: int, offset: int, endian: str) -> Dict[int, Tuple[int, int, bytes]]:
+    """Entrées d'un IFD: tag -> (type, nombre, 4 octets valeur/décalage)."""
+    f.seek(base + offset)
+    count = struct.unpack(endian + "H", f.read(2))[0]
+    data = f.read(12 * min(count, 1024))
+    entries = {}
+    for i in range(0, len(data) - 11, 12):
+        tag, kind, n = struct.unpack(endian + "HHI", data[i:i + 8])
+        entries[tag] = (kind, n, data[i + 8:i + 12])
+    return entries
+
+
+def _tiff_capture_time(f, base: int) -> Optional[float]:
+    """DateTimeOriginal (sinon DateTime de l'IFD0) d'un en-tête TIFF situé à `base` dans le fichier."""
+    f.seek(base)
+    header = f.read(8)
+    endian = {b"II": "<", b"MM": ">"}.get(header[:2])
+    if endian is None or struct.unpack(endian + "H", header[2:4])[0] not in _TIFF_MAGICS:
+        return None
+    ifd0 = _read_ifd(f, base, struct.unpack(endian + "I", header[4:8])[0], endian)
+    candidates = []
+    if _TAG_EXIF_IFD in ifd0:
+        exif = _read_ifd(f, base, struct.unpack(endian + "I", ifd0[_TAG_EXIF_IFD][2])[0], endian)
+        candidates.append(exif.get(_TAG_DATETIME_ORIGINAL))
+    candidates.append(ifd0.get(_TAG_DATETIME))
+    for entry in candidates:
+        if entry is not None and entry[0] == 2 and entry[1] >= 19:  # ASCII "AAAA:MM:JJ HH:MM:SS\0"
+            f.seek(base + struct.unpack(endian + "I", entry[2])[0])
+            try:
+                return datetime.strptime(f.read(19).decode("ascii", "replace"), "%Y:%m:%d %H:%M:%S").timestamp()
+            except (ValueError, OverflowError):  # date non renseignée par l'appareil (0000:00:00...)
+                continue
+    return None
+
+
+def capture_time(path: str) -> Optional[float]:
+    """Date de prise de vue EXIF d'un RAW (horodatage local), lue dans l'en-tête sans décoder l'image.
+    None si le format n'est pas lu ici (CR3) ou si la date est absente ou invalide.
+    """
+    try:
+        with open(path, "rb") as f:
+            head = f.read(len(_RAF_MAGIC))
+            if head == _RAF_MAGIC:  # Fuji: EXIF dans le JPEG intégré (APP1 juste après SOI)
+                f.seek(84)
+                jpeg = struct.unpack(">I", f.read(4))[0]
+                f.seek(jpeg + 2)
+                app1 = f.read(10)
+                if app1[:2] != b"\xff\xe1" or app1[4:10] != b"Exif\0\0":
+                    return None
+                return _tiff_capture_time(f, jpeg + 12)
+            return _tiff_capture_time(f, 0)
+    except (OSError, struct.error):
+        return None
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:  # fichier disparu: sa conversion échouera, peu importe son rang
+        return 0
+
+
+def _taken_at(path: str) -> float:
+    """Date de prise de vue EXIF, sinon date de modification du fichier."""
+    taken = capture_time(path)
+    if taken is None:
+        try:
+            taken = os.path.getmtime(path)
+        except OSError:
+            taken = 0.0
+    return taken
+
+
+class ConversionQueue:
+    """File des fichiers pas encore soumis, servie selon une politique d'ordre. Thread-safe:
+    le thread du lot tire les fichiers (pop, itération), l'interface peut changer la politique.
+
+    Taille et date de prise de vue sont lues une seule fois par fichier, par un thread de fond et
+    hors du verrou: ni la construction de la file, ni set_policy() (appelé depuis l'interface) ne
+    lisent de fichier. Un fichier pas encore mesuré passe après les fichiers mesurés (dans l'ordre
+    de la sélection): le premier fichier part sans attendre la mesure des autres.
+    """
+    def __init__(self, files: Iterable[str] = (), policy: str = ORDER_SELECTION,
+                 priority: Optional[Sequence[str]] = None):
+        self._lock = threading.Condition()
+        self._seq = itertools.count()
+        self._heap: List[Tuple[tuple, int, str]] = []
+        self._sizes: Dict[str, int] = {}     # chemin -> taille, lue une fois
+        self._taken: Dict[str, float] = {}   # chemin -> date de prise de vue (ou mtime), lue une fois
+        self._policy = ORDER_SELECTION
+        self._ranks: Dict[str, int] = {}
+        self._measuring = False
+        self.set_policy(policy, priority)
+        with self._lock:
+            self._heap = [(self._key(path), next(self._seq), path) for path in files]
+            heapq.heapify(self._heap)
+            self._measure_pending()
+
+    @property
+    def policy(self) -> str:
+        return self._policy
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def _metric_cache(self) -> Optional[Dict[str, float]]:
+        if self._policy == ORDER_SMALLEST:
+            return self._sizes  # type: ignore
+        if self._policy == ORDER_NEWEST:
+            return self._taken
+        return None
+
+    def _key(self, path: str) -> tuple:
+        """Clé de tri depuis les mesures déjà connues (aucune lecture de fichier), sous le verrou."""
+        rank = self._ranks.get(_normalize(path), len(self._ranks)) if self._ranks else 0
+        cache = self._metric_cache()
+        if cache is None:
+            return rank, 0, 0  # selection / priority: ordre d'arrivée (numéro de séquence)
+        metric = cache.get(path)
+        if metric is None:
+            return rank, 1, 0  # pas encore mesuré: après les fichiers mesurés
+        return rank, 0, -metric if self._policy == ORDER_NEWEST else metric
+
+    def _rekey(self):
+        self._heap = [(self._key(path), seq, path) for _key, seq, path in self._heap]
+        heapq.heapify(self._heap)
+
+    def _measure_pending(self):
+        """Lance (sous le verrou) le thread de mesure si la politique en a besoin."""
+        if not self._measuring and self._metric_cache() is not None:
+            self._measuring = True
+            threading.Thread(target=self._measure_loop, name="conversion-queue-probe", daemon=True).start()
+
+    def _measure_loop(self):
+        while True:
+            with self._lock:
+                policy, cache = self._policy, self._metric_cache()
+                todo = [] if cache is None else [p for _key, _seq, p in self._heap if p not in cache][:MEASURE_BATCH]
+                if not todo:
+                    self._measuring = False
+                    self._lock.notify_all()
+                    return
+            measure = _file_size if policy == ORDER_SMALLEST else _taken_at
+            measured = {path: measure(path) for path in todo}  # lectures hors du verrou
+            with self._lock:
+                (self._sizes if policy == ORDER_SMALLEST else self._taken).update(measured)  # type: ignore
+                if policy == self._policy:
+                    self._rekey()
+
+    def wait_measured(self, timeout: Optional[float] = None) -> bool:
+        """Attend que tous les fichiers en attente soient mesurés pour la politique courante."""
+        with self._lock:
+            return self._lock.wait_for(lambda: not self._measuring, timeout=timeout)
+
+    def add(self, path: str):
+        with self._lock:
+            heapq.heappush(self._heap, (self._key(path), next(self._seq), path))
+            self._measure_pending()
+
+    def set_policy(self, policy: str, priority: Optional[Sequence[str]] = None):
+        """Change la politique (et la liste de priorité si fournie) et reclasse les fichiers en attente
+        d'après les mesures déjà connues; les mesures manquantes sont lues en arrière-plan.
+        """
+        if policy not in ORDER_POLICIES:
+            raise ValueError(f"ordre inconnu: {policy!r} (choix: {', '.join(ORDER_POLICIES)})")
+        with self._lock:
+            self._policy = policy
+            if priority is not None:
+                self._ranks = {}
+                for path in priority:
+                    self._ranks.setdefault(_normalize(path), len(self._ranks))
+            self._rekey()
+            self._measure_pending()
+
+    def pop(self) -> Optional[str]:
+        """Prochain fichier à soumettre, None si la file est vide."""
+        with self._lock:
+            return heapq.heappop(self._heap)[2] if self._heap else None
+
+    def __iter__(self) -> Iterator[str]:
+        while True:
+            path = self.pop()
+            if path is None:
+                return
+            yield path
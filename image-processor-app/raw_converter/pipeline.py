@@ -0,0 +1,628 @@
+"""Pipeline de conversion parallèle (+ upload Minio), indépendant de Qt.
+Utilisé par le ConversionWorker de l'interface et par la CLI headless.
+"""
+from __future__ import annotations
+import os
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+from .processing import (ConversionJob, ConversionResult, Rendition, run_conversion_job, output_paths_for,
+                         build_renditions, estimate_decode_memory, install_cancel_event,
+                         DECODE_MODE_FULL, DECODE_POLICY_AUTO, ENHANCE_BACKEND_PILLOW,
+                         STATUS_SKIPPED, STATUS_CONVERTED, STATUS_CANCELLED)
+from .minio_config import MinioConfig
+from .minio_uploader import build_client, ensure_bucket, ResilientUploader, RetryPolicy, UploadOutcome
+from .manifest import ConversionManifest, settings_fingerprint, upload_target
+from .telemetry import BatchStats
+from .scheduler import BoundedScheduler, default_memory_budget
+from .watcher import FolderWatcher
+from .ordering import ConversionQueue, ORDER_SELECTION, ORDER_POLICIES
+from .journal import (JobJournal, open_journal, journal_path, job_key, JOB_CONVERT,
+                      STATE_CONVERTED, STATE_UPLOADED, STATE_FAILED)
+
+EXECUTION_MODE_THREAD = "thread"
+EXECUTION_MODE_PROCESS = "process"
+EXECUTION_MODES = (EXECUTION_MODE_PROCESS, EXECUTION_MODE_THREAD)
+DEFAULT_THREAD_WORKERS = 5
+DEFAULT_UPLOAD_CONCURRENCY = 4
+DEFAULT_UPLOAD_QUEUE_SIZE = 32
+
+
+def default_worker_count(mode: str) -> int:
+    """Nombre de workers par défaut: un par cœur en mode processus, 5 en mode thread."""
+    if mode == EXECUTION_MODE_PROCESS:
+        return os.cpu_count() or DEFAULT_THREAD_WORKERS
+    return DEFAULT_THREAD_WORKERS
+
+
+def create_executor(mode: str, max_workers: int, cancel_event=None) -> Executor:
+    """Crée l'exécuteur demandé. Le mode processus utilise 'spawn' (sûr avec les threads Qt);
+    cancel_event (voir new_cancel_event) y est installé dans chaque processus worker.
+    """
+    if mode == EXECUTION_MODE_PROCESS:
+        return ProcessPoolExecutor(max_workers=max_workers,
+                                   mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=install_cancel_event, initargs=(cancel_event,))
+    return ThreadPoolExecutor(max_workers=max_workers)
+
+
+def new_cancel_event(mode: str):
+    """Événement d'annulation visible des workers: multiprocessing en mode processus, threading sinon."""
+    if mode == EXECUTION_MODE_PROCESS:
+        return multiprocessing.get_context("spawn").Event()
+    return threading.Event()
+
+
+def _noop(*_args):
+    pass
+
+
+class UploadStage:
+    """Étage d'upload: threads consommateurs d'une file bornée de JPEG déjà produits
+    (RAW source, chemin du JPEG, octets en mémoire éventuels, None si le JPEG est sur disque).
+    put() bloque quand la file est pleine (contre-pression sur la collecte des conversions).
+    """
+    def __init__(self, upload: Callable[[str, Optional[bytes]], UploadOutcome], concurrency: int, queue_size: int,
+                 on_done: Callable[[str, str, UploadOutcome], None]):
+        self._upload = upload
+        self._on_done = on_done
+        self._queue: "queue.Queue[Optional[Tuple[str, str, Optional[bytes]]]]" = queue.Queue(maxsize=queue_size)
+        self._threads = [threading.Thread(target=self._loop, name=f"upload-{i}", daemon=True)
+                         for i in range(concurrency)]
+        self._cancelled = False
+
+    def start(self):
+        for t in self._threads:
+            t.start()
+
+    def put(self, source_path: str, jpeg_path: str, data: Optional[bytes] = None):
+        self._queue.put((source_path, jpeg_path, data))
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            if self._cancelled:
+                continue
+            source_path, jpeg_path, data = item
+            try:
+                outcome = self._upload(jpeg_path, data)
+            except Exception as e:
+                outcome = UploadOutcome(False, f"☁️ Upload échoué ({e})")
+            self._on_done(source_path, jpeg_path, outcome)
+
+    def close(self, cancel: bool = False):
+        """Attend la fin des uploads en file (ou les abandonne si cancel) puis arrête les threads."""
+        if cancel:
+            self._cancelled = True
+            try:
+                while True:
+                    self._queue.get_nowait()
+            except queue.Empty:
+                pass
+        for _ in self._threads:
+            self._queue.put(None)
+        for t in self._threads:
+            t.join()
+
+
+class BatchConverter:
+    """Convertit un lot de fichiers RAW et uploade les JPEG si Minio est configuré.
+    Conversion et upload sont deux étages concurrents reliés par une file bornée.
+    La progression est remontée par callbacks (status, ConversionResult terminé, pourcentage,
+    upload terminé: on_upload(fichier, succès, message, nouvelles tentatives, secondes passées à réessayer)).
+    on_upload et on_status peuvent être appelés depuis les threads d'upload.
+    La télémétrie par fichier (ConversionResult.timings...) est agrégée dans self.stats.
+    order / priority choisissent l'ordre de conversion (voir ordering.py), modifiable en cours de lot par set_order().
+    """
+    def __init__(self, files: List[str], output_dir: str, quality: int,
+                 watermark_enabled: bool = True, watermark_path: Optional[str] = None,
+                 filename_display_enabled: bool = True,
+                 minio_config: Optional[MinioConfig] = None,
+                 execution_mode: str = EXECUTION_MODE_PROCESS,
+                 max_workers: Optional[int] = None,
+                 decode_mode: str = DECODE_MODE_FULL,
+                 decode_policy: str = DECODE_POLICY_AUTO,
+                 incremental: bool = True,
+                 resume: bool = True,
+                 verify_hash: bool = False,
+                 font_path: Optional[str] = None,
+                 enhance_backend: str = ENHANCE_BACKEND_PILLOW,
+                 upload_concurrency: int = DEFAULT_UPLOAD_CONCURRENCY,
+                 upload_queue_size: int = DEFAULT_UPLOAD_QUEUE_SIZE,
+                 write_local: bool = True,
+                 memory_budget_mb: Optional[int] = None,
+                 extra_renditions: Optional[List[Rendition]] = None,
+                 order: str = ORDER_SELECTION,
+                 priority: Optional[Sequence[str]] = None,
+                 on_status: Callable[[str], None] = _noop,
+                 on_file: Callable[[ConversionResult], None] = _noop,
+                 on_progress: Callable[[int], None] = _noop,
+                 on_upload: Callable[[str, bool, str, int, float], None] = _noop):
+        self.files = files
+        self.output_dir = output_dir
+        self.quality = quality
+        self.watermark_enabled = watermark_enabled
+        self.watermark_path = watermark_path
+        self.filename_display_enabled = filename_display_enabled
+        self._stop_requested = False
+        self.minio_config = minio_config
+        self._minio_client = None
+        self._minio_bucket_ok = False
+        self.execution_mode = execution_mode if execution_mode in EXECUTION_MODES else EXECUTION_MODE_THREAD
+        self.max_workers = max(1, max_workers or default_worker_count(self.execution_mode))
+        self.decode_mode = decode_mode
+        self.decode_policy = decode_policy
+        self.incremental = incremental
+        # Journal SQLite (voir journal.py): un lot interrompu reprend là où il s'était arrêté
+        self.resume = resume
+        self.resumed = 0  # fichiers repris du journal sans nouveau décodage
+        self.verify_hash = verify_hash
+        self.font_path = font_path
+        self.enhance_backend = enhance_backend
+        self.upload_concurrency = max(1, upload_concurrency)
+        self.upload_queue_size = max(1, upload_queue_size)
+        # False: JPEG encodé en mémoire et envoyé directement à Minio (pas d'écriture disque)
+        self.write_local = write_local
+        # Budget RAM des conversions en vol (None ou 0: moitié de la RAM physique)
+        self.memory_budget = memory_budget_mb * 1024 * 1024 if memory_budget_mb else default_memory_budget()
+        self.peak_in_flight = 0
+        self._throttle_reported = False
+        self.extra_renditions = list(extra_renditions or ())
+        self.order = order
+        self.priority = list(priority or ())
+        self._queue: Optional[ConversionQueue] = None  # fichiers pas encore soumis (pendant run/watch)
+        self.renditions = build_renditions(quality, self.extra_renditions)
+        # JPEG d'un RAW restant à uploader; le manifeste ne le marque uploadé que si tous ont réussi
+        self._uploads_left: Dict[str, int] = {}
+        self._upload_errors: Set[str] = set()
+        self.converted = self.failed = self.skipped = 0
+        self.cancelled = 0  # conversions interrompues par stop() (fichiers laissés à reprendre)
+        self.uploaded = self.upload_failed = 0
+        self.stats = BatchStats()
+        self.on_status = on_status
+        self.on_file = on_file
+        self.on_progress = on_progress
+        self.on_upload = on_upload
+        self._lock = threading.Lock()
+        self._manifest: Optional[ConversionManifest] = None
+        self._upload_stage: Optional[UploadStage] = None
+        self._uploader: Optional[ResilientUploader] = None
+        self._upload_target: Optional[str] = None
+        self._upload_prefix: Optional[str] = None
+        self._upload_queued = 0
+        self._watcher: Optional[FolderWatcher] = None
+        self._journal: Optional[JobJournal] = None
+        self._journal_states: Dict[str, tuple] = {}
+        # Annulation des conversions en cours (vérifiée par les workers entre deux étapes)
+        self._cancel_event = None
+        self._cancel_requested = False
+
+    def stop(self):
+        """Lot: annule tout, sans attendre les conversions en cours au-delà de leur étape courante;
+        les fichiers restants reprendront via le journal. Surveillance: un premier appel arrête
+        la surveillance et termine les fichiers reçus, un second annule comme pour un lot.
+        """
+        graceful = self._watcher is not None and not self._stop_requested
+        self._stop_requested = True
+        if self._watcher is not None:
+            self._watcher.cancel()
+        uploader = self._uploader
+        if graceful:
+            if uploader is not None and uploader.paused:  # serveur injoignable: le journal reprendra ces fichiers
+                uploader.cancel()
+            return
+        self._cancel_requested = True
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+        if uploader is not None:  # débloque attentes et pause sur serveur injoignable
+            uploader.cancel()
+
+    def set_order(self, order: str, priority: Optional[Sequence[str]] = None):
+        """Change l'ordre des fichiers pas encore soumis; appelable depuis un autre thread pendant le lot.
+        priority (si fourni) remplace la liste des fichiers à passer en tête. ValueError si l'ordre est inconnu.
+        """
+        if order not in ORDER_POLICIES:
+            raise ValueError(f"ordre inconnu: {order!r} (choix: {', '.join(ORDER_POLICIES)})")
+        self.order = order
+        if priority is not None:
+            self.priority = list(priority)
+        queue = self._queue
+        if queue is not None:
+            queue.set_policy(order, self.priority)
+
+    def _build_job(self, file_path: str, return_data: bool = False) -> ConversionJob:
+        return ConversionJob(file_path, self.output_dir, self.quality,
+                             self.watermark_enabled, self.watermark_path, self.filename_display_enabled,
+                             self.decode_mode, self.decode_policy, self.font_path,
+                             self.enhance_backend, self.write_local, return_data, self.extra_renditions)
+
+    def _open_executor(self) -> Executor:
+        try:
+            self._cancel_event = new_cancel_event(self.execution_mode)
+            executor = create_executor(self.execution_mode, self.max_workers, self._cancel_event)
+        except (OSError, NotImplementedError, ImportError) as e:
+            # Repli sur les threads si les processus ne sont pas disponibles
+            self.on_status(f"⚠️ Pool de processus indisponible ({e}), repli sur les threads")
+            self.execution_mode = EXECUTION_MODE_THREAD
+            self._cancel_event = new_cancel_event(EXECUTION_MODE_THREAD)
+            executor = create_executor(EXECUTION_MODE_THREAD, self.max_workers)
+        if self._cancel_requested:  # stop() appelé avant la création de l'événement
+            self._cancel_event.set()
+        return executor
+
+    def _submit(self, executor: Executor, file_path: str, direct_upload: bool):
+        job = self._build_job(file_path, direct_upload)
+        if self.execution_mode == EXECUTION_MODE_PROCESS:  # événement installé par l'initializer du pool
+            return executor.submit(run_conversion_job, job)
+        return executor.submit(run_conversion_job, job, self._cancel_event)
+
+    def _output_paths(self, file_path: str) -> List[str]:
+        return output_paths_for(file_path, self.output_dir, self.renditions)
+
+    def _upload(self, local_jpeg: str, data: Optional[bytes] = None) -> UploadOutcome:
+        start = time.perf_counter()
+        uploader: ResilientUploader = self._uploader  # type: ignore
+        if data is not None:
+            outcome = uploader.upload_bytes(os.path.basename(local_jpeg), data, self._upload_prefix)
+        else:
+            outcome = uploader.upload_file(local_jpeg, self._upload_prefix)
+        with self._lock:
+            self.stats.add_upload(time.perf_counter() - start, outcome.retries, outcome.retry_seconds)
+        return outcome
+
+    def _on_upload_done(self, file_path: str, jpeg_path: str, outcome: UploadOutcome):
+        """Appelé depuis les threads d'upload."""
+        ok = outcome.ok
+        with self._lock:
+            if ok:
+                self.uploaded += 1
+            else:
+                self.upload_failed += 1
+                self._upload_errors.add(file_path)
+            self._uploads_left[file_path] -= 1
+            all_uploaded = False
+            if not self._uploads_left[file_path]:
+                del self._uploads_left[file_path]
+                all_uploaded = file_path not in self._upload_errors
+                if self._manifest is not None and all_uploaded:
+                    self._manifest.mark_uploaded(file_path, self._upload_target)  # type: ignore
+                self._upload_errors.discard(file_path)
+            status = self._progress_text()
+        if all_uploaded and self._journal is not None:
+            self._journal.mark(file_path, STATE_UPLOADED)
+        self.on_upload(os.path.basename(jpeg_path), ok, outcome.message, outcome.retries, outcome.retry_seconds)
+        self.on_status(status)
+
+    def _progress_text(self) -> str:
+        text = f"Convertis: {self._completed()}/{len(self.files)}"
+        if self._upload_stage is not None:
+            text += f" · Uploadés: {self.uploaded + self.upload_failed}/{self._upload_queued}"
+        return text
+
+    def _on_memory_throttle(self, in_flight: int, used_bytes: int):
+        if not self._throttle_reported:
+            self._throttle_reported = True
+            self.on_status(f"⏳ Budget mémoire atteint: {in_flight} conversion(s) en vol "
+                           f"(~{used_bytes / 1024 ** 2:.0f} Mo), les suivantes attendent")
+
+    def _queue_uploads(self, file_path: str, jpeg_data: Optional[Dict[str, bytes]] = None):
+        """Met en file tous les JPEG d'un RAW (web + déclinaisons), depuis la mémoire ou le disque."""
+        paths = self._output_paths(file_path)
+        with self._lock:
+            self._upload_queued += len(paths)
+            self._uploads_left[file_path] = self._uploads_left.get(file_path, 0) + len(paths)
+        for path in paths:
+            data = jpeg_data.get(os.path.basename(path)) if jpeg_data else None
+            self._upload_stage.put(file_path, path, data)  # type: ignore  # bloque si la file est pleine
+
+    def _begin(self, job_files: Sequence[str]) -> Tuple[bool, bool, str]:
+        """Prépare un lot (Minio, manifeste, journal, étage d'upload). Retourne (upload actif, upload direct, empreinte).
+        job_files identifie le lot dans le journal (fichiers du lot, ou dossiers surveillés).
+        """
+        self.converted = self.failed = self.skipped = self.resumed = self.cancelled = 0
+        self.uploaded = self.upload_failed = self._upload_queued = 0
+        self.stats = BatchStats()
+        self._throttle_reported = False
+        self._uploads_left.clear()
+        self._upload_errors.clear()
+        # Initialisation Minio si nécessaire
+        if self.minio_config and self.minio_config.enabled and self.minio_config.connection_tested:
+            self._minio_client = build_client(self.minio_config, pool_size=self.upload_concurrency)
+            if self._minio_client:
+                ok, msg = ensure_bucket(self._minio_client, self.minio_config.bucket,
+                                        RetryPolicy.from_config(self.minio_config))
+                self._minio_bucket_ok = ok
+                self.on_status(msg)
+        uploading = bool(self._minio_client and self._minio_bucket_ok)
+        self._upload_prefix = self.minio_config.object_prefix() if uploading else None  # type: ignore
+        if not self.write_local and not uploading:
+            self.on_status("⚠️ Upload Minio indisponible: les JPEG seront écrits dans le dossier de sortie")
+            self.write_local = True
+        # Sans JPEG local, le manifeste ne peut pas valider de sortie: pas de mode incrémental
+        direct_upload = uploading and not self.write_local
+        self._upload_target = upload_target(self.minio_config.endpoint, self.minio_config.bucket, self.minio_config.prefix) if uploading else None  # type: ignore
+        manifest = self._manifest = ConversionManifest(self.output_dir, use_hash=self.verify_hash) if self.incremental and self.write_local else None
+        fingerprint = settings_fingerprint(self._build_job("")) if manifest is not None else ""
+        if self.resume:
+            self._open_journal(job_files, uploading)
+        if manifest is not None and uploading and not self.minio_config.prefix.strip("/"):  # type: ignore
+            self._use_gallery_prefix(manifest)
+        # Étage d'upload concurrent: les JPEG partent pendant que les conversions continuent
+        if uploading:
+            self._uploader = ResilientUploader(self._minio_client, self.minio_config.bucket,  # type: ignore
+                                               RetryPolicy.from_config(self.minio_config), self.on_status)  # type: ignore
+            if self._stop_requested:
+                self._uploader.cancel()
+            self._upload_stage = UploadStage(self._upload, self.upload_concurrency, self.upload_queue_size,
+                                             self._on_upload_done)
+            self._upload_stage.start()
+        return uploading, direct_upload, fingerprint
+
+    def _use_gallery_prefix(self, manifest: ConversionManifest):
+        """Upload sans préfixe fixe: le dossier distant est fixé au premier envoi de ce dossier de sortie
+        (retenu dans le manifeste), puis réutilisé par les lots et syncs suivants, même un autre jour.
+        """
+        target = upload_target(self.minio_config.endpoint, self.minio_config.bucket)  # type: ignore
+        known = manifest.remote_prefix(target)  # type: ignore
+        if known is None:
+            manifest.set_remote_prefix(target, self._upload_prefix)  # type: ignore
+        elif known != self._upload_prefix:
+            self._upload_prefix = known
+            if self._journal is not None:
+                self._journal.set_upload_prefix(known)
+            self.on_status(f"🔁 Upload vers le dossier distant déjà utilisé pour ce dossier: {known}/")
+
+    def _open_journal(self, job_files: Sequence[str], uploading: bool):
+        """Retrouve le job interrompu de ce lot (mêmes réglages, destination et fichiers) ou en crée un."""
+        target = upload_target(self.minio_config.endpoint, self.minio_config.bucket, self.minio_config.prefix) if uploading else ""  # type: ignore
+        key = job_key(JOB_CONVERT, settings_fingerprint(self._build_job("")), self.write_local,
+                      os.path.abspath(self.output_dir) if self.write_local else "", target or "", files=job_files)
+        journal = self._journal = open_journal(journal_path(self.output_dir if self.write_local else None),
+                                               JOB_CONVERT, key, self.on_status)
+        if journal is None:
+            return
+        if not self.incremental and journal.resumed:  # lot forcé: pas de reprise, tout est reconverti
+            journal.reset()
+        self._journal_states = journal.states()
+        if journal.resumed and journal.upload_prefix and uploading:
+            self._upload_prefix = journal.upload_prefix  # même dossier distant qu'avant l'interruption
+        elif uploading:
+            journal.set_upload_prefix(self._upload_prefix)
+        if journal.resumed:
+            done = sum(1 for state, _size, _mtime in self._journal_states.values() if state in (STATE_CONVERTED, STATE_UPLOADED))
+            self.on_status(f"↩️ Reprise d'un lot interrompu: {done} fichier(s) déjà traité(s)")
+
+    def _end(self, cancel_uploads: bool, complete: bool):
+        """complete: le lot est allé à son terme (pas d'arrêt ni d'exception); sans échec, son job est effacé du journal."""
+        if self._upload_stage is not None:
+            if cancel_uploads:
+                self._uploader.cancel()  # type: ignore
+            self._upload_stage.close(cancel=cancel_uploads)
+            self._upload_stage = None
+            self._uploader = None
+        if self._journal is not None:
+            if complete and not self.failed and not self.upload_failed:
+                self._journal.finish()
+            self._journal.close()
+            self._journal = None
+            self._journal_states = {}
+        if self._manifest is not None:
+            with self._lock:
+                self._manifest.save()
+        self._manifest = None
+        self._queue = None
+
+    def _resume_from_journal(self, file_path: str, uploading: bool) -> bool:
+        """Fichier déjà traité par le job interrompu: résultat « ignoré » sans décodage, et upload
+        seulement s'il manquait (depuis le JPEG local; en upload direct, il faut reconvertir).
+        """
+        state = self._journal.resume_state(self._journal_states, file_path)  # type: ignore
+        if state is None:
+            return False
+        if state == STATE_CONVERTED and uploading and not self.write_local:
+            return False
+        if self.write_local and not all(os.path.exists(p) for p in self._output_paths(file_path)):
+            return False
+        filename = os.path.basename(file_path)
+        label = "uploadé" if state == STATE_UPLOADED else "converti"
+        result = ConversionResult(filename, True, f"↩️ {os.path.splitext(filename)[0]}.jpg déjà {label} (reprise)",
+                                  STATUS_SKIPPED)
+        with self._lock:
+            self.skipped += 1
+            self.resumed += 1
+        self.on_file(result)
+        self.on_progress(int((self._completed() / len(self.files)) * 100))
+        if uploading and state == STATE_CONVERTED:
+            self._queue_uploads(file_path)
+        return True
+
+    def _skip_if_up_to_date(self, file_path: str, fingerprint: str, uploading: bool) -> bool:
+        """Si la sortie du fichier est encore valide d'après le journal de reprise ou le manifeste, publie
+        un résultat « ignoré » (et met en file l'upload manquant) sans passer par l'exécuteur.
+        """
+        if self._journal is not None and self._resume_from_journal(file_path, uploading):
+            return True
+        manifest = self._manifest
+        if manifest is None or not manifest.is_up_to_date(file_path, self._output_paths(file_path), fingerprint):
+            return False
+        filename = os.path.basename(file_path)
+        result = ConversionResult(filename, True, f"⏭️ {os.path.splitext(filename)[0]}.jpg déjà à jour", STATUS_SKIPPED)
+        with self._lock:
+            self.skipped += 1
+            already_uploaded = manifest.is_uploaded(file_path, self._upload_target)  # type: ignore
+        self.on_file(result)
+        self.on_progress(int((self._completed() / len(self.files)) * 100))
+        if self._journal is not None:
+            self._journal.mark(file_path, STATE_UPLOADED if uploading and already_uploaded else STATE_CONVERTED)
+        if uploading and not already_uploaded:
+            self._queue_uploads(file_path)
+        return True
+
+    def _completed(self) -> int:
+        return self.converted + self.skipped + self.failed
+
+    def _scheduler(self, executor: Executor, direct_upload: bool) -> BoundedScheduler:
+        # Fenêtre bornée: au plus max_workers fichiers en vol, dans la limite du budget mémoire
+        return BoundedScheduler(
+            lambda fp: self._submit(executor, fp, direct_upload),
+            self.max_workers, self.memory_budget,
+            lambda fp: estimate_decode_memory(fp, self.decode_mode, self.decode_policy,
+                                              max(r.max_size for r in self.renditions)),
+            on_throttle=self._on_memory_throttle)
+
+    def _collect(self, file_path: str, future, fingerprint: str, uploading: bool) -> ConversionResult:
+        """Enregistre le résultat d'une conversion terminée et met ses JPEG en file d'upload.
+        Une conversion annulée n'est ni un succès ni un échec: le journal la laisse à reprendre.
+        """
+        try:
+            result = future.result()
+        except Exception as e:  # ex: BrokenProcessPool si un processus meurt
+            result = ConversionResult(os.path.basename(file_path), False, f"❌ Erreur: {e}")
+        if result.status == STATUS_CANCELLED:
+            with self._lock:
+                self.cancelled += 1
+            self.on_file(result)
+            return result
+        manifest = self._manifest
+        with self._lock:
+            if manifest is not None:
+                if result.status == STATUS_CONVERTED:
+                    manifest.record(file_path, self._output_paths(file_path), fingerprint)
+                else:
+                    manifest.forget(file_path)
+                manifest.save_every()
+            self.stats.add_result(result)
+            if result.success:
+                self.converted += 1
+            else:
+                self.failed += 1
+            status = self._progress_text()
+        if self._journal is not None:  # avant la mise en file: l'upload peut finir avant le retour de put()
+            self._journal.mark(file_path, STATE_CONVERTED if result.success else STATE_FAILED)
+        self.on_status(f"Terminé: {result.filename} — {status}")
+        self.on_file(result)
+        self.on_progress(int((self._completed() / len(self.files)) * 100))
+        # Upload Minio en arrière-plan si succès et config ok
+        if result.success and uploading and not self._cancel_requested:
+            data, result.jpeg_data = result.jpeg_data, None
+            self._queue_uploads(file_path, data)
+        return result
+
+    def run(self) -> Tuple[int, int, int]:
+        """Exécute le lot et retourne (convertis, échecs, total).
+        Les fichiers ignorés sont comptés dans self.skipped, les uploads dans self.uploaded / self.upload_failed.
+        """
+        batch_start = time.perf_counter()
+        total = len(self.files)
+        mode_label = "processus" if self.execution_mode == EXECUTION_MODE_PROCESS else "threads"
+        self.on_status(f"Démarrage du traitement parallèle de {total} fichiers "
+                       f"({self.max_workers} {mode_label})...")
+        uploading, direct_upload, fingerprint = self._begin(self.files)
+        complete = False
+        try:
+            if self._journal is not None:
+                self._journal.queue(self.files)
+            # Fichiers dont la sortie est encore valide: résultat immédiat, sans passer par l'exécuteur
+            self._queue = ConversionQueue(
+                [fp for fp in self.files if not self._skip_if_up_to_date(fp, fingerprint, uploading)],
+                self.order, self.priority)
+            if self.skipped:
+                self.on_status(f"{self.skipped} fichier(s) déjà à jour ignoré(s)")
+            with self._open_executor() as executor:
+                scheduler = self._scheduler(executor, direct_upload)
+                self.on_status(f"Budget mémoire: {self.memory_budget / 1024 ** 3:.1f} Go pour les conversions en vol")
+                stopping = False
+                try:
+                    for file_path, future in scheduler.completed(self._queue):
+                        if self._stop_requested and not stopping:
+                            # Plus de soumission; les conversions en cours s'arrêtent à leur prochaine étape
+                            stopping = True
+                            scheduler.stop()
+                            executor.shutdown(wait=False, cancel_futures=True)
+                        self._collect(file_path, future, fingerprint, uploading)
+                except KeyboardInterrupt:  # Ctrl+C (CLI): annuler avant que la sortie du `with` n'attende les workers
+                    self.stop()
+                    raise
+                self.peak_in_flight = scheduler.peak_in_flight
+                if scheduler.throttled:
+                    self.on_status(f"Budget mémoire: jusqu'à {scheduler.peak_in_flight} conversion(s) simultanée(s), "
+                                   f"pic estimé {scheduler.peak_bytes / 1024 ** 2:.0f} Mo")
+            if self._upload_stage is not None:
+                pending = self._upload_stage.pending()
+                if pending and not self._stop_requested:
+                    self.on_status(f"Conversions terminées, {pending} upload(s) en attente...")
+            complete = not self._stop_requested
+        finally:
+            self._end(cancel_uploads=self._stop_requested, complete=complete)
+            self.stats.wall_time = time.perf_counter() - batch_start
+        return self.converted, self.failed, total
+
+    def watch(self, watcher: FolderWatcher,
+              on_backlog: Callable[[int, int, int], None] = _noop) -> Tuple[int, int, int]:
+        """Mode surveillance: convertit (et uploade) les fichiers au fil de leur arrivée dans le dossier
+        surveillé, avec un exécuteur gardé ouvert, jusqu'à stop(). self.files grossit à chaque fichier prêt.
+        Après stop(), les fichiers déjà reçus sont menés à terme (conversion et upload); un second stop() les annule.
+        on_backlog(en cours d'écriture, en attente ou en conversion, uploads en file) est appelé à chaque changement.
+        Retourne (convertis, échecs, fichiers reçus).
+        """
+        batch_start = time.perf_counter()
+        self.files = []
+        self._watcher = watcher
+        if self._stop_requested:
+            watcher.cancel()
+        mode_label = "processus" if self.execution_mode == EXECUTION_MODE_PROCESS else "threads"
+        self.on_status(f"👁️ Surveillance de {', '.join(watcher.roots)} ({self.max_workers} {mode_label})...")
+        uploading, direct_upload, fingerprint = self._begin(watcher.roots)
+        complete = False
+        last_backlog = None
+        queue = self._queue = ConversionQueue(policy=self.order, priority=self.priority)
+
+        def report_backlog(in_flight: int):
+            nonlocal last_backlog
+            uploads = self._upload_stage.pending() if self._upload_stage is not None else 0
+            backlog = (watcher.settling, watcher.ready + len(queue) + in_flight, uploads)
+            if backlog != last_backlog:
+                last_backlog = backlog
+                on_backlog(*backlog)
+
+        try:
+            with self._open_executor() as executor:
+                scheduler = self._scheduler(executor, direct_upload)
+
+                def arrivals() -> Iterator[Optional[str]]:
+                    for file_path in watcher:
+                        if file_path is not None:
+                            self.files.append(file_path)
+                            if self._journal is not None:
+                                self._journal.queue([file_path])
+                            if not self._skip_if_up_to_date(file_path, fingerprint, uploading):
+                                queue.add(file_path)
+                            if watcher.ready:  # tous les fichiers prêts entrent dans la file avant de choisir
+                                continue
+                        report_backlog(scheduler.in_flight())
+                        yield queue.pop()  # None: rien à convertir pour l'instant
+                    # Surveillance arrêtée: les fichiers reçus mais pas encore soumis sont menés à terme
+                    if not self._cancel_requested:
+                        yield from queue
+
+                # stop() arrête la surveillance: les fichiers déjà reçus sont terminés et uploadés
+                for file_path, future in scheduler.completed(arrivals()):
+                    self._collect(file_path, future, fingerprint, uploading)
+                    report_backlog(scheduler.in_flight())
+                self.peak_in_flight = scheduler.peak_in_flight
+            if self._upload_stage is not None and self._upload_stage.pending():
+                self.on_status(f"Surveillance arrêtée, {self._upload_stage.pending()} upload(s) en attente...")
+            complete = not self._cancel_requested  # un premier stop() est la fin normale d'une surveillance
+        finally:
+            self._end(cancel_uploads=self._cancel_requested, complete=complete)
+            self._watcher = None
+            self.stats.wall_time = time.perf_counter() - batch_start
+        return self.converted, self.failed, len(self.files)
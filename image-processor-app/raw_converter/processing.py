@@ -1,20 +1,178 @@
 """Fonctions de traitement d'image RAW vers JPEG.
 Séparé de PyQt pour faciliter les tests.
+rawpy, Pillow et NumPy sont importés au premier traitement, pas à l'import du module: l'interface
+et la CLI n'utilisent ici que des constantes et des dataclasses, et s'affichent sans les charger.
 """
 from __future__ import annotations
 import os
+from functools import lru_cache
+from io import BytesIO
 from pathlib import Path
-from typing import Optional, Tuple
-import rawpy
-from PIL import Image, ImageEnhance, ImageFilter, ImageDraw, ImageFont
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+from .telemetry import (StageClock, worker_id, STAGE_DECODE, STAGE_RESIZE, STAGE_ENHANCE, STAGE_WATERMARK,
+                        STAGE_OVERLAY, STAGE_ENCODE, STAGE_WRITE, STAGE_LABELS)
+
+if TYPE_CHECKING:  # annotations seulement: les imports réels restent dans les fonctions
+    import rawpy
+    from PIL import Image
 
 MAX_WEB_SIZE = 768
+RAW_EXTENSIONS = {'.cr2', '.cr3', '.nef', '.arw', '.dng', '.raf', '.orf', '.rw2', '.pef', '.srw'}
+JPEG_EXTENSIONS = ('.jpg', '.jpeg')
+
+# Modes de décodage RAW
+DECODE_MODE_FULL = "full"        # décodage RAW (voir DECODE_POLICY_*)
+DECODE_MODE_PREVIEW = "preview"  # aperçu JPEG intégré si assez grand, sinon décodage complet
+DECODE_MODES = (DECODE_MODE_FULL, DECODE_MODE_PREVIEW)
+
+# Politique de choix des paramètres de dématriçage
+DECODE_POLICY_AUTO = "auto"        # half_size / PPG selon la taille cible
+DECODE_POLICY_QUALITY = "quality"  # toujours AHD pleine résolution
+DECODE_POLICIES = (DECODE_POLICY_AUTO, DECODE_POLICY_QUALITY)
+# Marge minimale de réduction conservée après décodage (évite un rendu sous-échantillonné)
+DECODE_DOWNSCALE_MARGIN = 1.5
+# Estimation mémoire d'un décodage: marge pour les buffers internes de LibRaw (dématriçage, courbes)
+MEMORY_ESTIMATE_MARGIN = 1.25
+
+# Moteur des retouches web (contraste, saturation, netteté)
+ENHANCE_BACKEND_PILLOW = "pillow"  # ImageEnhance + UnsharpMask
+ENHANCE_BACKEND_NUMPY = "numpy"    # noyau fusionné (voir enhance.py)
+ENHANCE_BACKENDS = (ENHANCE_BACKEND_PILLOW, ENHANCE_BACKEND_NUMPY)
+
+# Polices de l'overlay nom de fichier, essayées dans l'ordre (macOS, Linux, Windows, puis
+# noms résolus par Pillow dans les dossiers système). RAW_CONVERTER_FONTS permet d'en ajouter
+# en tête (chemins séparés par os.pathsep).
+FONT_PATHS_ENV = "RAW_CONVERTER_FONTS"
+FONT_CANDIDATES = (
+    "/System/Library/Fonts/Supplemental/Arial.ttf",
+    "/System/Library/Fonts/Arial.ttf",
+    "/Library/Fonts/Arial.ttf",
+    "/System/Library/Fonts/Helvetica.ttc",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
+    "C:\\Windows\\Fonts\\arial.ttf",
+    "Arial.ttf",
+    "DejaVuSans.ttf",
+)
+
+# Orientation LibRaw (raw.sizes.flip) -> nom de la transposition PIL (Image.Transpose)
+_FLIP_TRANSPOSE = {
+    3: "ROTATE_180",
+    5: "ROTATE_90",
+    6: "ROTATE_270",
+}
+
+class Rendition:
+    """Déclinaison JPEG produite à partir du décodage unique d'un RAW.
+    quality None: qualité du lot. watermark / overlay ne s'appliquent que si le watermark /
+    l'overlay sont aussi activés pour le lot. Le JPEG est nommé `<stem><suffix>.jpg`.
+    """
+    def __init__(self, name: str, max_size: int, quality: Optional[int] = None,
+                 watermark: bool = True, overlay: bool = True, suffix: Optional[str] = None):
+        self.name = name
+        self.max_size = max_size
+        self.quality = quality
+        self.watermark = watermark
+        self.overlay = overlay
+        self.suffix = f"_{name}" if suffix is None else suffix
+
+    def key(self) -> tuple:
+        """Réglages qui influencent le JPEG (empreinte du manifeste)."""
+        return (self.name, self.max_size, self.quality, self.watermark, self.overlay, self.suffix)
+
+
+PRIMARY_RENDITION = "web"
+# Déclinaisons proposées dans l'interface, en plus du JPEG web principal
+RENDITION_PRESETS = {
+    "thumb": Rendition("thumb", 320, quality=75, watermark=False, overlay=False),
+    "large": Rendition("large", 2048, quality=85),
+}
+
+
+def primary_rendition(quality: int) -> Rendition:
+    """JPEG web principal: MAX_WEB_SIZE px, nommé `<stem>.jpg` comme avant les déclinaisons."""
+    return Rendition(PRIMARY_RENDITION, MAX_WEB_SIZE, quality, suffix="")
+
+
+def build_renditions(quality: int, extra_renditions: Optional[Sequence[Rendition]] = None) -> List[Rendition]:
+    return [primary_rendition(quality)] + list(extra_renditions or ())
+
+
+class ConversionJob:
+    """Paramètres d'une conversion, transmis tels quels aux workers.
+    Objet simple et picklable pour pouvoir traverser un ProcessPoolExecutor.
+    """
+    def __init__(self, file_path: str, output_dir: str, quality: int,
+                 watermark_enabled: bool = True, watermark_path: Optional[str] = None,
+                 filename_display_enabled: bool = True, decode_mode: str = DECODE_MODE_FULL,
+                 decode_policy: str = DECODE_POLICY_AUTO, font_path: Optional[str] = None,
+                 enhance_backend: str = ENHANCE_BACKEND_PILLOW, write_local: bool = True,
+                 return_data: bool = False, extra_renditions: Optional[Sequence[Rendition]] = None):
+        self.file_path = file_path
+        self.output_dir = output_dir
+        self.quality = quality
+        self.watermark_enabled = watermark_enabled
+        self.watermark_path = watermark_path
+        self.filename_display_enabled = filename_display_enabled
+        self.decode_mode = decode_mode
+        self.decode_policy = decode_policy
+        self.font_path = font_path
+        self.enhance_backend = enhance_backend
+        self.write_local = write_local  # False: JPEG gardé en mémoire uniquement (upload direct)
+        self.return_data = return_data  # True: octets JPEG renvoyés dans ConversionResult.jpeg_data
+        self.extra_renditions = list(extra_renditions or ())  # déclinaisons en plus du JPEG web
+
+
+# Statuts d'un résultat de conversion
+STATUS_CONVERTED = "converted"
+STATUS_SKIPPED = "skipped"  # sortie encore valide d'après le manifeste, aucun décodage
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"  # lot arrêté pendant la conversion, sorties partielles supprimées
+
+
+class ConversionCancelled(Exception):
+    """Levée entre deux étapes d'une conversion quand le lot est arrêté."""
+    def __init__(self, stage: str):
+        super().__init__(stage)
+        self.stage = stage
+
+
+# Événement d'annulation du lot dans un processus worker (installé par install_cancel_event)
+_WORKER_CANCEL_EVENT = None
+
+
+def install_cancel_event(cancel_event):
+    """Initializer du ProcessPoolExecutor: un multiprocessing.Event ne se transmet qu'à la création du processus."""
+    global _WORKER_CANCEL_EVENT
+    _WORKER_CANCEL_EVENT = cancel_event
+
 
 class ConversionResult:
-    def __init__(self, filename: str, success: bool, message: str):
+    """Résultat d'une conversion et sa télémétrie: durée par étape (secondes, clés telemetry.STAGE_*,
+    cumulées sur les déclinaisons), octets lus/produits, dimensions du JPEG web et worker (pid/thread).
+    jpeg_data (upload direct) associe chaque nom de JPEG produit à ses octets.
+    """
+    def __init__(self, filename: str, success: bool, message: str, status: Optional[str] = None,
+                 jpeg_data: Optional[Dict[str, bytes]] = None, timings: Optional[Dict[str, float]] = None,
+                 input_bytes: int = 0, output_bytes: int = 0,
+                 output_size: Optional[Tuple[int, int]] = None, worker: Optional[str] = None,
+                 rendition_sizes: Optional[Dict[str, Tuple[int, int]]] = None):
         self.filename = filename
         self.success = success
         self.message = message
+        self.status = status or (STATUS_CONVERTED if success else STATUS_FAILED)
+        self.jpeg_data = jpeg_data  # JPEG encodé en mémoire (mode upload direct)
+        self.timings: Dict[str, float] = timings or {}
+        self.input_bytes = input_bytes
+        self.output_bytes = output_bytes
+        self.output_size = output_size
+        self.worker = worker
+        self.rendition_sizes: Dict[str, Tuple[int, int]] = rendition_sizes or {}
+
+    @property
+    def total_time(self) -> float:
+        return sum(self.timings.values())
 
     def __iter__(self):  # compatibilité avec unpacking
         yield self.filename
@@ -22,12 +180,33 @@ class ConversionResult:
         yield self.message
 
 
-def _apply_web_optimizations(image: Image.Image) -> Image.Image:
-    # Redimensionnement intelligent
-    if max(image.size) > MAX_WEB_SIZE:
-        ratio = MAX_WEB_SIZE / max(image.size)
+def output_path_for(file_path: str, output_dir: str, suffix: str = "") -> str:
+    """Chemin du JPEG produit pour un fichier RAW donné (suffixe de la déclinaison éventuel)."""
+    return os.path.join(output_dir, f"{Path(file_path).stem}{suffix}.jpg")
+
+
+def output_paths_for(file_path: str, output_dir: str, renditions: Sequence[Rendition]) -> List[str]:
+    return [output_path_for(file_path, output_dir, r.suffix) for r in renditions]
+
+
+def _resize_for_web(image: Image.Image, max_size: int = MAX_WEB_SIZE) -> Image.Image:
+    """Redimensionnement intelligent (plus grand côté ramené à max_size)."""
+    from PIL import Image
+    if max(image.size) > max_size:
+        ratio = max_size / max(image.size)
         new_size = tuple(int(dim * ratio) for dim in image.size)
         image = image.resize(new_size, Image.Resampling.LANCZOS)
+    return image
+
+
+def _enhance_for_web(image: Image.Image, enhance_backend: str = ENHANCE_BACKEND_PILLOW) -> Image.Image:
+    """Contraste, saturation et netteté sur l'image déjà redimensionnée."""
+    from PIL import Image, ImageEnhance, ImageFilter
+    if enhance_backend == ENHANCE_BACKEND_NUMPY:
+        import numpy as np
+        from .enhance import enhance_array
+        rgb = image if image.mode == 'RGB' else image.convert('RGB')
+        return Image.fromarray(enhance_array(np.asarray(rgb)))
     # Contraste & saturation
     image = ImageEnhance.Contrast(image).enhance(1.1)
     image = ImageEnhance.Color(image).enhance(1.08)
@@ -36,93 +215,316 @@ def _apply_web_optimizations(image: Image.Image) -> Image.Image:
     return image
 
 
+def _apply_web_optimizations(image: Image.Image, enhance_backend: str = ENHANCE_BACKEND_PILLOW) -> Image.Image:
+    return _enhance_for_web(_resize_for_web(image), enhance_backend)
+
+
+@lru_cache(maxsize=16)
+def _load_watermark(watermark_path: str, mtime_ns: int, max_width: int) -> Tuple[Image.Image, Image.Image]:
+    """Charge et pré-redimensionne le watermark une seule fois par (chemin, mtime, largeur cible).
+    Retourne (calque RGB, masque alpha). Le cache est partagé par les threads d'un même processus.
+    """
+    from PIL import Image
+    with Image.open(watermark_path) as src:
+        watermark = src.convert('RGBA')
+    if watermark.width > max_width:
+        ratio = max_width / watermark.width
+        new_size = (max_width, int(watermark.height * ratio))
+        watermark = watermark.resize(new_size, Image.Resampling.LANCZOS)
+    return watermark.convert('RGB'), watermark.getchannel('A')
+
+
 def _apply_watermark(image: Image.Image, watermark_path: str) -> Image.Image:
     if not watermark_path or not os.path.exists(watermark_path):
         return image
     try:
-        watermark = Image.open(watermark_path)
-        if watermark.mode != 'RGBA':
-            watermark = watermark.convert('RGBA')
-        max_width = int(image.width * 0.15)
-        if watermark.width > max_width:
-            ratio = max_width / watermark.width
-            new_size = (max_width, int(watermark.height * ratio))
-            watermark = watermark.resize(new_size, Image.Resampling.LANCZOS)
+        layer, alpha = _load_watermark(watermark_path, os.stat(watermark_path).st_mtime_ns,
+                                       int(image.width * 0.15))
         margin = 20
-        x = image.width - watermark.width - margin
-        y = image.height - watermark.height - margin
-        if image.mode != 'RGBA':
-            image = image.convert('RGBA')
-        image.paste(watermark, (x, y), watermark)
-        if image.mode == 'RGBA':
-            bg = Image.new('RGB', image.size, (255, 255, 255))
-            bg.paste(image, mask=image.split()[3])
-            image = bg
+        x = image.width - layer.width - margin
+        y = image.height - layer.height - margin
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        # Fusion alpha limitée à la zone du watermark, directement dans l'image RGB
+        image.paste(layer, (x, y), alpha)
     except Exception as e:
         print(f"Erreur watermark: {e}")
     return image
 
 
-def _apply_filename_overlay(image: Image.Image, source_path: str) -> Image.Image:
+def _font_candidates(preferred: Optional[str]) -> Tuple[str, ...]:
+    env_paths = [p for p in os.getenv(FONT_PATHS_ENV, "").split(os.pathsep) if p]
+    return tuple(([preferred] if preferred else []) + env_paths + list(FONT_CANDIDATES))
+
+
+@lru_cache(maxsize=8)
+def _resolve_font_path(preferred: Optional[str] = None) -> Optional[str]:
+    """Recherche (une seule fois) la première police TrueType chargeable. None -> police par défaut de Pillow."""
+    from PIL import ImageFont
+    for candidate in _font_candidates(preferred):
+        try:
+            ImageFont.truetype(candidate, 20)
+            return candidate
+        except (OSError, ValueError):
+            continue
+    print("Overlay texte: aucune police TrueType trouvée, utilisation de la police par défaut")
+    return None
+
+
+@lru_cache(maxsize=64)
+def _get_font(font_path: Optional[str], size: int):
+    """Police mémoïsée par (chemin, taille)."""
+    from PIL import ImageFont
+    if font_path:
+        return ImageFont.truetype(font_path, size)
+    try:
+        return ImageFont.load_default(size=size)  # Pillow >= 10.1
+    except TypeError:
+        return ImageFont.load_default()
+
+
+def _overlay_layout(text: str, image_size: Tuple[int, int], font_path: Optional[str]):
+    """Police et position du texte. Seule la police (chemin, taille) est mémoïsée: le texte (nom du
+    fichier) change à chaque image, il est mesuré à chaque fois.
+    """
+    font_size = max(20, min(60, int(min(image_size) * 0.03)))
+    font = _get_font(font_path, font_size)
+    bbox = font.getbbox(text)
+    text_width = bbox[2] - bbox[0]
+    text_height = bbox[3] - bbox[1]
+    margin = 20
+    return font, (image_size[0] - text_width - margin, image_size[1] - text_height - margin)
+
+
+def _apply_filename_overlay(image: Image.Image, source_path: str, font_path: Optional[str] = None) -> Image.Image:
+    from PIL import ImageDraw
     try:
-        draw = ImageDraw.Draw(image)
         filename_text = Path(source_path).stem
-        font_size = max(20, min(60, int(min(image.size) * 0.03)))
-        try:
-            font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", font_size)
-        except Exception:
-            font = ImageFont.load_default()
-        bbox = draw.textbbox((0, 0), filename_text, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
-        margin = 20
-        x = image.width - text_width - margin
-        y = image.height - text_height - margin
-        draw.text((x, y), filename_text, fill=(255, 50, 50), font=font)
+        font, position = _overlay_layout(filename_text, image.size, _resolve_font_path(font_path))
+        ImageDraw.Draw(image).text(position, filename_text, fill=(255, 50, 50), font=font)
     except Exception as e:
         print(f"Erreur overlay texte: {e}")
     return image
 
 
+def _extract_preview(raw, min_size: int) -> Optional[Image.Image]:
+    """Retourne l'aperçu intégré au RAW s'il fait au moins min_size px (plus grand côté), sinon None."""
+    import rawpy
+    from PIL import Image, ImageOps
+    try:
+        thumb = raw.extract_thumb()
+    except (rawpy.LibRawNoThumbnailError, rawpy.LibRawUnsupportedThumbnailError):
+        return None
+    if thumb.format == rawpy.ThumbFormat.JPEG:
+        preview = Image.open(BytesIO(thumb.data))
+        if preview.getexif().get(0x0112, 1) != 1:  # tag Orientation
+            preview = ImageOps.exif_transpose(preview)
+        else:
+            transpose = _FLIP_TRANSPOSE.get(raw.sizes.flip)
+            if transpose is not None:
+                preview = preview.transpose(Image.Transpose[transpose])
+    elif thumb.format == rawpy.ThumbFormat.BITMAP:
+        preview = Image.fromarray(thumb.data)
+    else:
+        return None
+    if max(preview.size) < min_size:
+        return None
+    return preview.convert('RGB')
+
+
+def choose_decode_params(sensor_size: Tuple[int, int], target_size: int,
+                         policy: str = DECODE_POLICY_AUTO) -> Tuple[bool, "rawpy.DemosaicAlgorithm", str]:
+    """Choisit (half_size, algorithme de dématriçage, libellé) selon la taille cible.
+    - demi-taille si la cible reste nettement sous la moitié du capteur (pas de dématriçage, 4x moins de mémoire)
+    - PPG pleine taille si la cible reste nettement sous la taille du capteur
+    - AHD pleine taille sinon, ou toujours avec la politique 'quality'
+    """
+    import rawpy
+    sensor_long = max(sensor_size)
+    if policy == DECODE_POLICY_AUTO and sensor_long > 0:
+        if target_size * DECODE_DOWNSCALE_MARGIN <= sensor_long / 2:
+            return True, rawpy.DemosaicAlgorithm.AHD, "demi-taille"
+        if target_size * DECODE_DOWNSCALE_MARGIN <= sensor_long:
+            return False, rawpy.DemosaicAlgorithm.PPG, "PPG"
+    return False, rawpy.DemosaicAlgorithm.AHD, "AHD"
+
+
+def probe_sensor_size(file_path: str) -> Optional[Tuple[int, int]]:
+    """Taille du capteur (largeur, hauteur) lue dans l'en-tête, sans décompresser les données RAW."""
+    import rawpy
+    try:
+        with rawpy.imread(file_path) as raw:
+            return raw.sizes.raw_width, raw.sizes.raw_height
+    except Exception:
+        return None
+
+
+def estimate_decode_memory(file_path: str, decode_mode: str = DECODE_MODE_FULL,
+                           decode_policy: str = DECODE_POLICY_AUTO, target_size: int = MAX_WEB_SIZE) -> int:
+    """Pic mémoire estimé (octets) de la conversion d'un RAW, d'après la taille du capteur:
+    données Bayer 16 bits + image LibRaw 4x16 bits + sortie RGB 8 bits et sa copie PIL
+    (ces trois dernières divisées par 4 en demi-taille). En-tête illisible: ~1 pixel par octet de fichier.
+    """
+    sensor = probe_sensor_size(file_path)
+    if sensor is None:
+        try:
+            pixels = os.path.getsize(file_path)
+        except OSError:
+            pixels = 0
+        sensor = (int((pixels * 1.5) ** 0.5), int((pixels / 1.5) ** 0.5))
+    pixels = sensor[0] * sensor[1]
+    if decode_mode == DECODE_MODE_PREVIEW:
+        # Aperçu JPEG intégré (souvent pleine définition) décodé puis converti en RGB
+        return int(pixels * 3 * 2 * MEMORY_ESTIMATE_MARGIN)
+    half_size, _demosaic, _label = choose_decode_params(sensor, target_size, decode_policy)
+    out_pixels = pixels // 4 if half_size else pixels
+    return int((pixels * 2 + out_pixels * (8 + 3 + 3)) * MEMORY_ESTIMATE_MARGIN)
+
+
+def _decode_raw(file_path: str, decode_mode: str = DECODE_MODE_FULL,
+                decode_policy: str = DECODE_POLICY_AUTO,
+                target_size: int = MAX_WEB_SIZE) -> Tuple[Image.Image, str]:
+    """Décode le RAW selon le mode demandé. Retourne (image, libellé du décodage utilisé)."""
+    import rawpy
+    from PIL import Image
+    with rawpy.imread(file_path) as raw:
+        if decode_mode == DECODE_MODE_PREVIEW:
+            preview = _extract_preview(raw, target_size)
+            if preview is not None:
+                return preview, "aperçu intégré"
+        half_size, demosaic, label = choose_decode_params((raw.sizes.width, raw.sizes.height),
+                                                          target_size, decode_policy)
+        rgb = raw.postprocess(
+            use_camera_wb=True,
+            half_size=half_size,
+            no_auto_bright=True,
+            output_bps=8,
+            bright=1.15,
+            highlight_mode=rawpy.HighlightMode.Clip,
+            use_auto_wb=False,
+            gamma=(2.2, 4.5),
+            output_color=rawpy.ColorSpace.sRGB,
+            demosaic_algorithm=demosaic,
+        )
+    return Image.fromarray(rgb), label
+
+
+def _write_atomic(path: str, data: bytes):
+    """Écrit dans un .part puis renomme: jamais de JPEG tronqué à l'emplacement final."""
+    tmp = f"{path}.part"
+    try:
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def encode_jpeg(image: Image.Image, quality: int) -> bytes:
+    """Encode l'image en JPEG web (progressif, optimisé) et retourne les octets."""
+    buffer = BytesIO()
+    image.save(buffer, format='JPEG', quality=quality, optimize=True, progressive=True,
+               subsampling=0 if quality > 85 else 2, dpi=(150, 150))
+    return buffer.getvalue()
+
+
 def convert_raw_to_jpeg(file_path: str, output_dir: str, quality: int,
                         watermark_enabled: bool = True, watermark_path: Optional[str] = None,
-                        filename_display_enabled: bool = True) -> ConversionResult:
+                        filename_display_enabled: bool = True,
+                        decode_mode: str = DECODE_MODE_FULL,
+                        decode_policy: str = DECODE_POLICY_AUTO,
+                        font_path: Optional[str] = None,
+                        enhance_backend: str = ENHANCE_BACKEND_PILLOW,
+                        write_local: bool = True, return_data: bool = False,
+                        extra_renditions: Optional[Sequence[Rendition]] = None,
+                        cancel_event=None) -> ConversionResult:
+    """Convertit un RAW en JPEG web, plus les déclinaisons demandées, à partir d'un seul décodage.
+    Les déclinaisons sont traitées de la plus grande à la plus petite, chacune réduite depuis la
+    précédente (avant retouches, pour ne pas cumuler la netteté). Chaque JPEG est encodé en mémoire
+    puis écrit dans output_dir (si write_local) et/ou renvoyé dans ConversionResult.jpeg_data (si return_data).
+    cancel_event (threading/multiprocessing.Event) est consulté après chaque étape: s'il est levé,
+    la conversion s'arrête et les JPEG déjà écrits pour ce fichier sont supprimés (STATUS_CANCELLED).
+    """
     filename = os.path.basename(file_path)
+    clock = StageClock()
+    input_bytes = 0
+    written: List[str] = []
+
+    def lap(stage: str):
+        clock.lap(stage)
+        if cancel_event is not None and cancel_event.is_set():
+            raise ConversionCancelled(stage)
+
     try:
-        with rawpy.imread(file_path) as raw:
-            rgb = raw.postprocess(
-                use_camera_wb=True,
-                half_size=False,
-                no_auto_bright=True,
-                output_bps=8,
-                bright=1.15,
-                highlight_mode=rawpy.HighlightMode.Clip,
-                use_auto_wb=False,
-                gamma=(2.2, 4.5),
-                output_color=rawpy.ColorSpace.sRGB,
-                demosaic_algorithm=rawpy.DemosaicAlgorithm.AHD,
-            )
-        image = Image.fromarray(rgb)
-        image = _apply_web_optimizations(image)
-        if watermark_enabled:
-            image = _apply_watermark(image, watermark_path or '')
-        if filename_display_enabled:
-            image = _apply_filename_overlay(image, file_path)
+        if cancel_event is not None and cancel_event.is_set():
+            raise ConversionCancelled("")  # annulé avant le début (file du pool)
+        input_bytes = os.path.getsize(file_path)
+        renditions = build_renditions(quality, extra_renditions)
+        image, decode_label = _decode_raw(file_path, decode_mode, decode_policy,
+                                          target_size=max(r.max_size for r in renditions))
+        lap(STAGE_DECODE)
+        outputs: Dict[str, bytes] = {}
+        sizes: Dict[str, Tuple[int, int]] = {}
+        for rendition in sorted(renditions, key=lambda r: -r.max_size):
+            image = _resize_for_web(image, rendition.max_size)
+            lap(STAGE_RESIZE)
+            out = _enhance_for_web(image, enhance_backend)  # nouvelle image: `image` reste la base non retouchée
+            lap(STAGE_ENHANCE)
+            if watermark_enabled and rendition.watermark:
+                out = _apply_watermark(out, watermark_path or '')
+                lap(STAGE_WATERMARK)
+            if filename_display_enabled and rendition.overlay:
+                out = _apply_filename_overlay(out, file_path, font_path)
+                lap(STAGE_OVERLAY)
+            out_path = output_path_for(file_path, output_dir, rendition.suffix)
+            data = encode_jpeg(out, rendition.quality or quality)
+            lap(STAGE_ENCODE)
+            if write_local:
+                _write_atomic(out_path, data)
+                written.append(out_path)
+                lap(STAGE_WRITE)
+            outputs[os.path.basename(out_path)] = data
+            sizes[rendition.name] = out.size
         base_name = Path(file_path).stem
-        output_path = os.path.join(output_dir, f"{base_name}.jpg")
-        original_size = os.path.getsize(file_path) / (1024 * 1024)
-        save_options = {
-            'format': 'JPEG',
-            'quality': quality,
-            'optimize': True,
-            'progressive': True,
-            'subsampling': 0 if quality > 85 else 2,
-            'dpi': (150, 150),
-        }
-        image.save(output_path, **save_options)
-        final_size = os.path.getsize(output_path) / (1024 * 1024)
+        original_size = input_bytes / (1024 * 1024)
+        final_size = len(outputs[f"{base_name}.jpg"]) / (1024 * 1024)
         compression_ratio = (1 - final_size / original_size) * 100 if original_size > 0 else 0
         msg = f"✅ {base_name}.jpg ({original_size:.1f}MB → {final_size:.1f}MB, -{compression_ratio:.0f}%)"
-        return ConversionResult(filename, True, msg)
+        if len(renditions) > 1:
+            msg += " [+ " + ", ".join(f"{r.name} {max(sizes[r.name])}px" for r in renditions[1:]) + "]"
+        msg += f" [décodage: {decode_label}]"
+        if not write_local:
+            msg += " [mémoire]"
+        return ConversionResult(filename, True, msg, jpeg_data=outputs if return_data else None,
+                                timings=clock.timings, input_bytes=input_bytes,
+                                output_bytes=sum(len(d) for d in outputs.values()),
+                                output_size=sizes[PRIMARY_RENDITION], worker=worker_id(),
+                                rendition_sizes=sizes)
+    except ConversionCancelled as e:
+        for path in written:  # jeu de déclinaisons incomplet: rien ne reste du fichier annulé
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        after = f" après {STAGE_LABELS.get(e.stage, e.stage)}" if e.stage else ""
+        return ConversionResult(filename, False, f"⏹️ {Path(file_path).stem}.jpg annulé{after}", STATUS_CANCELLED,
+                                timings=clock.timings, input_bytes=input_bytes, worker=worker_id())
     except Exception as e:
-        return ConversionResult(filename, False, f"❌ Erreur: {e}")
+        return ConversionResult(filename, False, f"❌ Erreur: {e}", timings=clock.timings,
+                                input_bytes=input_bytes, worker=worker_id())
+
+
+def run_conversion_job(job: ConversionJob, cancel_event=None) -> ConversionResult:
+    """Point d'entrée des workers (fonction module-level, donc picklable).
+    En mode processus, l'événement d'annulation vient de install_cancel_event; en mode thread, il est passé ici.
+    """
+    return convert_raw_to_jpeg(job.file_path, job.output_dir, job.quality,
+                               job.watermark_enabled, job.watermark_path,
+                               job.filename_display_enabled, job.decode_mode,
+                               job.decode_policy, job.font_path, job.enhance_backend,
+                               job.write_local, job.return_data, job.extra_renditions,
+                               cancel_event if cancel_event is not None else _WORKER_CANCEL_EVENT)
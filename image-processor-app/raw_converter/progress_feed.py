@@ -0,0 +1,94 @@
+"""Remontée de la progression d'un lot vers l'interface, sans Qt.
+
+Les threads du lot (conversion, upload) déposent leurs événements dans un ProgressFeed au lieu
+d'émettre un signal Qt par fichier: pour la progression et le statut, seule la dernière valeur
+est gardée; les lignes de journal s'accumulent dans un tampon borné. Le thread GUI vide le feed
+à cadence fixe: le coût d'affichage ne dépend plus du débit du lot.
+Le journal complet est écrit au fil de l'eau dans un fichier (~/.raw_converter/logs/).
+"""
+from __future__ import annotations
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+from .journal import USER_JOURNAL_DIR
+
+LOG_DIR = os.path.join(USER_JOURNAL_DIR, "logs")
+KEEP_LOG_FILES = 20
+# Lignes gardées en mémoire entre deux rafraîchissements (au-delà, les plus anciennes ne sont pas affichées)
+DEFAULT_MAX_LINES = 5000
+
+# Valeurs « dernière valeur gagnante » d'un feed
+FEED_PROGRESS = "progress"
+FEED_STATUS = "status"
+FEED_BACKLOG = "backlog"
+
+
+def new_log_path(kind: str, directory: str = LOG_DIR) -> str:
+    """Fichier de journal d'un lot: <kind>-AAAAMMJJ-HHMMSS.log."""
+    return os.path.join(directory, f"{kind}-{time.strftime('%Y%m%d-%H%M%S')}.log")
+
+
+def prune_logs(directory: str = LOG_DIR, keep: int = KEEP_LOG_FILES):
+    """Ne garde que les `keep` journaux les plus récents."""
+    try:
+        entries = [e for e in os.scandir(directory) if e.is_file() and e.name.endswith(".log")]
+    except OSError:
+        return
+    for entry in sorted(entries, key=lambda e: e.stat().st_mtime, reverse=True)[keep:]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+
+class ProgressFeed:
+    """Boîte aux lettres entre les threads d'un lot et le thread GUI. Thread-safe.
+    post() remplace une valeur (progression, statut...), log() ajoute une ligne au journal,
+    drain() rend (valeurs modifiées, nouvelles lignes, lignes écartées du tampon) depuis le dernier appel.
+    """
+    def __init__(self, max_lines: int = DEFAULT_MAX_LINES, log_path: Optional[str] = None):
+        self._lock = threading.Lock()
+        self._values: Dict[str, object] = {}
+        self._lines: Deque[str] = deque(maxlen=max(1, max_lines))
+        self._dropped = 0
+        self.log_path: Optional[str] = None
+        self._file = None
+        if log_path:
+            try:
+                os.makedirs(os.path.dirname(log_path), exist_ok=True)
+                prune_logs(os.path.dirname(log_path), KEEP_LOG_FILES - 1)
+                self._file = open(log_path, "a", encoding="utf-8", buffering=1)  # une écriture par ligne
+                self.log_path = log_path
+            except OSError:  # journal sur disque facultatif
+                self._file = None
+
+    def post(self, key: str, value: object):
+        with self._lock:
+            self._values[key] = value
+
+    def log(self, text: str):
+        lines = text.split("\n")
+        stamp = time.strftime("%H:%M:%S")
+        with self._lock:
+            for line in lines:
+                if len(self._lines) == self._lines.maxlen:
+                    self._dropped += 1
+                self._lines.append(line)
+                if self._file is not None:
+                    self._file.write(f"{stamp} {line}\n")
+
+    def drain(self) -> Tuple[Dict[str, object], List[str], int]:
+        with self._lock:
+            values, self._values = self._values, {}
+            lines = list(self._lines)
+            self._lines.clear()
+            dropped, self._dropped = self._dropped, 0
+        return values, lines, dropped
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
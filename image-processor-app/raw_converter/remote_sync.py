@@ -0,0 +1,247 @@
+"""Upload par lot et synchronisation avec un dossier distant Minio, indépendant de Qt.
+Utilisé par l'UploadWorker de l'onglet upload et par la commande `upload` de la CLI.
+
+En mode sync, le dossier distant est listé une seule fois (index nom -> taille, ETag) :
+un fichier absent est uploadé, un fichier de taille ou d'ETag différent est mis à jour,
+les autres sont ignorés sans aucune requête.
+Sans préfixe fixe, le dossier distant est celui du jour du premier envoi: il est retenu dans le manifeste
+du dossier local (voir manifest.py) et réutilisé par les synchronisations suivantes de ce dossier, sinon
+une sync le lendemain listerait un dossier du jour vide et renverrait toute la galerie.
+
+Un lot interrompu (plantage, veille, arrêt) reprend grâce au journal (voir journal.py): relancé avec
+les mêmes fichiers et la même destination, il ne renvoie pas les fichiers déjà uploadés.
+"""
+from __future__ import annotations
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
+from .minio_config import MinioConfig
+from .minio_uploader import (build_client, ensure_bucket, generate_object_name, ResilientUploader, RetryPolicy,
+                             UploadOutcome, call_with_retries, MULTIPART_PART_SIZE)
+from .manifest import ConversionManifest, upload_target
+from .journal import JobJournal, open_journal, journal_path, job_key, JOB_UPLOAD, STATE_UPLOADED, STATE_FAILED
+
+SYNC_NEW = "new"
+SYNC_CHANGED = "changed"
+SYNC_UNCHANGED = "unchanged"
+
+
+def s3_etag(path: str, part_size: int = MULTIPART_PART_SIZE) -> str:
+    """ETag S3 attendu pour un upload de `path` en parts de `part_size`:
+    MD5 du contenu pour un upload simple, MD5 des MD5 de parts suivi de '-N' en multipart.
+    """
+    part_digests = []
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(part_size), b""):
+            part_digests.append(hashlib.md5(chunk).digest())
+    if len(part_digests) <= 1:
+        return part_digests[0].hex() if part_digests else hashlib.md5(b"").hexdigest()
+    return f"{hashlib.md5(b''.join(part_digests)).hexdigest()}-{len(part_digests)}"
+
+
+class RemoteIndex:
+    """Index en mémoire des objets d'un dossier distant: nom -> (taille, ETag)."""
+    def __init__(self, objects: Optional[Dict[str, Tuple[int, str]]] = None):
+        self.objects: Dict[str, Tuple[int, str]] = objects or {}
+
+    @classmethod
+    def load(cls, client, bucket: str, prefix: str, policy: Optional[RetryPolicy] = None) -> "RemoteIndex":  # client: Minio
+        """Liste le dossier distant une seule fois (pagination gérée par list_objects). Une erreur
+        passagère relance le listing complet, selon `policy`.
+        """
+        def list_all() -> Dict[str, Tuple[int, str]]:
+            objects = {}
+            for obj in client.list_objects(bucket, prefix=prefix.strip("/") + "/", recursive=True):
+                if not obj.is_dir:
+                    objects[obj.object_name] = (obj.size, (obj.etag or "").strip('"'))
+            return objects
+        return cls(call_with_retries(list_all, policy))
+
+    def __len__(self) -> int:
+        return len(self.objects)
+
+    def classify(self, local_path: str, object_name: str) -> str:
+        """SYNC_NEW, SYNC_CHANGED ou SYNC_UNCHANGED. Le contenu n'est lu que si les tailles concordent."""
+        remote = self.objects.get(object_name)
+        if remote is None:
+            return SYNC_NEW
+        size, etag = remote
+        if os.path.getsize(local_path) != size:
+            return SYNC_CHANGED
+        return SYNC_UNCHANGED if s3_etag(local_path) == etag else SYNC_CHANGED
+
+
+def _noop(*_args):
+    pass
+
+
+class BatchUploader:
+    """Uploade une liste de JPEG vers Minio avec `parallelism` uploads simultanés sur un client partagé.
+    En mode sync, seuls les fichiers nouveaux ou modifiés sont envoyés.
+    on_file(chemin, succès, message, nouvelles tentatives, secondes passées à réessayer) est appelé
+    depuis le thread qui exécute run(). Les erreurs réseau passagères sont réessayées (voir ResilientUploader).
+    """
+    def __init__(self, files: List[str], minio_config: MinioConfig, parallelism: int = 8,
+                 sync: bool = False,
+                 resume: bool = True,
+                 on_status: Callable[[str], None] = _noop,
+                 on_file: Callable[[str, bool, str, int, float], None] = _noop,
+                 on_progress: Callable[[int], None] = _noop):
+        self.files = files
+        self.minio_config = minio_config
+        self.parallelism = max(1, parallelism)
+        self.sync = sync
+        self.resume = resume
+        self.on_status = on_status
+        self.on_file = on_file
+        self.on_progress = on_progress
+        self._stop = False
+        self._client = None
+        self._uploader: Optional[ResilientUploader] = None
+        self._prefix = ""
+        self._index: Optional[RemoteIndex] = None
+        self._journal: Optional[JobJournal] = None
+        self._journal_states: Dict[str, tuple] = {}
+        self.uploaded = self.updated = self.skipped = self.failed = 0
+        self.retries = 0  # nouvelles tentatives d'upload, tous fichiers confondus
+        self.retry_seconds = 0.0
+
+    def stop(self):
+        self._stop = True
+        if self._uploader is not None:
+            self._uploader.cancel()
+
+    def _upload_one(self, fpath: str) -> Tuple[UploadOutcome, str]:
+        """Retourne (résultat de l'upload, décision sync)."""
+        if self._stop:
+            return UploadOutcome(False, "⏹️ Annulé"), SYNC_NEW
+        if not os.path.exists(fpath):
+            return UploadOutcome(False, "❌ Fichier introuvable"), SYNC_NEW
+        if self._journal is not None and self._journal.resume_state(self._journal_states, fpath) == STATE_UPLOADED:
+            return UploadOutcome(True, "↩️ Déjà uploadé (reprise)"), SYNC_UNCHANGED
+        decision = SYNC_NEW
+        if self._index is not None:
+            object_name = generate_object_name(fpath, self._prefix)
+            decision = self._index.classify(fpath, object_name)
+            if decision == SYNC_UNCHANGED:
+                return UploadOutcome(True, "⏭️ Déjà à jour sur le serveur"), decision
+        outcome = self._uploader.upload_file(fpath, self._prefix)  # type: ignore
+        if outcome.ok and decision == SYNC_CHANGED:
+            outcome.message = outcome.message.replace("Upload OK", "Mis à jour")
+        return outcome, decision
+
+    def run(self) -> Tuple[int, int, int]:
+        """Retourne (envoyés, échecs, total). Détail dans uploaded / updated / skipped / failed."""
+        total = len(self.files)
+        self.uploaded = self.updated = self.skipped = self.failed = self.retries = 0
+        self.retry_seconds = 0.0
+        self.on_status(f"Initialisation upload ({total} fichiers)...")
+        if not (self.minio_config and self.minio_config.enabled and self.minio_config.connection_tested):
+            self.on_status("❌ Configuration Minio invalide ou non testée.")
+            return 0, total, total
+        # Un seul client partagé, pool HTTP dimensionné pour les uploads simultanés
+        self._client = build_client(self.minio_config, pool_size=self.parallelism)
+        if not self._client:
+            self.on_status("❌ Client Minio indisponible.")
+            return 0, total, total
+        policy = RetryPolicy.from_config(self.minio_config)
+        ok, msg = ensure_bucket(self._client, self.minio_config.bucket, policy)
+        self.on_status(msg)
+        if not ok:
+            return 0, total, total
+        self._prefix = self.minio_config.object_prefix()
+        if self.sync and not self.minio_config.prefix.strip("/"):
+            self._use_gallery_prefix()
+        self._uploader = ResilientUploader(self._client, self.minio_config.bucket, policy, self.on_status)
+        if self._stop:
+            self._uploader.cancel()
+        if self.resume:
+            self._open_journal()
+        failed = total
+        try:
+            sent, failed, total = self._run(total)
+            return sent, failed, total
+        finally:
+            self._uploader = None
+            if self._journal is not None:
+                if not self._stop and not failed:
+                    self._journal.finish()
+                self._journal.close()
+                self._journal = None
+
+    def _use_gallery_prefix(self):
+        """Sync sans préfixe fixe: reprend le dossier distant retenu pour ce dossier local, ou retient celui du jour."""
+        cfg = self.minio_config
+        try:
+            folder = os.path.commonpath([os.path.dirname(os.path.abspath(f)) for f in self.files])
+        except ValueError:  # aucun fichier, ou fichiers sur plusieurs lecteurs
+            folder = ""
+        if not folder or folder == os.path.dirname(folder):
+            self.on_status(f"⚠️ Sync sans préfixe fixe: dossier du jour {self._prefix}/ "
+                           "(fixez un préfixe pour resynchroniser la même galerie un autre jour)")
+            return
+        manifest = ConversionManifest(folder)
+        target = upload_target(cfg.endpoint, cfg.bucket)
+        known = manifest.remote_prefix(target)  # type: ignore
+        if known:
+            self._prefix = known
+            self.on_status(f"🔁 Sync vers le dossier distant déjà utilisé pour ce dossier: {known}/")
+            return
+        manifest.set_remote_prefix(target, self._prefix)  # type: ignore
+        manifest.save()
+        self.on_status(f"ℹ️ Pas de préfixe fixe: sync vers {self._prefix}/, réutilisé aux prochaines syncs de ce dossier")
+
+    def _open_journal(self):
+        cfg = self.minio_config
+        key = job_key(JOB_UPLOAD, cfg.endpoint, cfg.bucket, cfg.prefix, self.sync, files=self.files)
+        journal = self._journal = open_journal(journal_path(), JOB_UPLOAD, key, self.on_status)
+        if journal is None:
+            return
+        self._journal_states = journal.states()
+        if journal.resumed:
+            self._prefix = journal.upload_prefix or self._prefix  # même dossier distant qu'avant l'interruption
+            done = sum(1 for state, _size, _mtime in self._journal_states.values() if state == STATE_UPLOADED)
+            self.on_status(f"↩️ Reprise d'un upload interrompu: {done} fichier(s) déjà envoyé(s)")
+        else:
+            journal.set_upload_prefix(self._prefix)
+        journal.queue(self.files)
+
+    def _run(self, total: int) -> Tuple[int, int, int]:
+        if self.sync:
+            try:
+                self._index = RemoteIndex.load(self._client, self.minio_config.bucket, self._prefix,
+                                               self._uploader.policy)  # type: ignore
+            except Exception as e:
+                self.on_status(f"❌ Listing de {self._prefix}/ impossible: {e}")
+                return 0, total, total
+            self.on_status(f"🔎 {len(self._index)} objet(s) déjà présents dans {self._prefix}/")
+        with ThreadPoolExecutor(max_workers=self.parallelism) as executor:
+            future_to_file = {executor.submit(self._upload_one, fpath): fpath for fpath in self.files}
+            for idx, future in enumerate(as_completed(future_to_file), start=1):
+                if self._stop:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    self.on_status("⏹️ Upload interrompu")
+                    break
+                fpath = future_to_file[future]
+                try:
+                    outcome, decision = future.result()
+                except Exception as e:  # ex: fichier illisible pendant le calcul de l'ETag
+                    outcome, decision = UploadOutcome(False, f"❌ Erreur: {e}"), SYNC_NEW
+                up_ok = outcome.ok
+                self.retries += outcome.retries
+                self.retry_seconds += outcome.retry_seconds
+                if self._journal is not None:
+                    self._journal.mark(fpath, STATE_UPLOADED if up_ok else STATE_FAILED)
+                if not up_ok:
+                    self.failed += 1
+                elif decision == SYNC_UNCHANGED:
+                    self.skipped += 1
+                elif decision == SYNC_CHANGED:
+                    self.updated += 1
+                else:
+                    self.uploaded += 1
+                self.on_file(fpath, up_ok, outcome.message, outcome.retries, outcome.retry_seconds)
+                self.on_progress(int((idx / total) * 100))
+                self.on_status(f"{idx}/{total} traités")
+        return self.uploaded + self.updated, self.failed, total
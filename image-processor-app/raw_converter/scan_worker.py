@@ -0,0 +1,21 @@
+"""Worker PyQt d'analyse de dossier en arrière-plan (voir scanner.FolderScanner)."""
+from __future__ import annotations
+from typing import Iterable
+from PyQt6.QtCore import QThread, pyqtSignal
+from .scanner import FolderScanner
+
+
+class FolderScanWorker(QThread):
+    files_found = pyqtSignal(list)           # lot de chemins trouvés
+    progress_updated = pyqtSignal(int, int)  # dossiers parcourus, fichiers trouvés
+    scan_finished = pyqtSignal(int, bool)    # fichiers trouvés, annulé
+    def __init__(self, folder: str, extensions: Iterable[str], parent=None):
+        super().__init__(parent)
+        self.folder = folder
+        self.scanner = FolderScanner([folder], extensions, on_progress=self.progress_updated.emit)
+    def stop(self):
+        self.scanner.cancel()
+    def run(self):
+        for batch in self.scanner.batches():
+            self.files_found.emit(batch)
+        self.scan_finished.emit(self.scanner.files_found, self.scanner.cancelled)
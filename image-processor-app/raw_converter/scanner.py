@@ -0,0 +1,95 @@
+"""Recherche de fichiers par extension dans une arborescence, par lots et annulable (sans Qt).
+
+Basé sur os.scandir (le type des entrées est connu sans stat supplémentaire, ce qui compte
+sur un partage réseau). Les fichiers d'un même dossier sont triés par nom; les sous-dossiers
+sont parcourus en profondeur, dans l'ordre alphabétique.
+"""
+from __future__ import annotations
+import os
+import time
+from typing import Callable, Iterable, Iterator, List, Sequence
+
+SCAN_BATCH_SIZE = 500        # fichiers max par lot remonté à l'interface
+SCAN_BATCH_INTERVAL = 0.25   # secondes max entre deux lots non vides
+
+
+class FolderScanner:
+    """Parcourt un ou plusieurs dossiers et produit les fichiers trouvés par lots.
+    cancel() peut être appelé depuis un autre thread: le parcours s'arrête à l'entrée suivante.
+    on_progress(dossiers parcourus, fichiers trouvés) est appelé au plus toutes les `interval` secondes.
+    """
+    def __init__(self, roots: Sequence[str], extensions: Iterable[str],
+                 batch_size: int = SCAN_BATCH_SIZE, interval: float = SCAN_BATCH_INTERVAL,
+                 on_progress: Callable[[int, int], None] = lambda _dirs, _files: None):
+        self.roots = list(roots)
+        self.extensions = {e.lower() for e in extensions}
+        self.batch_size = max(1, batch_size)
+        self.interval = interval
+        self.on_progress = on_progress
+        self.dirs_scanned = 0
+        self.files_found = 0
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def _matches(self, name: str) -> bool:
+        # "._*": métadonnées AppleDouble écrites par macOS sur les cartes exFAT, pas des RAW
+        return not name.startswith("._") and os.path.splitext(name)[1].lower() in self.extensions
+
+    def _walk(self, root: str) -> Iterator[List[str]]:
+        """Produit la liste (triée) des fichiers retenus de chaque dossier visité, même vide."""
+        stack = [root]
+        while stack and not self._cancelled:
+            directory = stack.pop()
+            files, subdirs = [], []
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if self._cancelled:
+                            return
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                subdirs.append(entry.path)
+                            elif self._matches(entry.name) and entry.is_file():
+                                files.append(entry.path)
+                        except OSError:
+                            continue
+            except OSError:  # dossier illisible ou disparu pendant le parcours
+                continue
+            self.dirs_scanned += 1
+            stack.extend(sorted(subdirs, reverse=True))
+            files.sort()
+            yield files
+
+    def iter_files(self) -> Iterator[str]:
+        for root in self.roots:
+            for files in self._walk(root):
+                for path in files:
+                    self.files_found += 1
+                    yield path
+
+    def batches(self) -> Iterator[List[str]]:
+        """Lots d'au plus batch_size fichiers, remontés au moins toutes les `interval` secondes."""
+        batch: List[str] = []
+        last = time.monotonic()
+        for root in self.roots:
+            for files in self._walk(root):
+                self.files_found += len(files)
+                batch.extend(files)
+                while len(batch) >= self.batch_size:
+                    yield batch[:self.batch_size]
+                    batch = batch[self.batch_size:]
+                    last = time.monotonic()
+                if time.monotonic() - last >= self.interval:
+                    if batch:
+                        yield batch
+                        batch = []
+                    self.on_progress(self.dirs_scanned, self.files_found)
+                    last = time.monotonic()
+        if batch and not self._cancelled:
+            yield batch
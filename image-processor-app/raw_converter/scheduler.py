@@ -0,0 +1,112 @@
+"""Soumission au fil de l'eau des conversions, bornée en nombre et en mémoire estimée.
+
+Au lieu de soumettre tout le lot d'un coup, le planificateur ne garde en vol qu'une fenêtre
+de fichiers (au plus `max_in_flight`) dont la somme des coûts mémoire estimés reste sous le
+budget. Un fichier plus gros que le budget entier passe seul, pour que le lot avance toujours.
+
+La source peut être « vivante » (mode surveillance): elle produit alors None quand aucun
+fichier n'est disponible pour l'instant, et le planificateur continue de collecter les
+résultats en la réinterrogeant toutes les `idle_wait` secondes jusqu'à son épuisement.
+"""
+from __future__ import annotations
+import os
+import time
+from concurrent.futures import Future, FIRST_COMPLETED, wait
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+# Part de la RAM physique allouée par défaut aux conversions en vol
+DEFAULT_MEMORY_FRACTION = 0.5
+# Budget utilisé si la RAM physique n'est pas détectable (ex: Windows sans sysconf)
+FALLBACK_MEMORY_BUDGET = 4 * 1024 ** 3
+# Délai entre deux interrogations d'une source vivante inactive
+DEFAULT_IDLE_WAIT = 0.25
+
+_EXHAUSTED = object()
+
+
+def physical_memory() -> Optional[int]:
+    """RAM physique en octets, None si inconnue."""
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def default_memory_budget() -> int:
+    total = physical_memory()
+    return int(total * DEFAULT_MEMORY_FRACTION) if total else FALLBACK_MEMORY_BUDGET
+
+
+class BoundedScheduler:
+    """Alimente un exécuteur depuis un itérable de fichiers en respectant fenêtre et budget mémoire.
+    completed() produit les (fichier, future) au fur et à mesure qu'ils se terminent.
+    Non thread-safe: à piloter depuis un seul thread (celui qui consomme les résultats).
+    """
+    def __init__(self, submit: Callable[[str], Future], max_in_flight: int, budget_bytes: int,
+                 estimate: Callable[[str], int], on_throttle: Callable[[int, int], None] = lambda _n, _used: None):
+        self._submit = submit
+        self.max_in_flight = max(1, max_in_flight)
+        self.budget_bytes = max(1, budget_bytes)
+        self._estimate = estimate
+        self._on_throttle = on_throttle
+        self._pending: Dict[Future, Tuple[str, int]] = {}
+        self._stopped = False
+        self.used_bytes = 0
+        self.peak_bytes = 0
+        self.peak_in_flight = 0
+        self.throttled = 0  # nombre de fois où le budget a retardé une soumission
+        self._exhausted = False
+        self._idle = False
+
+    def stop(self):
+        """N'accepte plus de soumission et annule ce qui n'a pas encore démarré."""
+        self._stopped = True
+        for future in list(self._pending):
+            future.cancel()
+
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    def _fill(self, items: Iterator[Optional[str]], nxt: Optional[Tuple[str, int]]) -> Optional[Tuple[str, int]]:
+        """Soumet tant que fenêtre et budget le permettent. Retourne le prochain fichier non soumis."""
+        while not self._stopped and len(self._pending) < self.max_in_flight:
+            if nxt is None:
+                file_path = next(items, _EXHAUSTED)
+                if file_path is _EXHAUSTED:
+                    self._exhausted = True
+                    return None
+                if file_path is None:  # source vivante sans fichier prêt
+                    self._idle = True
+                    return None
+                self._idle = False
+                nxt = (file_path, self._estimate(file_path))
+            file_path, cost = nxt
+            if self._pending and self.used_bytes + cost > self.budget_bytes:
+                self.throttled += 1
+                self._on_throttle(len(self._pending), self.used_bytes)
+                return nxt
+            self._pending[self._submit(file_path)] = nxt
+            self.used_bytes += cost
+            self.peak_bytes = max(self.peak_bytes, self.used_bytes)
+            self.peak_in_flight = max(self.peak_in_flight, len(self._pending))
+            nxt = None
+        return nxt
+
+    def completed(self, files: Iterable[Optional[str]], idle_wait: float = DEFAULT_IDLE_WAIT) -> Iterator[Tuple[str, Future]]:
+        items = iter(files)
+        self._exhausted = self._idle = False
+        nxt = self._fill(items, None)
+        while self._pending or (nxt is None and not self._exhausted and not self._stopped):
+            if not self._pending:
+                time.sleep(idle_wait)
+                nxt = self._fill(items, nxt)
+                continue
+            # Source inactive: ne pas bloquer sur les conversions, pour prendre les nouveaux fichiers
+            timeout = idle_wait if self._idle and nxt is None else None
+            done, _ = wait(list(self._pending), timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                file_path, cost = self._pending.pop(future)
+                self.used_bytes -= cost
+                if not future.cancelled():
+                    yield file_path, future
+            nxt = self._fill(items, nxt)
@@ -0,0 +1,58 @@
+"""Sélection ordonnée de fichiers indexée par chemin (sans dépendance Qt).
+
+Ajout, test d'appartenance et accès par rang en O(1); l'ordre d'ajout est conservé.
+Les chemins sont normalisés (os.path.normpath) pour qu'un même fichier venant d'un
+dialogue ou d'une analyse de dossier ne soit compté qu'une fois.
+"""
+from __future__ import annotations
+import os
+from typing import Dict, Iterable, Iterator, List
+
+
+class SelectionStore:
+    def __init__(self, paths: Iterable[str] = ()):
+        self._paths: List[str] = []
+        self._index: Dict[str, int] = {}  # chemin -> rang dans _paths
+        self.add(paths)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._paths)
+
+    def __getitem__(self, row: int) -> str:
+        return self._paths[row]
+
+    def __contains__(self, path: str) -> bool:
+        return os.path.normpath(path) in self._index
+
+    def paths(self) -> List[str]:
+        """Copie de la sélection, à passer aux workers."""
+        return list(self._paths)
+
+    def add(self, paths: Iterable[str]) -> List[str]:
+        """Ajoute en fin de sélection les chemins absents. Retourne les chemins réellement ajoutés."""
+        added = []
+        for path in paths:
+            path = os.path.normpath(path)
+            if path not in self._index:
+                self._index[path] = len(self._paths)
+                self._paths.append(path)
+                added.append(path)
+        return added
+
+    def remove_rows(self, rows: Iterable[int]) -> List[int]:
+        """Retire les rangs donnés (une seule passe de compactage). Retourne les rangs retirés, triés."""
+        removed = sorted({row for row in rows if 0 <= row < len(self._paths)})
+        if removed:
+            drop = set(removed)
+            self._paths = [p for row, p in enumerate(self._paths) if row not in drop]
+            self._index = {p: row for row, p in enumerate(self._paths)}
+        return removed
+
+    def remove(self, paths: Iterable[str]) -> List[int]:
+        return self.remove_rows(self._index[p] for p in map(os.path.normpath, paths) if p in self._index)
+
+    def clear(self):
+        self._paths.clear(); self._index.clear()
@@ -0,0 +1,67 @@
+"""Modèle Qt d'une SelectionStore pour un QListView: seules les lignes visibles sont rendues."""
+from __future__ import annotations
+import os
+from typing import Iterable
+from PyQt6.QtCore import QAbstractListModel, QModelIndex, Qt
+from PyQt6.QtWidgets import QAbstractItemView, QListView
+from .selection import SelectionStore
+
+
+class SelectionListModel(QAbstractListModel):
+    """Affiche le nom de fichier (chemin complet en infobulle). Passer par ce modèle pour modifier
+    la sélection afin que la vue soit notifiée des insertions/suppressions.
+    """
+    def __init__(self, store: SelectionStore | None = None, parent=None):
+        super().__init__(parent)
+        self.store = store if store is not None else SelectionStore()
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.store)
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return os.path.basename(self.store[index.row()])
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return self.store[index.row()]
+        return None
+
+    def add(self, paths: Iterable[str]) -> int:
+        """Ajoute les chemins absents en fin de liste. Retourne le nombre ajouté."""
+        paths = list(paths)
+        first = len(self.store)
+        added = self.store.add(paths)
+        if added:
+            # Le store est déjà à jour: la vue ne lit les lignes qu'après endInsertRows
+            self.beginInsertRows(QModelIndex(), first, first + len(added) - 1)
+            self.endInsertRows()
+        return len(added)
+
+    def remove_rows(self, rows: Iterable[int]) -> int:
+        """Retire les rangs donnés. Une plage contiguë est notifiée finement; une sélection éparse
+        est retirée en une seule passe suivie d'une réinitialisation de la vue.
+        """
+        rows = sorted({row for row in rows if 0 <= row < len(self.store)})
+        if not rows:
+            return 0
+        if rows[-1] - rows[0] + 1 == len(rows):
+            self.beginRemoveRows(QModelIndex(), rows[0], rows[-1])
+            self.store.remove_rows(rows)
+            self.endRemoveRows()
+        else:
+            self.beginResetModel(); self.store.remove_rows(rows); self.endResetModel()
+        return len(rows)
+
+    def clear(self):
+        self.beginResetModel(); self.store.clear(); self.endResetModel()
+
+
+def selection_list_view(model: SelectionListModel) -> QListView:
+    """QListView adapté aux très grandes listes (hauteur de ligne uniforme, mise en page par lots)."""
+    view = QListView()
+    view.setModel(model)
+    view.setUniformItemSizes(True)
+    view.setLayoutMode(QListView.LayoutMode.Batched); view.setBatchSize(1000)
+    view.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+    return view
@@ -0,0 +1,155 @@
+"""Télémétrie de conversion: chronométrage par étape et agrégation par lot (sans dépendance Qt)."""
+from __future__ import annotations
+import math
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+STAGE_DECODE = "decode"
+STAGE_RESIZE = "resize"
+STAGE_ENHANCE = "enhance"
+STAGE_WATERMARK = "watermark"
+STAGE_OVERLAY = "overlay"
+STAGE_ENCODE = "encode"
+STAGE_WRITE = "write"
+STAGE_UPLOAD = "upload"
+STAGES = (STAGE_DECODE, STAGE_RESIZE, STAGE_ENHANCE, STAGE_WATERMARK, STAGE_OVERLAY, STAGE_ENCODE,
+          STAGE_WRITE, STAGE_UPLOAD)
+# Jalons rapportés pour le délai avant les premiers résultats (voir ordering.py)
+TIME_TO_FIRST_MARKS = (1, 10, 50, 100)
+STAGE_LABELS = {
+    STAGE_DECODE: "décodage", STAGE_RESIZE: "redim.", STAGE_ENHANCE: "retouches",
+    STAGE_WATERMARK: "watermark", STAGE_OVERLAY: "texte", STAGE_ENCODE: "encodage",
+    STAGE_WRITE: "écriture", STAGE_UPLOAD: "upload",
+}
+
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    """Percentile par interpolation linéaire (comme numpy.percentile)."""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    pos = (len(ordered) - 1) * q / 100
+    low, high = int(math.floor(pos)), int(math.ceil(pos))
+    return ordered[low] + (ordered[high] - ordered[low]) * (pos - low)
+
+
+def summarize(samples: Sequence[float]) -> Dict[str, float]:
+    """Statistiques d'une série de durées en secondes (rapportées en millisecondes)."""
+    return {
+        "n": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 95) * 1000, 2),
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 2) if samples else 0.0,
+    }
+
+
+def worker_id() -> str:
+    """Identifiant du worker courant: pid + nom du thread (distingue processus et threads du pool)."""
+    return f"{os.getpid()}/{threading.current_thread().name}"
+
+
+class StageClock:
+    """Chronomètre à tours: lap(étape) enregistre le temps écoulé depuis le tour précédent."""
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self._last = time.perf_counter()
+
+    def lap(self, stage: str):
+        now = time.perf_counter()
+        self.timings[stage] = self.timings.get(stage, 0.0) + (now - self._last)
+        self._last = now
+
+
+class BatchStats:
+    """Agrégat des télémétries d'un lot. Non thread-safe: appeler sous le verrou du lot."""
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+        self.files = 0
+        self.input_bytes = 0
+        self.output_bytes = 0
+        self.workers = set()
+        self.wall_time: Optional[float] = None
+        self.started = time.perf_counter()
+        self.ready_times: List[float] = []  # secondes depuis le début du lot, pour chaque fichier converti
+        self.upload_retries = 0         # nouvelles tentatives d'upload, tous fichiers confondus
+        self.upload_retried_files = 0
+        self.upload_retry_seconds = 0.0
+
+    def add_result(self, result) -> None:
+        """Ajoute la télémétrie d'un ConversionResult (les fichiers ignorés n'en ont pas)."""
+        if not result.timings:
+            return
+        if result.success:
+            self.ready_times.append(time.perf_counter() - self.started)
+        self.files += 1
+        for stage, seconds in result.timings.items():
+            self.samples.setdefault(stage, []).append(seconds)
+        self.input_bytes += result.input_bytes
+        self.output_bytes += result.output_bytes
+        if result.worker:
+            self.workers.add(result.worker)
+
+    def add_upload(self, seconds: float, retries: int = 0, retry_seconds: float = 0.0) -> None:
+        self.samples[STAGE_UPLOAD].append(seconds)
+        if retries:
+            self.upload_retries += retries
+            self.upload_retried_files += 1
+            self.upload_retry_seconds += retry_seconds
+
+    def time_to_first(self, n: int) -> Optional[float]:
+        """Secondes écoulées avant que n fichiers soient convertis (None si le lot en a produit moins)."""
+        return self.ready_times[n - 1] if 0 < n <= len(self.ready_times) else None
+
+    def totals(self) -> Dict[str, float]:
+        return {stage: sum(values) for stage, values in self.samples.items() if values}
+
+    def as_dict(self) -> dict:
+        return {
+            "files": self.files,
+            "workers": len(self.workers),
+            "input_bytes": self.input_bytes,
+            "output_bytes": self.output_bytes,
+            "wall_time_s": round(self.wall_time, 3) if self.wall_time is not None else None,
+            "upload_retries": self.upload_retries,
+            "upload_retried_files": self.upload_retried_files,
+            "upload_retry_s": round(self.upload_retry_seconds, 3),
+            "time_to_first_s": {str(n): round(self.time_to_first(n), 3) for n in TIME_TO_FIRST_MARKS
+                                if self.time_to_first(n) is not None},
+            "stages": {stage: dict(summarize(values), total_s=round(sum(values), 3))
+                       for stage, values in self.samples.items() if values},
+        }
+
+    def format_summary(self) -> str:
+        """Résumé lisible: part du temps de conversion cumulé par étape, upload à part (étage concurrent)."""
+        if not self.files and not self.samples[STAGE_UPLOAD]:
+            return ""
+        totals = self.totals()
+        upload_total = totals.pop(STAGE_UPLOAD, 0.0)
+        conversion_total = sum(totals.values())
+        lines = []
+        if conversion_total > 0:
+            parts = [f"{STAGE_LABELS.get(stage, stage)} {seconds / conversion_total:.0%}"
+                     for stage, seconds in sorted(totals.items(), key=lambda item: -item[1])]
+            lines.append(f"⏱️ {conversion_total:.1f}s de conversion cumulée sur {self.files} fichier(s), "
+                         f"{len(self.workers)} worker(s): " + " · ".join(parts))
+            slowest = max(totals, key=totals.get)
+            p50 = percentile(self.samples[slowest], 50)
+            p95 = percentile(self.samples[slowest], 95)
+            lines.append(f"🐢 Étape dominante: {STAGE_LABELS.get(slowest, slowest)} "
+                         f"(p50 {p50 * 1000:.0f} ms, p95 {p95 * 1000:.0f} ms par fichier)")
+            first, first_10 = self.time_to_first(1), self.time_to_first(10)
+            if first is not None:
+                lines.append(f"⚡ Premier JPEG à {first:.1f}s" + (f", 10 premiers à {first_10:.1f}s" if first_10 is not None else ""))
+            lines.append(f"📦 {self.input_bytes / (1024 * 1024):.1f} Mo RAW → {self.output_bytes / (1024 * 1024):.1f} Mo JPEG")
+        uploads = self.samples[STAGE_UPLOAD]
+        if uploads:
+            lines.append(f"☁️ Upload: {upload_total:.1f}s cumulées, p50 {percentile(uploads, 50) * 1000:.0f} ms, "
+                         f"p95 {percentile(uploads, 95) * 1000:.0f} ms par fichier")
+        if self.upload_retries:
+            lines.append(f"🔁 {self.upload_retries} nouvelle(s) tentative(s) d'upload sur {self.upload_retried_files} "
+                         f"fichier(s), {self.upload_retry_seconds:.1f}s passées à réessayer")
+        if self.wall_time is not None:
+            lines.append(f"🕒 Durée totale du lot: {self.wall_time:.1f}s")
+        return "\n".join(lines)
@@ -0,0 +1,92 @@
+"""Surveillance d'un dossier « chaud » (tethering, événement en direct), sans Qt.
+
+Le dossier est réanalysé périodiquement (voir scanner.FolderScanner). Un fichier n'est remis
+au pipeline qu'une fois son écriture terminée: taille et date de modification inchangées
+pendant `settle_time` secondes. Chaque fichier n'est remis qu'une fois par session; entre deux
+sessions, c'est le manifeste du dossier de sortie qui évite de reconvertir les fichiers déjà faits.
+"""
+from __future__ import annotations
+import os
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+from .scanner import FolderScanner
+
+DEFAULT_SETTLE_TIME = 2.0     # secondes sans changement de taille/mtime avant conversion
+DEFAULT_POLL_INTERVAL = 1.0   # secondes entre deux analyses du dossier
+
+
+class FolderWatcher:
+    """Source vivante de fichiers prêts, à passer à BatchConverter.watch().
+    L'itération produit chaque fichier prêt, ou None quand rien n'est prêt pour l'instant
+    (contrat de BoundedScheduler.completed); elle ne se termine qu'après cancel().
+    cancel() peut être appelé depuis un autre thread.
+    """
+    def __init__(self, roots: Sequence[str], extensions: Iterable[str],
+                 settle_time: float = DEFAULT_SETTLE_TIME, poll_interval: float = DEFAULT_POLL_INTERVAL):
+        self.roots = [os.path.abspath(r) for r in roots]
+        self.extensions = list(extensions)
+        self.settle_time = max(0.0, settle_time)
+        self.poll_interval = max(0.05, poll_interval)
+        self._settling: Dict[str, Tuple[int, int, float]] = {}  # chemin -> (taille, mtime_ns, stable depuis)
+        self._delivered: Set[str] = set()
+        self._ready: List[str] = []
+        self._last_poll: Optional[float] = None
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    @property
+    def settling(self) -> int:
+        """Fichiers repérés dont l'écriture n'est pas encore terminée."""
+        return len(self._settling)
+
+    @property
+    def ready(self) -> int:
+        """Fichiers prêts pas encore remis au pipeline."""
+        return len(self._ready)
+
+    @property
+    def delivered(self) -> int:
+        return len(self._delivered)
+
+    def poll(self, now: Optional[float] = None) -> List[str]:
+        """Analyse les dossiers une fois et retourne les fichiers devenus prêts (ordre de l'analyse)."""
+        now = time.monotonic() if now is None else now
+        scanner = FolderScanner(self.roots, self.extensions)
+        seen = set()
+        ready = []
+        for path in scanner.iter_files():
+            if self._cancelled:
+                break
+            if path in self._delivered:  # pas de stat pour les fichiers déjà traités
+                continue
+            seen.add(path)
+            try:
+                st = os.stat(path)
+            except OSError:  # supprimé ou renommé entre l'analyse et le stat
+                continue
+            previous = self._settling.get(path)
+            if previous is None or previous[:2] != (st.st_size, st.st_mtime_ns):
+                self._settling[path] = (st.st_size, st.st_mtime_ns, now)
+            elif st.st_size > 0 and now - previous[2] >= self.settle_time:
+                del self._settling[path]
+                self._delivered.add(path)
+                ready.append(path)
+        # Fichiers disparus avant d'être stables (copie annulée, renommage temporaire)
+        for path in [p for p in self._settling if p not in seen]:
+            del self._settling[path]
+        self._last_poll = now
+        return ready
+
+    def __iter__(self) -> Iterator[Optional[str]]:
+        while not self._cancelled:
+            if not self._ready:
+                now = time.monotonic()
+                if self._last_poll is None or now - self._last_poll >= self.poll_interval:
+                    self._ready.extend(self.poll(now))
+            yield self._ready.pop(0) if self._ready else None
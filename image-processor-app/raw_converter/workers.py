@@ -1,74 +1,65 @@
-"""Threads et workers PyQt pour la conversion parallèle."""
+"""Threads et workers PyQt pour la conversion parallèle.
+La progression passe par un ProgressFeed que l'interface vide à cadence fixe (pas de signal par fichier).
+"""
 from __future__ import annotations
-import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Optional
+from typing import List, Optional, Sequence
 from PyQt6.QtCore import QThread, pyqtSignal
-from .processing import convert_raw_to_jpeg
-from .minio_widget import MinioConfig
-from .minio_uploader import build_client, ensure_bucket, upload_file
+from .processing import DECODE_MODE_FULL, DECODE_POLICY_AUTO, ENHANCE_BACKEND_PILLOW, RAW_EXTENSIONS, Rendition
+from .minio_config import MinioConfig
+from .pipeline import BatchConverter, EXECUTION_MODE_PROCESS
+from .watcher import FolderWatcher
+from .ordering import ORDER_SELECTION
+from .progress_feed import ProgressFeed, new_log_path, FEED_PROGRESS, FEED_STATUS, FEED_BACKLOG
+
 
 class ConversionWorker(QThread):
-    progress_updated = pyqtSignal(int)
-    status_updated = pyqtSignal(str)
-    file_converted = pyqtSignal(str, bool, str)
+    """Progression, statut, file d'attente de la surveillance (FEED_BACKLOG) et journal (résultats, uploads,
+    résumé du lot) sont déposés dans self.feed; seule la fin du lot est signalée.
+    """
     conversion_finished = pyqtSignal(int, int, int)
 
     def __init__(self, files: List[str], output_dir: str, quality: int,
                  watermark_enabled: bool = True, watermark_path: Optional[str] = None,
                  filename_display_enabled: bool = True,
-                 minio_config: Optional[MinioConfig] = None):
+                 minio_config: Optional[MinioConfig] = None,
+                 execution_mode: str = EXECUTION_MODE_PROCESS,
+                 max_workers: Optional[int] = None,
+                 decode_mode: str = DECODE_MODE_FULL,
+                 decode_policy: str = DECODE_POLICY_AUTO,
+                 incremental: bool = True,
+                 enhance_backend: str = ENHANCE_BACKEND_PILLOW,
+                 write_local: bool = True,
+                 memory_budget_mb: Optional[int] = None,
+                 extra_renditions: Optional[Sequence[Rendition]] = None,
+                 order: str = ORDER_SELECTION,
+                 priority: Optional[Sequence[str]] = None,
+                 watch_folder: Optional[str] = None):
+        """Avec watch_folder, `files` est ignoré: le dossier est surveillé jusqu'à stop()."""
         super().__init__()
-        self.files = files
-        self.output_dir = output_dir
-        self.quality = quality
-        self.watermark_enabled = watermark_enabled
-        self.watermark_path = watermark_path
-        self.filename_display_enabled = filename_display_enabled
-        self._stop_requested = False
-        self.minio_config = minio_config
-        self._minio_client = None
-        self._minio_bucket_ok = False
+        self.watcher = FolderWatcher([watch_folder], RAW_EXTENSIONS) if watch_folder else None
+        self.feed = ProgressFeed(log_path=new_log_path("conversion"))
+        self.batch = BatchConverter(
+            files, output_dir, quality, watermark_enabled, watermark_path, filename_display_enabled,
+            minio_config=minio_config, execution_mode=execution_mode, max_workers=max_workers,
+            decode_mode=decode_mode, decode_policy=decode_policy, incremental=incremental,
+            enhance_backend=enhance_backend, write_local=write_local,
+            memory_budget_mb=memory_budget_mb, extra_renditions=list(extra_renditions or ()),
+            order=order, priority=priority,
+            on_status=lambda msg: self.feed.post(FEED_STATUS, msg),
+            on_file=lambda r: self.feed.log(r.message),
+            on_progress=lambda pct: self.feed.post(FEED_PROGRESS, pct),
+            on_upload=lambda name, ok, msg, _retries, _retry_s: self.feed.log(f"{name} | {msg}"),
+        )
 
     def stop(self):
-        self._stop_requested = True
+        self.batch.stop()
 
     def run(self):
-        converted = 0
-        failed = 0
-        total = len(self.files)
-        completed = 0
-        self.status_updated.emit(f"Démarrage du traitement parallèle de {total} fichiers...")
-        # Initialisation Minio si nécessaire
-        if self.minio_config and self.minio_config.enabled and self.minio_config.connection_tested:
-            self._minio_client = build_client(self.minio_config)
-            if self._minio_client:
-                ok, msg = ensure_bucket(self._minio_client, self.minio_config.bucket)
-                self._minio_bucket_ok = ok
-                self.status_updated.emit(msg)
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            future_to_file = {executor.submit(convert_raw_to_jpeg, file_path, self.output_dir, self.quality,
-                                              self.watermark_enabled, self.watermark_path, self.filename_display_enabled): file_path
-                              for file_path in self.files}
-            for future in as_completed(future_to_file):
-                if self._stop_requested:
-                    executor.shutdown(wait=False, cancel_futures=True)
-                    break
-                file_path = future_to_file[future]
-                result = future.result()
-                filename, success, message = result.filename, result.success, result.message
-                # Upload Minio si succès et config ok
-                if success and self._minio_client and self._minio_bucket_ok:
-                    local_jpeg = os.path.join(self.output_dir, f"{os.path.splitext(filename)[0]}.jpg")
-                    _up_ok, up_msg = upload_file(self._minio_client, self.minio_config.bucket, local_jpeg)  # type: ignore
-                    message = message + (" | " + up_msg)
-                if success:
-                    converted += 1
-                else:
-                    failed += 1
-                completed += 1
-                self.status_updated.emit(f"Terminé: {filename} ({completed}/{total})")
-                self.file_converted.emit(filename, success, message)
-                progress = int((completed / total) * 100)
-                self.progress_updated.emit(progress)
+        if self.watcher is not None:
+            converted, failed, total = self.batch.watch(self.watcher, lambda *backlog: self.feed.post(FEED_BACKLOG, backlog))
+        else:
+            converted, failed, total = self.batch.run()
+        summary = self.batch.stats.format_summary()
+        if summary:
+            self.feed.log("\n" + summary)
         self.conversion_finished.emit(converted, failed, total)
@@ -1,7 +1,9 @@
 """Bootstrap conservé pour compatibilité.
 Redirige vers le nouveau package modularisé raw_converter.app.main
 """
+import multiprocessing
 from raw_converter import main
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # requis pour le pool de processus dans le bundle PyInstaller
     main()
@@ -0,0 +1,105 @@
+"""Fixtures communes: les tests tournent sans Qt, rawpy ni serveur Minio."""
+import datetime as _datetime
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from raw_converter import minio_config, pipeline, remote_sync  # noqa: E402
+from raw_converter.minio_config import MinioConfig  # noqa: E402
+from raw_converter.processing import ConversionResult, STATUS_CONVERTED  # noqa: E402
+from raw_converter.remote_sync import s3_etag  # noqa: E402
+
+
+class FakeObject:
+    def __init__(self, name, size, etag):
+        self.object_name = name
+        self.size = size
+        self.etag = etag
+        self.is_dir = False
+
+
+class FakeMinio:
+    """Bucket en mémoire: nom d'objet -> (taille, ETag), comme le verrait list_objects."""
+    def __init__(self):
+        self.objects = {}
+        self.puts = []
+
+    def fput_object(self, bucket, name, path, **_kwargs):
+        self.puts.append(name)
+        self.objects[name] = (os.path.getsize(path), s3_etag(path))
+
+    def put_object(self, bucket, name, data, length, **_kwargs):
+        self.puts.append(name)
+        self.objects[name] = (length, "")
+
+    def bucket_exists(self, bucket):
+        return True
+
+    def list_objects(self, bucket, prefix, recursive=True):
+        return [FakeObject(name, *info) for name, info in self.objects.items() if name.startswith(prefix)]
+
+
+@pytest.fixture
+def fake_minio(monkeypatch):
+    client = FakeMinio()
+    for module in (pipeline, remote_sync):
+        monkeypatch.setattr(module, "build_client", lambda *_args, **_kwargs: client)
+        monkeypatch.setattr(module, "ensure_bucket", lambda *_args: (True, "Bucket OK"))
+    return client
+
+
+@pytest.fixture
+def minio_cfg():
+    cfg = MinioConfig()
+    cfg.enabled = cfg.connection_tested = True
+    cfg.endpoint, cfg.access_key, cfg.secret_key, cfg.bucket = "minio.test", "key", "secret", "galerie"
+    return cfg
+
+
+@pytest.fixture
+def utc_day(monkeypatch):
+    """utc_day(2030, 1, 2): fixe la date du « dossier du jour » distant."""
+    def set_day(year, month, day):
+        class FixedDatetime(_datetime.datetime):
+            @classmethod
+            def utcnow(cls):
+                return _datetime.datetime(year, month, day, 12)
+        monkeypatch.setattr(minio_config, "datetime", FixedDatetime)
+    return set_day
+
+
+@pytest.fixture
+def fake_conversion(monkeypatch):
+    """Remplace le décodage RAW: chaque conversion écrit des JPEG factices. Retourne la liste des RAW convertis."""
+    converted = []
+
+    def convert(job, cancel_event=None):
+        converted.append(job.file_path)
+        for path in pipeline.output_paths_for(job.file_path, job.output_dir, pipeline.build_renditions(job.quality, [])):
+            with open(path, "wb") as f:
+                f.write(b"jpeg " + os.path.basename(job.file_path).encode())
+        return ConversionResult(os.path.basename(job.file_path), True, "ok", STATUS_CONVERTED, timings={"decode": 0.001})
+
+    monkeypatch.setattr(pipeline, "run_conversion_job", convert)
+    monkeypatch.setattr(pipeline, "estimate_decode_memory", lambda *_args: 1)
+    return converted
+
+
+@pytest.fixture
+def raw_files(tmp_path):
+    """raw_files("a", "b"): crée (si absents) des RAW factices dans tmp_path/raw et retourne leurs chemins."""
+    folder = tmp_path / "raw"
+    folder.mkdir(exist_ok=True)
+
+    def make(*names):
+        paths = []
+        for name in names:
+            path = folder / f"{name}.cr2"
+            if not path.exists():
+                path.write_bytes(b"raw " + name.encode())
+            paths.append(str(path))
+        return paths
+    return make
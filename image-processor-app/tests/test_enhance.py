@@ -0,0 +1,42 @@
+"""Noyau NumPy de retouche web: même rendu que la chaîne Pillow, à ENHANCE_MAX_ABS_DIFF près."""
+import pytest
+
+np = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+
+from raw_converter.enhance import box_blur_weights, enhance_array, EnhancementKernel, ENHANCE_MAX_ABS_DIFF  # noqa: E402
+from raw_converter.processing import _enhance_for_web, ENHANCE_BACKEND_NUMPY, ENHANCE_BACKEND_PILLOW  # noqa: E402
+
+
+def _photo(height, width, seed=0):
+    """Dégradés et bruit: des zones plates (sous le seuil du masque) et des contours marqués."""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width]
+    base = np.stack([x * 255 // max(width - 1, 1), y * 255 // max(height - 1, 1), (x + y) % 256], axis=-1)
+    noise = rng.integers(-40, 41, size=(height, width, 3))
+    return np.clip(base + noise, 0, 255).astype(np.uint8)
+
+
+@pytest.mark.parametrize("height, width", [(64, 96), (97, 53), (3, 3), (1, 7), (6, 1), (1, 1)])
+def test_numpy_backend_matches_pillow(height, width):
+    image = Image.fromarray(_photo(height, width, seed=height))
+    pillow = np.asarray(_enhance_for_web(image, ENHANCE_BACKEND_PILLOW), dtype=np.int16)
+    fused = np.asarray(_enhance_for_web(image, ENHANCE_BACKEND_NUMPY), dtype=np.int16)
+    assert fused.shape == pillow.shape
+    assert np.abs(fused - pillow).max() <= ENHANCE_MAX_ABS_DIFF
+
+
+def test_kernel_buffers_are_reused_without_leaking_state():
+    first, second = _photo(40, 60, seed=1), _photo(40, 60, seed=2)
+    kernel = EnhancementKernel(40, 60)
+    expected = kernel.apply(second).copy()
+    kernel.apply(first)
+    assert np.array_equal(kernel.apply(second), expected)
+    assert np.array_equal(enhance_array(second), expected)
+
+
+def test_box_blur_weights_sum_to_one():
+    center, side = box_blur_weights(0.8)
+    assert center + 2 * side == pytest.approx(1.0)
+    with pytest.raises(ValueError):
+        box_blur_weights(2.0)
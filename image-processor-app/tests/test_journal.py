@@ -0,0 +1,73 @@
+"""Journal de reprise: un lot interrompu ou en échec reprend sans reconvertir les fichiers déjà traités."""
+import os
+
+from raw_converter import pipeline
+from raw_converter.journal import JobJournal, job_key, JOB_CONVERT, STATE_CONVERTED, STATE_FAILED, STATE_UPLOADED
+from raw_converter.pipeline import BatchConverter
+
+
+def test_journal_states_survive_reopen(tmp_path):
+    done, failed, edited = (tmp_path / name for name in ("a.cr2", "b.cr2", "c.cr2"))
+    for path in (done, failed, edited):
+        path.write_bytes(b"raw")
+    db = str(tmp_path / "journal.sqlite")
+    key = job_key(JOB_CONVERT, "réglages", files=[str(done), str(failed), str(edited)])
+
+    journal = JobJournal(db, JOB_CONVERT, key)
+    assert not journal.resumed
+    journal.queue([str(done), str(failed), str(edited)])
+    journal.mark(str(done), STATE_UPLOADED)
+    journal.mark(str(failed), STATE_FAILED)
+    journal.mark(str(edited), STATE_CONVERTED)
+    journal.set_upload_prefix("2030-01-01")
+    journal.close()
+    edited.write_bytes(b"raw retouche")
+
+    journal = JobJournal(db, JOB_CONVERT, key)
+    states = journal.states()
+    assert journal.resumed and journal.upload_prefix == "2030-01-01"
+    assert journal.resume_state(states, str(done)) == STATE_UPLOADED
+    assert journal.resume_state(states, str(failed)) is None
+    assert journal.resume_state(states, str(edited)) is None  # source modifiée depuis
+    journal.finish()
+    journal.close()
+    assert not JobJournal(db, JOB_CONVERT, key).resumed
+
+
+def test_job_key_ignores_file_order():
+    assert job_key(JOB_CONVERT, 80, files=["b", "a"]) == job_key(JOB_CONVERT, 80, files=["a", "b"])
+    assert job_key(JOB_CONVERT, 80, files=["a"]) != job_key(JOB_CONVERT, 90, files=["a"])
+
+
+def _convert(files, out_dir, incremental=True):
+    batch = BatchConverter(files, out_dir, 80, watermark_enabled=False, filename_display_enabled=False,
+                           execution_mode="thread", max_workers=1, incremental=incremental)
+    batch.run()
+    return batch
+
+
+def test_failed_batch_resumes_then_forced_run_reconverts(tmp_path, monkeypatch, fake_conversion, raw_files):
+    out_dir = str(tmp_path / "jpeg")
+    os.makedirs(out_dir)
+    files = raw_files("a", "b", "c")
+    convert = pipeline.run_conversion_job
+
+    def fail_c(job, cancel_event=None):
+        if job.file_path.endswith("c.cr2"):
+            return pipeline.ConversionResult("c.cr2", False, "échec")
+        return convert(job, cancel_event)
+
+    monkeypatch.setattr(pipeline, "run_conversion_job", fail_c)
+    first = _convert(files, out_dir)
+    assert (first.converted, first.failed) == (2, 1)
+
+    monkeypatch.setattr(pipeline, "run_conversion_job", convert)
+    fake_conversion.clear()
+    second = _convert(files, out_dir)
+    assert second.resumed == 2 and second.converted == 1
+    assert fake_conversion == [files[2]]
+
+    fake_conversion.clear()
+    forced = _convert(files, out_dir, incremental=False)
+    assert forced.resumed == 0 and forced.converted == 3
+    assert sorted(fake_conversion) == files
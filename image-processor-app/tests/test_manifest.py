@@ -0,0 +1,37 @@
+"""Manifeste: état d'upload par destination et dossier distant retenu, persistés entre deux lancements."""
+from raw_converter.manifest import ConversionManifest, upload_target
+
+
+def test_upload_target_includes_only_fixed_prefix():
+    assert upload_target("minio.test", "galerie") == "minio.test/galerie"
+    assert upload_target("minio.test", "galerie", "/mariage/") == "minio.test/galerie/mariage"
+    assert upload_target("", "galerie") is None
+
+
+def test_uploaded_state_and_remote_prefix_survive_reload(tmp_path):
+    source = tmp_path / "a.cr2"
+    source.write_bytes(b"raw")
+    output = tmp_path / "a.jpg"
+    output.write_bytes(b"jpeg")
+    target = upload_target("minio.test", "galerie")
+
+    manifest = ConversionManifest(str(tmp_path))
+    manifest.record(str(source), [str(output)], "settings")
+    manifest.mark_uploaded(str(source), target)
+    manifest.set_remote_prefix(target, "2030-01-01")
+    manifest.save()
+
+    reloaded = ConversionManifest(str(tmp_path))
+    assert reloaded.is_up_to_date(str(source), [str(output)], "settings")
+    assert reloaded.is_uploaded(str(source), target)
+    assert not reloaded.is_uploaded(str(source), "minio.test/autre")
+    assert reloaded.remote_prefix(target) == "2030-01-01"
+    assert reloaded.remote_prefix("minio.test/autre") is None
+
+
+def test_set_remote_prefix_only_dirties_on_change(tmp_path):
+    manifest = ConversionManifest(str(tmp_path))
+    manifest.set_remote_prefix("minio.test/galerie", "2030-01-01")
+    manifest.save()
+    manifest.set_remote_prefix("minio.test/galerie", "2030-01-01")
+    assert manifest._dirty == 0
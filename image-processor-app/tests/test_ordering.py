@@ -0,0 +1,153 @@
+"""Ordre de conversion: date de prise de vue EXIF lue dans l'en-tête des RAW, et file de conversion."""
+import os
+import struct
+import threading
+from datetime import datetime
+
+import pytest
+
+from raw_converter import ordering
+from raw_converter.ordering import capture_time, ConversionQueue
+
+
+def tiff_header(taken, endian="<", magic=42, exif=True, modified="2000:01:01 00:00:00"):
+    """En-tête TIFF minimal: IFD0 (DateTime, pointeur EXIF) puis IFD EXIF (DateTimeOriginal)."""
+    ifd0, exif_ifd = 8, 8 + 2 + 2 * 12 + 4
+    original_at = exif_ifd + 2 + 12 + 4
+    modified_at = original_at + 20
+    data = (b"II" if endian == "<" else b"MM") + struct.pack(endian + "HI", magic, ifd0)
+    data += struct.pack(endian + "H", 2)
+    data += struct.pack(endian + "HHII", 0x0132, 2, 20, modified_at)
+    data += struct.pack(endian + "HHII", 0x8769 if exif else 0x0100, 4, 1, exif_ifd)
+    data += struct.pack(endian + "I", 0)
+    data += struct.pack(endian + "H", 1) + struct.pack(endian + "HHII", 0x9003, 2, 20, original_at)
+    data += struct.pack(endian + "I", 0)
+    return data + taken.encode() + b"\0" + modified.encode() + b"\0" + b"\0" * 64
+
+
+def raf(taken):
+    """RAF Fuji: EXIF dans le JPEG intégré dont le décalage est à l'octet 84."""
+    tiff = tiff_header(taken, ">")
+    jpeg = b"\xff\xd8\xff\xe1" + struct.pack(">H", len(tiff) + 8) + b"Exif\0\0" + tiff
+    head = b"FUJIFILMCCD-RAW " + b"\0" * (84 - 16) + struct.pack(">I", 100)
+    return head + b"\0" * (100 - len(head)) + jpeg
+
+
+def ts(text):
+    return datetime.strptime(text, "%Y:%m:%d %H:%M:%S").timestamp()
+
+
+@pytest.mark.parametrize("name, data, expected", [
+    ("a.cr2", tiff_header("2024:06:01 10:00:00"), "2024:06:01 10:00:00"),
+    ("b.nef", tiff_header("2024:06:01 12:00:00", ">"), "2024:06:01 12:00:00"),
+    ("c.orf", tiff_header("2024:06:01 11:00:00", magic=0x4F52), "2024:06:01 11:00:00"),
+    ("d.rw2", tiff_header("2024:06:01 11:30:00", magic=0x55), "2024:06:01 11:30:00"),
+    ("e.raf", raf("2024:06:01 13:00:00"), "2024:06:01 13:00:00"),
+    ("f.arw", tiff_header("0000:00:00 00:00:00"), "2000:01:01 00:00:00"),   # date d'origine vide: DateTime
+    ("g.dng", tiff_header("x" * 19, exif=False), "2000:01:01 00:00:00"),    # sans IFD EXIF: DateTime
+])
+def test_capture_time_reads_exif_header(tmp_path, name, data, expected):
+    path = tmp_path / name
+    path.write_bytes(data)
+    assert capture_time(str(path)) == ts(expected)
+
+
+@pytest.mark.parametrize("data", [
+    b"\0\0\0\x18ftypcrx " + b"\0" * 100,                                      # CR3 (ISO BMFF): non lu ici
+    tiff_header("0000:00:00 00:00:00", modified="0000:00:00 00:00:00"),     # aucune date valide
+    b"II*\0\xff\xff\xff\x7f",                                                  # IFD hors du fichier
+    b"",
+])
+def test_capture_time_unknown(tmp_path, data):
+    path = tmp_path / "x.raw"
+    path.write_bytes(data)
+    assert capture_time(str(path)) is None
+
+
+def test_capture_time_missing_file(tmp_path):
+    assert capture_time(str(tmp_path / "absent.cr2")) is None
+
+
+def _names(paths):
+    return [os.path.basename(path) for path in paths]
+
+
+def _files(tmp_path, sizes):
+    paths = []
+    for name, size in sizes:
+        path = tmp_path / name
+        path.write_bytes(b"x" * size)
+        paths.append(str(path))
+    return paths
+
+
+def test_selection_and_priority_order(tmp_path):
+    files = _files(tmp_path, [("a.cr2", 3), ("b.cr2", 1), ("c.cr2", 2)])
+    assert _names(ConversionQueue(files)) == ["a.cr2", "b.cr2", "c.cr2"]
+    queue = ConversionQueue(files, "priority", priority=[files[2], files[1]])
+    assert _names(queue) == ["c.cr2", "b.cr2", "a.cr2"]
+
+
+def test_smallest_first_once_measured(tmp_path):
+    files = _files(tmp_path, [("a.cr2", 30), ("b.cr2", 10), ("c.cr2", 20)])
+    queue = ConversionQueue(files, "smallest")
+    assert queue.wait_measured(5)
+    assert _names(queue) == ["b.cr2", "c.cr2", "a.cr2"]
+
+
+def test_newest_uses_capture_time_before_mtime(tmp_path):
+    old = tmp_path / "old.cr2"
+    old.write_bytes(tiff_header("2020:01:01 10:00:00"))
+    recent = tmp_path / "recent.cr2"
+    recent.write_bytes(tiff_header("2024:01:01 10:00:00"))
+    os.utime(old, (ts("2025:01:01 00:00:00"),) * 2)  # copié plus tard: mtime trompeuse
+    undated = tmp_path / "undated.cr3"
+    undated.write_bytes(b"cr3")
+    os.utime(undated, (ts("2022:01:01 00:00:00"),) * 2)
+    queue = ConversionQueue([str(old), str(undated), str(recent)], "newest")
+    assert queue.wait_measured(5)
+    assert _names(queue) == ["recent.cr2", "undated.cr3", "old.cr2"]
+
+
+def test_set_policy_reorders_pending_files_only(tmp_path):
+    files = _files(tmp_path, [("a.cr2", 30), ("b.cr2", 10), ("c.cr2", 20), ("d.cr2", 5)])
+    queue = ConversionQueue(files)
+    assert queue.pop() == files[0]
+    queue.set_policy("smallest", priority=[files[2]])
+    assert queue.policy == "smallest"
+    assert queue.wait_measured(5)
+    assert _names(queue) == ["c.cr2", "d.cr2", "b.cr2"]
+
+
+def test_added_files_are_measured(tmp_path):
+    files = _files(tmp_path, [("a.cr2", 30), ("b.cr2", 10)])
+    queue = ConversionQueue(policy="smallest")
+    for path in files:
+        queue.add(path)
+    assert queue.wait_measured(5)
+    assert len(queue) == 2
+    assert _names(queue) == ["b.cr2", "a.cr2"]
+
+
+def test_slow_measurements_do_not_block_the_queue(tmp_path, monkeypatch):
+    files = _files(tmp_path, [("a.cr2", 30), ("b.cr2", 10), ("c.cr2", 20)])
+    release = threading.Event()
+
+    def slow_size(path):
+        release.wait(5)  # disque lent: la mesure ne doit bloquer ni pop() ni set_policy()
+        return os.path.getsize(path)
+
+    monkeypatch.setattr(ordering, "_file_size", slow_size)
+    queue = ConversionQueue(files, "smallest")
+    assert queue.pop() == files[0]
+    queue.set_policy("selection")
+    queue.set_policy("smallest")
+    assert not queue.wait_measured(0.05)
+    release.set()
+    assert queue.wait_measured(5)
+    assert _names(queue) == ["b.cr2", "c.cr2"]
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        ConversionQueue(policy="random")
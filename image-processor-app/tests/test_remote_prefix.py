@@ -0,0 +1,52 @@
+"""Dossier distant d'une galerie uploadée sans préfixe fixe: fixé au premier envoi, réutilisé ensuite."""
+import glob
+import os
+
+from raw_converter.pipeline import BatchConverter
+from raw_converter.remote_sync import BatchUploader
+
+
+def _convert(files, out_dir, cfg):
+    batch = BatchConverter(files, out_dir, 80, watermark_enabled=False, filename_display_enabled=False,
+                           minio_config=cfg, execution_mode="thread", max_workers=2, resume=False)
+    batch.run()
+    return batch
+
+
+def test_second_day_run_and_sync_reuse_first_remote_folder(tmp_path, fake_minio, minio_cfg, utc_day,
+                                                           fake_conversion, raw_files):
+    out_dir = str(tmp_path / "jpeg")
+    os.makedirs(out_dir)
+    utc_day(2030, 1, 1)
+    first = _convert(raw_files("a", "b"), out_dir, minio_cfg)
+    assert first.uploaded == 2
+
+    utc_day(2030, 1, 2)
+    second = _convert(raw_files("a", "b", "c"), out_dir, minio_cfg)
+    assert second.skipped == 2 and second.uploaded == 1
+    assert sorted(fake_minio.objects) == ["2030-01-01/a.jpg", "2030-01-01/b.jpg", "2030-01-01/c.jpg"]
+
+    utc_day(2030, 1, 3)
+    puts_before = len(fake_minio.puts)
+    sync = BatchUploader(sorted(glob.glob(os.path.join(out_dir, "*.jpg"))), minio_cfg, 2, sync=True, resume=False)
+    sent, failed, total = sync.run()
+    assert (sent, failed, total) == (0, 0, 3)
+    assert sync.skipped == 3
+    assert len(fake_minio.puts) == puts_before
+
+
+def test_sync_without_manifest_remembers_its_folder(tmp_path, fake_minio, minio_cfg, utc_day):
+    gallery = tmp_path / "galerie"
+    gallery.mkdir()
+    files = []
+    for name in ("x", "y"):
+        path = gallery / f"{name}.jpg"
+        path.write_bytes(b"jpeg " + name.encode())
+        files.append(str(path))
+
+    utc_day(2030, 5, 1)
+    assert BatchUploader(files, minio_cfg, 2, sync=True, resume=False).run() == (2, 0, 2)
+    utc_day(2030, 5, 2)
+    again = BatchUploader(files, minio_cfg, 2, sync=True, resume=False)
+    assert again.run() == (0, 0, 2)
+    assert sorted(fake_minio.objects) == ["2030-05-01/x.jpg", "2030-05-01/y.jpg"]
@@ -0,0 +1,39 @@
+"""ETag S3 attendu et classement d'un fichier local face à l'index distant."""
+import hashlib
+
+from raw_converter.remote_sync import RemoteIndex, s3_etag, SYNC_CHANGED, SYNC_NEW, SYNC_UNCHANGED
+
+
+def test_single_part_etag_is_content_md5(tmp_path):
+    path = tmp_path / "a.jpg"
+    path.write_bytes(b"x" * 100)
+    assert s3_etag(str(path), part_size=100) == hashlib.md5(b"x" * 100).hexdigest()
+
+
+def test_empty_file_etag(tmp_path):
+    path = tmp_path / "vide.jpg"
+    path.write_bytes(b"")
+    assert s3_etag(str(path)) == hashlib.md5(b"").hexdigest()
+
+
+def test_multipart_etag_is_md5_of_part_md5s(tmp_path):
+    data = b"a" * 10 + b"b" * 10 + b"c" * 5
+    path = tmp_path / "a.jpg"
+    path.write_bytes(data)
+    parts = [data[:10], data[10:20], data[20:]]
+    expected = hashlib.md5(b"".join(hashlib.md5(p).digest() for p in parts)).hexdigest() + "-3"
+    assert s3_etag(str(path), part_size=10) == expected
+
+
+def test_classify_compares_size_then_etag(tmp_path):
+    path = tmp_path / "a.jpg"
+    path.write_bytes(b"jpeg")
+    index = RemoteIndex({
+        "g/same.jpg": (4, s3_etag(str(path))),
+        "g/resized.jpg": (5, s3_etag(str(path))),
+        "g/edited.jpg": (4, hashlib.md5(b"JPEG").hexdigest()),
+    })
+    assert index.classify(str(path), "g/same.jpg") == SYNC_UNCHANGED
+    assert index.classify(str(path), "g/resized.jpg") == SYNC_CHANGED
+    assert index.classify(str(path), "g/edited.jpg") == SYNC_CHANGED
+    assert index.classify(str(path), "g/absent.jpg") == SYNC_NEW
@@ -0,0 +1,75 @@
+"""Planificateur: fenêtre de fichiers en vol et budget mémoire estimé."""
+from concurrent.futures import Future
+
+from raw_converter.scheduler import BoundedScheduler
+
+
+class SyncExecutor:
+    """Exécuteur synchrone: chaque future est déjà terminée, le planificateur la récupère au prochain wait()."""
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, path):
+        future = Future()
+        future.set_running_or_notify_cancel()
+        self.submitted.append(path)
+        future.set_result(path)
+        return future
+
+
+def _run(costs, max_in_flight, budget):
+    executor = SyncExecutor()
+    scheduler = BoundedScheduler(executor.submit, max_in_flight, budget, costs.__getitem__)
+    for path, future in scheduler.completed(list(costs)):
+        assert future.result() == path
+        assert scheduler.used_bytes <= max(budget, max(costs.values()))
+    return scheduler, executor
+
+
+def test_budget_limits_memory_in_flight():
+    costs = {"a": 40, "b": 40, "c": 40, "d": 40}
+    scheduler, executor = _run(costs, max_in_flight=4, budget=100)
+    assert executor.submitted == ["a", "b", "c", "d"]
+    assert scheduler.peak_bytes == 80
+    assert scheduler.peak_in_flight == 2
+    assert scheduler.throttled > 0
+    assert scheduler.used_bytes == 0 and scheduler.in_flight() == 0
+
+
+def test_window_limits_files_in_flight():
+    costs = {name: 1 for name in "abcdef"}
+    scheduler, executor = _run(costs, max_in_flight=3, budget=1000)
+    assert executor.submitted == list("abcdef")
+    assert scheduler.peak_in_flight == 3
+    assert scheduler.throttled == 0
+
+
+def test_file_larger_than_budget_runs_alone():
+    costs = {"a": 10, "huge": 500, "b": 10}
+    scheduler, executor = _run(costs, max_in_flight=4, budget=100)
+    assert executor.submitted == ["a", "huge", "b"]
+    assert scheduler.peak_bytes == 500
+    assert scheduler.used_bytes == 0
+
+
+def test_live_source_is_polled_until_exhausted():
+    executor = SyncExecutor()
+    scheduler = BoundedScheduler(executor.submit, 2, 100, lambda _path: 1)
+    done = [path for path, _future in scheduler.completed(iter(["a", None, None, "b", None]), idle_wait=0.001)]
+    assert done == ["a", "b"]
+
+
+def test_stop_cancels_pending_submissions():
+    futures = {}
+
+    def submit(path):
+        futures[path] = Future()  # jamais démarrée
+        return futures[path]
+
+    scheduler = BoundedScheduler(submit, 2, 100, lambda _path: 1)
+    assert scheduler._fill(iter(["a", "b", "c"]), None) is None
+    scheduler.stop()
+    assert sorted(futures) == ["a", "b"]
+    assert all(future.cancelled() for future in futures.values())
+    assert scheduler._fill(iter(["c"]), None) is None
+    assert sorted(futures) == ["a", "b"]